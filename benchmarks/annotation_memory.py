@@ -0,0 +1,120 @@
+"""
+Measure the memory used by annotating the AST of large modules
+
+The largest modules in a directory are parsed, and the memory allocated by each way of annotating the module is
+measured with tracemalloc. The peak memory used to minify the whole module is also measured.
+
+The annotations are kept in side tables. For comparison, the memory used by setting the parent of each node as an
+attribute of the node is also reported.
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+import python_minifier
+import python_minifier.ast_compat as ast
+from python_minifier.ast_annotation import Annotations, NodeIndex, add_parent
+from python_minifier.rename import add_namespace
+
+
+def source_files(source_dir):
+    for root, _dirs, files in os.walk(source_dir):
+        for file in files:
+            if file.endswith('.py'):
+                yield os.path.join(root, file)
+
+
+def allocated(function, *args):
+    """
+    The memory allocated by a function that is still in use when it returns, and the peak memory it used
+
+    :rtype: tuple[int, int]
+    """
+
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+
+def parent_attributes(module):
+    for node in ast.walk(module):
+        for child in ast.iter_child_nodes(node):
+            child._parent = node
+
+
+def measure(source, filename):
+    """
+    Measure annotating and minifying a module
+
+    :return: The number of nodes, and the bytes allocated by each measurement
+    :rtype: tuple[int, dict[str, int]]
+    """
+
+    results = {}
+    kept = []
+
+    results['parse'], _ = allocated(lambda: kept.append(ast.parse(source, filename)))
+    node_count = sum(1 for _ in ast.walk(kept[0]))
+
+    with Annotations():
+        module = ast.parse(source, filename)
+        results['parents'], _ = allocated(add_parent, module)
+        results['namespaces'], _ = allocated(add_namespace, module)
+
+    with Annotations():
+        module = ast.parse(source, filename)
+        results['parents + index'], _ = allocated(lambda: add_parent(module, index=NodeIndex()))
+
+    indexed_node_types = python_minifier.Minifier()._indexed_node_types
+    with Annotations():
+        module = ast.parse(source, filename)
+        results['parents + transform index'], _ = allocated(lambda: add_parent(module, index=NodeIndex(indexed_node_types)))
+
+    module = ast.parse(source, filename)
+    results['parent attributes'], _ = allocated(parent_attributes, module)
+
+    _, results['minify peak'] = allocated(python_minifier.minify, source, filename)
+
+    return node_count, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the memory used by annotating large modules')
+    parser.add_argument('--source', default=os.path.dirname(os.__file__), help='Directory of modules to measure')
+    parser.add_argument('--largest', type=int, default=5, help='Number of the largest modules to measure')
+    args = parser.parse_args()
+
+    paths = sorted(source_files(args.source), key=os.path.getsize, reverse=True)
+
+    measured = 0
+    for path in paths:
+        if measured == args.largest:
+            break
+
+        with open(path, 'rb') as f:
+            source = f.read()
+
+        try:
+            node_count, results = measure(source, path)
+        except (SyntaxError, ValueError):
+            continue
+
+        measured += 1
+
+        print('%s: %d bytes, %d nodes' % (path, len(source), node_count))
+        print('  %-28s %12s %10s' % ('', 'bytes', 'per node'))
+        for name in ['parse', 'parents', 'namespaces', 'parents + index', 'parents + transform index', 'parent attributes', 'minify peak']:
+            print('  %-28s %12d %10.1f' % (name, results[name], float(results[name]) / node_count))
+
+    if measured == 0:
+        sys.stderr.write('No python modules found in %s\n' % args.source)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Measure pyminify --jobs throughput
+
+A tree of source modules is minified in place with an increasing number of worker processes,
+and the files per second for each run is reported.
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import python_minifier
+
+
+def source_files(source_dir):
+    for root, _dirs, files in os.walk(source_dir):
+        for file in sorted(files):
+            if file.endswith('.py'):
+                yield os.path.join(root, file)
+
+
+def create_tree(source_dir, destination, count):
+    """
+    Create a tree of count modules by repeatedly copying the modules in source_dir
+    """
+
+    sources = list(source_files(source_dir))
+    if not sources:
+        raise ValueError('No python modules found in %s' % source_dir)
+
+    for i in range(count):
+        directory = os.path.join(destination, 'd%d' % (i // 100))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        shutil.copy(sources[i % len(sources)], os.path.join(directory, 'm%d.py' % i))
+
+
+def job_counts(max_jobs):
+    jobs = 1
+    while jobs < max_jobs:
+        yield jobs
+        jobs *= 2
+    yield max_jobs
+
+
+def run(source_dir, count, jobs):
+    destination = tempfile.mkdtemp()
+    try:
+        create_tree(source_dir, destination, count)
+
+        with open(os.devnull, 'w') as devnull:
+            start_time = time.time()
+            subprocess.check_call(
+                [sys.executable, '-m', 'python_minifier', destination, '--in-place', '--jobs', str(jobs)],
+                stdout=devnull
+            )
+            return time.time() - start_time
+    finally:
+        shutil.rmtree(destination)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pyminify --jobs throughput')
+    parser.add_argument('--source', default=os.path.dirname(python_minifier.__file__), help='Directory of modules to copy')
+    parser.add_argument('--files', type=int, default=1000, help='Number of modules to minify in each run')
+    parser.add_argument('--max-jobs', type=int, default=multiprocessing.cpu_count(), help='Largest number of worker processes')
+    args = parser.parse_args()
+
+    print('%8s %10s %12s %8s' % ('jobs', 'seconds', 'files/sec', 'speedup'))
+
+    baseline = None
+    for jobs in job_counts(args.max_jobs):
+        duration = run(args.source, args.files, jobs)
+        files_per_second = args.files / duration
+        if baseline is None:
+            baseline = files_per_second
+
+        print('%8d %10.2f %12.1f %7.2fx' % (jobs, duration, files_per_second, files_per_second / baseline))
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
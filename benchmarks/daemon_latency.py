@@ -0,0 +1,77 @@
+"""
+Compare the per-file latency of pyminify invocations with and without a server
+
+Each file is minified by a separate pyminify process, first cold and then using --connect
+to a server started with --serve.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import python_minifier
+
+
+def source_files(source_dir):
+    for root, _dirs, files in os.walk(source_dir):
+        for file in sorted(files):
+            if file.endswith('.py'):
+                yield os.path.join(root, file)
+
+
+def time_invocations(paths, extra_args):
+    durations = []
+
+    with open(os.devnull, 'w') as devnull:
+        for path in paths:
+            start_time = time.time()
+            subprocess.check_call([sys.executable, '-m', 'python_minifier', path] + extra_args, stdout=devnull)
+            durations.append(time.time() - start_time)
+
+    return durations
+
+
+def report(name, durations):
+    durations = sorted(durations)
+    mean = sum(durations) / len(durations)
+    median = durations[len(durations) // 2]
+    print('%-8s %10.1f %10.1f %10.1f' % (name, mean * 1000, median * 1000, durations[-1] * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pyminify --connect against cold invocations')
+    parser.add_argument('--source', default=os.path.dirname(python_minifier.__file__), help='Directory of modules to minify')
+    parser.add_argument('--files', type=int, default=50, help='Number of modules to minify')
+    args = parser.parse_args()
+
+    paths = list(source_files(args.source))[:args.files]
+
+    directory = tempfile.mkdtemp()
+    socket_path = os.path.join(directory, 'pyminify.sock')
+    server = subprocess.Popen([sys.executable, '-m', 'python_minifier', '--serve', socket_path])
+
+    try:
+        while not os.path.exists(socket_path):
+            time.sleep(0.05)
+
+        cold = time_invocations(paths, [])
+        # Warm up the server workers
+        time_invocations(paths[:1], ['--connect', socket_path])
+        connected = time_invocations(paths, ['--connect', socket_path])
+
+        print('Latency per file (ms) for %d files' % len(paths))
+        print('%-8s %10s %10s %10s' % ('', 'mean', 'median', 'max'))
+        report('cold', cold)
+        report('connect', connected)
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Measure binding and resolving names in a module with many global names
+
+A synthetic module is built with a number of distinct global names, each assigned and then referenced in a function.
+Other names in the module are builtins or are never bound. The time taken to bind and resolve the names in the module
+is reported for increasing numbers of names, along with the time to minify the whole module with rename_globals.
+"""
+
+import argparse
+import time
+
+import python_minifier
+import python_minifier.ast_compat as ast
+from python_minifier.ast_annotation import add_parent
+from python_minifier.rename import add_namespace, bind_names, resolve_names
+
+
+def many_globals(count):
+    """
+    The source of a module with count distinct global names
+    """
+
+    lines = []
+
+    for i in range(count):
+        lines.append('global_name_%d = %d' % (i, i))
+
+    lines.append('def use_globals():')
+    for i in range(count):
+        lines.append('    print(global_name_%d, unbound_name_%d)' % (i, i % 100))
+
+    return '\n'.join(lines) + '\n'
+
+
+def measure(source, repeat):
+    """
+    The best time of binding, resolving and minifying a module
+
+    :rtype: dict[str, float]
+    """
+
+    best = {}
+
+    def record(name, start_time):
+        elapsed = time.time() - start_time
+        best[name] = min(best.get(name, elapsed), elapsed)
+
+    for _ in range(repeat):
+        module = ast.parse(source)
+        add_parent(module)
+        add_namespace(module)
+
+        start_time = time.time()
+        bind_names(module)
+        record('bind_names', start_time)
+
+        start_time = time.time()
+        resolve_names(module)
+        record('resolve_names', start_time)
+
+        start_time = time.time()
+        python_minifier.minify(source, rename_globals=True)
+        record('minify', start_time)
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark binding and resolving many global names')
+    parser.add_argument('--names', type=int, default=20000, help='The largest number of global names to measure')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of times to measure each module')
+    args = parser.parse_args()
+
+    print('%10s %14s %14s %14s' % ('names', 'bind_names', 'resolve_names', 'minify'))
+
+    for divisor in [8, 4, 2, 1]:
+        count = args.names // divisor
+        best = measure(many_globals(count), args.repeat)
+        print('%10d %14.3f %14.3f %14.3f' % (count, best['bind_names'], best['resolve_names'], best['minify']))
+
+
+if __name__ == '__main__':
+    main()
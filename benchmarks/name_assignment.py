@@ -0,0 +1,95 @@
+"""
+Measure assigning new names to the bindings of large modules
+
+Synthetic modules with an increasing number of bindings are minified with rename_globals, and the time taken by the
+rename stage is reported. If assigning names scales linearly with the number of bindings, the time per binding stays
+the same as the modules get larger.
+
+The 'globals' modules have many global names referenced from one function. The 'functions' modules have many
+functions, each with its own local names and references to a few of the global names, so names are reused in sibling
+namespaces. The 'closures' modules have many functions that each contain deeply nested closures and comprehensions,
+that reference the function's arguments in the innermost namespace, and a global name in every namespace.
+"""
+
+import argparse
+
+import python_minifier
+from python_minifier.stats import MinifyStats
+
+
+def many_globals(count):
+    lines = ['global_name_%d = %d' % (i, i) for i in range(count)]
+
+    lines.append('def use_globals():')
+    for i in range(count):
+        lines.append('    print(global_name_%d)' % i)
+
+    return '\n'.join(lines) + '\n'
+
+
+def many_functions(count):
+    functions = count // 4
+    lines = ['global_name_%d = %d' % (i, i) for i in range(functions)]
+
+    for i in range(functions):
+        lines.append('def function_%d(first_arg, second_arg):' % i)
+        lines.append('    local_name = first_arg + second_arg + global_name_%d' % ((i * 7) % functions))
+        lines.append('    return local_name + global_name_%d' % ((i * 13) % functions))
+
+    return '\n'.join(lines) + '\n'
+
+
+def closures(count, depth=8):
+    functions = count // (depth + 4)
+    lines = ['global_name_%d = %d' % (i, i) for i in range(functions)]
+
+    for i in range(functions):
+        lines.append('def function_%d(first_arg, second_arg):' % i)
+        for level in range(depth):
+            lines.append('    ' * (level + 1) + 'def closure_%d():' % level)
+        indent = '    ' * (depth + 1)
+        lines.append(indent + 'return [first_arg + second_arg + item for item in [first_arg, second_arg, global_name_%d]]' % i)
+        for level in reversed(range(depth)):
+            lines.append('    ' * (level + 1) + 'return closure_%d, global_name_%d' % (level, i))
+
+    return '\n'.join(lines) + '\n'
+
+
+def measure(source, repeat):
+    """
+    The best time of the rename stage, and the counters from minifying the source
+
+    :rtype: tuple[float, dict[str, int]]
+    """
+
+    best = None
+    for _ in range(repeat):
+        stats = MinifyStats()
+        python_minifier.minify(source, rename_globals=True, stats=stats)
+
+        if best is None or stats.timings['rename'] < best:
+            best = stats.timings['rename']
+
+    return best, stats.counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark assigning new names to many bindings')
+    parser.add_argument('--bindings', type=int, default=16000, help='The largest number of bindings to measure')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of times to minify each module')
+    args = parser.parse_args()
+
+    print('%-10s %10s %10s %14s %14s' % ('module', 'bindings', 'rename', 'us per binding', 'names tried'))
+
+    for name, source_function in [('globals', many_globals), ('functions', many_functions), ('closures', closures)]:
+        for divisor in [8, 4, 2, 1]:
+            elapsed, counters = measure(source_function(args.bindings // divisor), args.repeat)
+            bindings = counters['bindings']
+
+            print('%-10s %10d %10.3f %14.1f %14d' % (
+                name, bindings, elapsed, elapsed * 1e6 / bindings, counters.get('names_tried', 0)
+            ))
+
+
+if __name__ == '__main__':
+    main()
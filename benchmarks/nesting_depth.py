@@ -0,0 +1,146 @@
+"""
+Measure the AST walks on deeply nested modules
+
+Synthetic modules are built with increasing nesting depth, and each of the whole-module walks is run on them in turn.
+The modules are built directly as ASTs, so they can be nested deeper than the python parser allows.
+The time taken by each walk is reported, or the error it raised.
+
+Minifying the source of each module is also measured, where the python parser can parse it.
+"""
+
+import argparse
+import sys
+import time
+import traceback
+
+import python_minifier
+import python_minifier.ast_compat as ast
+from python_minifier.ast_annotation import NodeIndex, add_parent
+from python_minifier.ast_compare import compare_ast
+from python_minifier.module_printer import ModulePrinter
+from python_minifier.rename import add_namespace, resolve_names
+from python_minifier.rename.renamer import add_assigned, all_bindings
+from python_minifier.transforms.remove_literal_statements import find_doc
+
+
+def elif_chain(depth):
+    """
+    if x == 0: a = 0
+    elif x == 1: a = 1
+    ...
+    """
+
+    def branch(i):
+        return ast.If(
+            test=ast.Compare(left=ast.Name(id='x', ctx=ast.Load()), ops=[ast.Eq()], comparators=[ast.Num(n=i)]),
+            body=[ast.Assign(targets=[ast.Name(id='a', ctx=ast.Store())], value=ast.Num(n=i))],
+            orelse=[]
+        )
+
+    root = node = branch(0)
+    for i in range(1, depth):
+        node.orelse = [branch(i)]
+        node = node.orelse[0]
+
+    return ast.Module(body=[root], type_ignores=[])
+
+
+def nested_dict(depth):
+    """
+    a = {'a': {'a': ... 1}}
+    """
+
+    value = ast.Num(n=1)
+    for _ in range(depth):
+        value = ast.Dict(keys=[ast.Str(s='a')], values=[value])
+
+    return ast.Module(body=[ast.Assign(targets=[ast.Name(id='a', ctx=ast.Store())], value=value)], type_ignores=[])
+
+
+def binop_chain(depth):
+    """
+    a = b + b + ... + b
+    """
+
+    value = ast.Name(id='b', ctx=ast.Load())
+    for _ in range(depth):
+        value = ast.BinOp(left=value, op=ast.Add(), right=ast.Name(id='b', ctx=ast.Load()))
+
+    return ast.Module(body=[ast.Assign(targets=[ast.Name(id='a', ctx=ast.Store())], value=value)], type_ignores=[])
+
+
+SHAPES = {
+    'elif': (elif_chain, lambda depth: ''.join(['if x == 0:\n a = 0\n'] + ['elif x == %d:\n a = %d\n' % (i, i) for i in range(1, depth)])),
+    'dict': (nested_dict, lambda depth: 'a = ' + '{"a": ' * depth + '1' + '}' * depth + '\n'),
+    'binop': (binop_chain, lambda depth: 'a = b' + ' + b' * depth + '\n'),
+}
+
+
+def walks(build, depth):
+    """
+    The walks to measure, as (name, function) pairs. Each walk depends on the ones before it.
+    """
+
+    module = build(depth)
+
+    return [
+        ('add_parent', lambda: add_parent(module, index=NodeIndex())),
+        ('add_namespace', lambda: add_namespace(module)),
+        ('resolve_names', lambda: resolve_names(module)),
+        ('add_assigned', lambda: add_assigned(module)),
+        ('all_bindings', lambda: sum(1 for _ in all_bindings(module))),
+        ('find_doc', lambda: find_doc(module)),
+        ('compare_ast', lambda: compare_ast(module, build(depth))),
+        ('print', lambda: ModulePrinter()(module)),
+    ]
+
+
+def describe(exception):
+    if isinstance(exception, RecursionError if sys.version_info >= (3, 5) else RuntimeError):
+        # Report the function that appears most often in the traceback
+        counts = {}
+        for frame in traceback.extract_tb(sys.exc_info()[2]):
+            counts[frame[2]] = counts.get(frame[2], 0) + 1
+        return 'RecursionError in %s' % max(counts, key=counts.get)
+
+    message = str(exception).splitlines()
+    return '%s: %s' % (exception.__class__.__name__, message[0] if message else '')
+
+
+def measure(function):
+    start_time = time.time()
+    try:
+        function()
+        result = 'ok'
+    except Exception as e:
+        result = describe(e)
+    return time.time() - start_time, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the AST walks on deeply nested modules')
+    parser.add_argument('--depth', type=int, action='append', help='Nesting depth to measure. May be given more than once')
+    parser.add_argument('--shape', choices=sorted(SHAPES), action='append', help='Shape of nesting to measure. May be given more than once')
+    args = parser.parse_args()
+
+    depths = args.depth or [1000, 10000, 100000]
+    shapes = args.shape or sorted(SHAPES)
+
+    print('recursion limit %d' % sys.getrecursionlimit())
+    print('%-6s %8s %-14s %10s  %s' % ('shape', 'depth', 'walk', 'seconds', 'result'))
+
+    for shape in shapes:
+        build, source = SHAPES[shape]
+
+        for depth in depths:
+            for name, walk in walks(build, depth):
+                duration, result = measure(walk)
+                print('%-6s %8d %-14s %10.3f  %s' % (shape, depth, name, duration, result))
+
+            duration, result = measure(lambda: python_minifier.minify(source(depth)))
+            print('%-6s %8d %-14s %10.3f  %s' % (shape, depth, 'minify', duration, result))
+            sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
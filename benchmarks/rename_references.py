@@ -0,0 +1,94 @@
+"""
+Measure renaming a module with heavily referenced names
+
+A synthetic module is built with a number of global names and function arguments, each referenced many times.
+The names in the module are bound and resolved, and then the time taken by :func:`python_minifier.rename.rename` to
+assign new names to every binding is reported for an increasing number of references to each name. The time taken
+to calculate the cost of renaming every binding, as used when sorting bindings and deciding whether to rename them,
+is also reported.
+"""
+
+import argparse
+import time
+
+import python_minifier.ast_compat as ast
+from python_minifier.ast_annotation import add_parent
+from python_minifier.rename import (
+    add_namespace,
+    allow_rename_globals,
+    allow_rename_locals,
+    bind_names,
+    rename,
+    resolve_names
+)
+from python_minifier.rename.renamer import all_bindings
+
+
+def heavily_referenced(names, references):
+    lines = ['global_name_%d = %d' % (i, i) for i in range(names)]
+
+    for i in range(names):
+        lines.append('def function_%d(argument_name, *args, **kwargs):' % i)
+        for _ in range(references):
+            lines.append('    argument_name(global_name_%d, args, kwargs)' % i)
+
+    return '\n'.join(lines) + '\n'
+
+
+def prepare(source):
+    module = ast.parse(source)
+    add_parent(module)
+    add_namespace(module)
+    bind_names(module)
+    resolve_names(module)
+    allow_rename_locals(module, True, [])
+    allow_rename_globals(module, True, [])
+    return module
+
+
+def rename_costs(bindings):
+    for binding in bindings:
+        binding.new_mention_count()
+        binding.should_rename('a')
+
+
+def measure(source, repeat):
+    """
+    The best time to calculate the cost of renaming the bindings of the module, and to rename them
+
+    :rtype: tuple[float, float]
+    """
+
+    best_costs = best_rename = None
+    for _ in range(repeat):
+        module = prepare(source)
+        bindings = [binding for _namespace, binding in all_bindings(module)]
+
+        start_time = time.time()
+        rename_costs(bindings)
+        elapsed = time.time() - start_time
+        best_costs = elapsed if best_costs is None else min(best_costs, elapsed)
+
+        start_time = time.time()
+        rename(module)
+        elapsed = time.time() - start_time
+        best_rename = elapsed if best_rename is None else min(best_rename, elapsed)
+
+    return best_costs, best_rename
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark renaming heavily referenced names')
+    parser.add_argument('--names', type=int, default=500, help='Number of global names and functions')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of times to rename each module')
+    args = parser.parse_args()
+
+    print('%12s %12s %10s %10s' % ('names', 'references', 'costs', 'rename'))
+
+    for references in [1, 10, 100]:
+        costs, elapsed = measure(heavily_referenced(args.names, references), args.repeat)
+        print('%12d %12d %10.4f %10.3f' % (args.names, references, costs, elapsed))
+
+
+if __name__ == '__main__':
+    main()
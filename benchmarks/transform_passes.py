@@ -0,0 +1,136 @@
+"""
+Measure applying the transforms in a single traversal
+
+Each module in a directory of source modules is transformed twice - once by applying each transform
+in turn, and once by applying all the transforms together with a FusedTransformer.
+The total time spent in the transforms is reported, and the printed modules are checked to be identical.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import python_minifier
+import python_minifier.ast_compat as ast
+from python_minifier import RemoveAnnotationsOptions
+from python_minifier.ast_annotation import NodeIndex, add_parent
+from python_minifier.module_printer import ModulePrinter
+from python_minifier.rename import add_namespace
+from python_minifier.transforms.combine_imports import CombineImports
+from python_minifier.transforms.constant_folding import FoldConstants
+from python_minifier.transforms.remove_annotations import RemoveAnnotations
+from python_minifier.transforms.remove_asserts import RemoveAsserts
+from python_minifier.transforms.remove_debug import RemoveDebug
+from python_minifier.transforms.remove_explicit_return_none import RemoveExplicitReturnNone
+from python_minifier.transforms.remove_literal_statements import RemoveLiteralStatements
+from python_minifier.transforms.remove_object_base import RemoveObject
+from python_minifier.transforms.remove_pass import RemovePass
+from python_minifier.transforms.suite_transformer import FusedTransformer
+
+
+def source_files(source_dir):
+    for root, _dirs, files in os.walk(source_dir):
+        for file in sorted(files):
+            if file.endswith('.py'):
+                yield os.path.join(root, file)
+
+
+def all_transforms():
+    return [
+        RemoveLiteralStatements(),
+        CombineImports(),
+        RemoveAnnotations(RemoveAnnotationsOptions(remove_class_attribute_annotations=True)),
+        RemovePass(),
+        RemoveObject(),
+        RemoveAsserts(),
+        RemoveDebug(),
+        RemoveExplicitReturnNone(),
+        FoldConstants(),
+    ]
+
+
+def prepare(source, filename):
+    module = ast.parse(source, filename)
+    add_parent(module, index=NodeIndex())
+    add_namespace(module)
+    return module
+
+
+def in_turn(module):
+    for transform in all_transforms():
+        module = transform(module)
+    return module
+
+
+def fused(module):
+    return FusedTransformer(all_transforms())(module)
+
+
+def run(sources, apply):
+    """
+    Transform each module, returning the total time spent in apply and the printed modules
+    """
+
+    duration = 0
+    printed = []
+
+    for filename, source in sources:
+        module = prepare(source, filename)
+
+        start_time = time.time()
+        module = apply(module)
+        duration += time.time() - start_time
+
+        printer = ModulePrinter()
+        printer(module)
+        printed.append(printer.code)
+
+    return duration, printed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark applying the transforms in a single traversal')
+    parser.add_argument('--source', default=os.path.dirname(python_minifier.__file__), help='Directory of modules to transform')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of times to transform each module')
+    args = parser.parse_args()
+
+    sources = []
+    for path in source_files(args.source):
+        with open(path, 'rb') as f:
+            source = f.read()
+
+        try:
+            prepare(source, path)
+        except (SyntaxError, ValueError):
+            continue
+
+        sources.append((path, source))
+
+    if not sources:
+        sys.stderr.write('No python modules found in %s\n' % args.source)
+        sys.exit(1)
+
+    in_turn_time = 0
+    fused_time = 0
+
+    for _ in range(args.repeat):
+        duration, in_turn_printed = run(sources, in_turn)
+        in_turn_time += duration
+
+        duration, fused_printed = run(sources, fused)
+        fused_time += duration
+
+        if in_turn_printed != fused_printed:
+            sys.stderr.write('Transformed modules are different\n')
+            sys.exit(1)
+
+    print('%d modules, %d repeats' % (len(sources), args.repeat))
+    print('%-10s %10s' % ('', 'seconds'))
+    print('%-10s %10.3f' % ('in turn', in_turn_time))
+    print('%-10s %10.3f' % ('fused', fused_time))
+    print('speedup %.2fx' % (in_turn_time / fused_time))
+
+
+if __name__ == '__main__':
+    main()
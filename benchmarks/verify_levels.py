@@ -0,0 +1,118 @@
+"""
+Measure the cost of each verification level of unparse()
+
+Each module in a directory of source modules is parsed and printed with every verification level.
+The total time spent in the verify stage is reported for each level. For reference, parsing the printed
+modules and the node by node comparison that compare_ast only uses to describe a difference are also timed
+on their own.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import python_minifier
+import python_minifier.ast_compat as ast
+from python_minifier import VERIFY_LEVELS, MinifyStats, unparse
+from python_minifier.ast_compare import _compare
+from python_minifier.stats import collect
+
+
+def source_files(source_dir):
+    for root, _dirs, files in os.walk(source_dir):
+        for file in sorted(files):
+            if file.endswith('.py'):
+                yield os.path.join(root, file)
+
+
+def verify_time(modules, verify):
+    """
+    The total time spent in the verify stage of unparse for every module
+    """
+
+    duration = 0
+
+    for module in modules:
+        stats = MinifyStats()
+        with collect(stats):
+            unparse(module, verify=verify, verify_sample_rate=0.1)
+        duration += stats.timings.get('verify', 0)
+
+    return duration
+
+
+def parse_time(modules):
+    """
+    The total time spent parsing the printed modules, which every verification level except off includes
+    """
+
+    duration = 0
+
+    for module in modules:
+        code = unparse(module, verify='off')
+
+        start_time = time.time()
+        ast.parse(code)
+        duration += time.time() - start_time
+
+    return duration
+
+
+def node_compare_time(modules):
+    """
+    The total time spent comparing every module node by node with a parsed copy of itself
+    """
+
+    duration = 0
+
+    for module in modules:
+        parsed = ast.parse(unparse(module, verify='off'))
+
+        start_time = time.time()
+        _compare(module, parsed)
+        duration += time.time() - start_time
+
+    return duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the verification levels of unparse()')
+    parser.add_argument('--source', default=os.path.dirname(python_minifier.__file__), help='Directory of modules to print')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of times to print each module')
+    args = parser.parse_args()
+
+    modules = []
+    for path in source_files(args.source):
+        with open(path, 'rb') as f:
+            source = f.read()
+
+        try:
+            modules.append(ast.parse(source, path))
+        except (SyntaxError, ValueError):
+            continue
+
+    if not modules:
+        sys.stderr.write('No python modules found in %s\n' % args.source)
+        sys.exit(1)
+
+    timings = dict((verify, 0) for verify in VERIFY_LEVELS)
+    parse = 0
+    node_compare = 0
+
+    for _ in range(args.repeat):
+        for verify in VERIFY_LEVELS:
+            timings[verify] += verify_time(modules, verify)
+        parse += parse_time(modules)
+        node_compare += node_compare_time(modules)
+
+    print('%d modules, %d repeats' % (len(modules), args.repeat))
+    print('%-16s %10s' % ('verify', 'seconds'))
+    for verify in VERIFY_LEVELS:
+        print('%-16s %10.3f' % (verify, timings[verify]))
+    print('%-16s %10.3f' % ('parse only', parse))
+    print('%-16s %10.3f' % ('node by node', node_compare))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,34 +4,53 @@ a 'minified' representation of the same source code.
 
 """
 
+import multiprocessing
+import multiprocessing.pool
+import pickle
+import random
 import re
+import sys
+
+try:
+    import queue
+except ImportError:
+    # Python 2
+    import Queue as queue  # type: ignore
 
 import python_minifier.ast_compat as ast
-from python_minifier.ast_annotation import add_parent
-
-from python_minifier.ast_compare import CompareError, compare_ast
-from python_minifier.module_printer import ModulePrinter
-from python_minifier.rename import (
-    add_namespace,
-    allow_rename_globals,
-    allow_rename_locals,
-    bind_names,
-    rename,
-    rename_literals,
-    resolve_names
-)
-from python_minifier.transforms.combine_imports import CombineImports
-from python_minifier.transforms.constant_folding import FoldConstants
-from python_minifier.transforms.remove_annotations import RemoveAnnotations
+from python_minifier.ast_annotation import Annotations, NodeIndex, add_parent, get_scope
+
+from python_minifier.ast_compare import CompareError, compare_ast, structural_fingerprint
+from python_minifier.bytecode import CompileOptions
+from python_minifier.deadline import TimeBudgetExceeded, after, limit, remaining
+from python_minifier.deadline import check as check_deadline
+from python_minifier.stats import MinifyStats, collect, stage
 from python_minifier.transforms.remove_annotations_options import RemoveAnnotationsOptions
-from python_minifier.transforms.remove_asserts import RemoveAsserts
-from python_minifier.transforms.remove_debug import RemoveDebug
-from python_minifier.transforms.remove_exception_brackets import remove_no_arg_exception_call
-from python_minifier.transforms.remove_explicit_return_none import RemoveExplicitReturnNone
-from python_minifier.transforms.remove_literal_statements import RemoveLiteralStatements
-from python_minifier.transforms.remove_object_base import RemoveObject
-from python_minifier.transforms.remove_pass import RemovePass
-from python_minifier.transforms.remove_posargs import remove_posargs
+from python_minifier.util import copy_ast
+
+VERIFY_LEVELS = ('full', 'structural-hash', 'sampled', 'off')
+
+# The cheaper options to fall back to in turn when a module can't be minified within its time budget
+DEFAULT_FALLBACKS = (
+    {'hoist_literals': False},
+    {'hoist_literals': False, 'rename_locals': False, 'rename_globals': False},
+    {
+        'remove_annotations': False,
+        'remove_pass': False,
+        'remove_literal_statements': False,
+        'combine_imports': False,
+        'hoist_literals': False,
+        'rename_locals': False,
+        'rename_globals': False,
+        'remove_object_base': False,
+        'convert_posargs_to_args': False,
+        'remove_asserts': False,
+        'remove_debug': False,
+        'remove_explicit_return_none': False,
+        'remove_builtin_exception_brackets': False,
+        'constant_folding': False,
+    },
+)
 
 
 class UnstableMinification(RuntimeError):
@@ -72,7 +91,14 @@ def minify(
     remove_debug=False,
     remove_explicit_return_none=True,
     remove_builtin_exception_brackets=True,
-    constant_folding=True
+    constant_folding=True,
+    verify='full',
+    verify_sample_rate=0.1,
+    mutate_module=False,
+    time_budget=None,
+    fallbacks=None,
+    shebang=None,
+    stats=None
 ):
     """
     Minify a python module
@@ -83,7 +109,13 @@ def minify(
 
     Using the default arguments only transformations that are always or almost always safe are enabled.
 
-    :param str source: The python module source code
+    The source may be a module that has already been parsed with :func:`ast.parse`, in which case it is not parsed
+    again. The module is copied before it is transformed, unless mutate_module is True.
+
+    To minify many modules with the same options, create a :class:`Minifier` once and use that instead.
+
+    :param source: The python module source code, or the parsed module
+    :type source: str or bytes or ast.Module
     :param str filename: The original source filename if known
 
     :param remove_annotations: Configures the removal of type annotations. True removes all annotations, False removes none.
@@ -107,99 +139,634 @@ def minify(
     :param bool remove_explicit_return_none: If explicit return None statements should be replaced with a bare return
     :param bool remove_builtin_exception_brackets: If brackets should be removed when raising exceptions with no arguments
     :param bool constant_folding: If literal expressions should be evaluated
+    :param str verify: How the minified module is checked to be the same as the transformed module.
+        One of 'full', 'structural-hash', 'sampled' or 'off'. See :func:`unparse`.
+    :param float verify_sample_rate: The fraction of modules that are verified when verify is 'sampled'
+    :param bool mutate_module: If a parsed module given as the source may be transformed in place, instead of a copy
+    :param time_budget: The time in seconds that minifying the module may take, shared by every set of options that
+        is tried. Each set of options except the last gets an equal part of the time that is left. When that is
+        exceeded, the module is minified again with the next set of options from fallbacks. The last set of options
+        runs without a time limit, so a result is always returned. None for no time limit.
+    :type time_budget: float or None
+    :param fallbacks: The cheaper options to try in turn when the time budget is exceeded. Each item is a dict of the
+        options to change. Defaults to DEFAULT_FALLBACKS, which disables hoisting literals, then renaming, then every
+        transform. The number of fallbacks that were used is recorded in the fallback_level counter of stats.
+    :type fallbacks: list[dict] or None
+    :param shebang: The shebang line to add to the output when the source is a parsed module and preserve_shebang is True
+    :type shebang: str or None
+    :param stats: A collector for the timings and counters of each stage of minification, if they are wanted
+    :type stats: MinifyStats or None
 
     :rtype: str
 
     """
 
-    filename = filename or 'python_minifier.minify source'
+    minifier = Minifier(
+        remove_annotations=remove_annotations,
+        remove_pass=remove_pass,
+        remove_literal_statements=remove_literal_statements,
+        combine_imports=combine_imports,
+        hoist_literals=hoist_literals,
+        rename_locals=rename_locals,
+        preserve_locals=preserve_locals,
+        rename_globals=rename_globals,
+        preserve_globals=preserve_globals,
+        remove_object_base=remove_object_base,
+        convert_posargs_to_args=convert_posargs_to_args,
+        preserve_shebang=preserve_shebang,
+        remove_asserts=remove_asserts,
+        remove_debug=remove_debug,
+        remove_explicit_return_none=remove_explicit_return_none,
+        remove_builtin_exception_brackets=remove_builtin_exception_brackets,
+        constant_folding=constant_folding,
+        verify=verify,
+        verify_sample_rate=verify_sample_rate,
+        mutate_module=mutate_module,
+        time_budget=time_budget,
+        fallbacks=fallbacks
+    )
+
+    return minifier.minify(source, filename, shebang=shebang, stats=stats)
+
+
+class Minifier(object):
+    """
+    Minify python modules with a fixed set of options
+
+    The options are the same as for :func:`minify`. They are validated when the Minifier is created, and the work
+    that only depends on the options is done once instead of for every module.
+
+    A Minifier is not changed by minifying a module, so one instance can be shared by many threads.
+
+    >>> minifier = Minifier(rename_globals=True, remove_literal_statements=True)
+    >>> minifier.minify('a_long_name = 1')
+    'A=1'
+
+    The time budget starts when minify is called, and is checked between the stages of minification and in the loops
+    that can take a long time for unusual modules. When it is exceeded the module is minified again from the parsed
+    module with the next set of options from fallbacks, which are created with the Minifier. Each set of options gets
+    an equal part of the time that is left, and the last set of options always runs to completion.
+
+    :raises TypeError: If remove_annotations is not a bool or RemoveAnnotationsOptions
+    :raises ValueError: If verify, verify_sample_rate, time_budget or fallbacks are not valid
+
+    """
+
+    def __init__(
+        self,
+        remove_annotations=RemoveAnnotationsOptions(),
+        remove_pass=True,
+        remove_literal_statements=False,
+        combine_imports=True,
+        hoist_literals=True,
+        rename_locals=True,
+        preserve_locals=None,
+        rename_globals=False,
+        preserve_globals=None,
+        remove_object_base=True,
+        convert_posargs_to_args=True,
+        preserve_shebang=True,
+        remove_asserts=False,
+        remove_debug=False,
+        remove_explicit_return_none=True,
+        remove_builtin_exception_brackets=True,
+        constant_folding=True,
+        verify='full',
+        verify_sample_rate=0.1,
+        mutate_module=False,
+        time_budget=None,
+        fallbacks=None
+    ):
+        # The fallback levels are created from these options
+        options = dict(locals())
+        del options['self']
+        self._options = options
+
+        # The rename package must be imported before the transforms, which depend on it
+        import python_minifier.rename
+        from python_minifier.transforms.combine_imports import CombineImports
+        from python_minifier.transforms.constant_folding import FoldConstants
+        from python_minifier.transforms.remove_annotations import RemoveAnnotations
+        from python_minifier.transforms.remove_asserts import RemoveAsserts
+        from python_minifier.transforms.remove_debug import RemoveDebug
+        from python_minifier.transforms.remove_explicit_return_none import RemoveExplicitReturnNone
+        from python_minifier.transforms.remove_literal_statements import RemoveLiteralStatements
+        from python_minifier.transforms.remove_object_base import RemoveObject
+        from python_minifier.transforms.remove_pass import RemovePass
+
+        remove_annotations = _remove_annotations_options(remove_annotations)
+        _check_verify(verify, verify_sample_rate)
+
+        self.remove_annotations = remove_annotations
+        self.hoist_literals = hoist_literals
+        self.rename_locals = rename_locals
+        self.preserve_locals = tuple(_name_list(preserve_locals))
+        self.rename_globals = rename_globals
+        self.preserve_globals = tuple(_name_list(preserve_globals))
+        self.convert_posargs_to_args = convert_posargs_to_args
+        self.preserve_shebang = preserve_shebang
+        self.remove_builtin_exception_brackets = remove_builtin_exception_brackets
+        self.verify = verify
+        self.verify_sample_rate = verify_sample_rate
+        self.mutate_module = mutate_module
+        self.time_budget = time_budget
+
+        if time_budget is not None and not time_budget > 0:
+            raise ValueError('time_budget must be greater than 0')
+
+        if fallbacks is None:
+            fallbacks = DEFAULT_FALLBACKS
+
+        self._fallbacks = ()
+        if time_budget is not None:
+            fallback_minifiers = []
+            for level in fallbacks:
+                if 'time_budget' in level or 'fallbacks' in level:
+                    raise ValueError('A fallback level can\'t change the time budget or fallbacks')
+
+                fallback_minifiers.append(Minifier(**dict(options, time_budget=None, **level)))
+            self._fallbacks = tuple(fallback_minifiers)
+
+        # Transformers keep state while they are applied, so new instances are created for each module.
+        # These are the (transformer class, arguments) pairs of the enabled transforms, in the order they are applied.
+        transforms = []
+
+        if remove_literal_statements:
+            transforms.append((RemoveLiteralStatements, ()))
+
+        if combine_imports:
+            transforms.append((CombineImports, ()))
+
+        if remove_annotations:
+            transforms.append((RemoveAnnotations, (remove_annotations,)))
+
+        if remove_pass:
+            transforms.append((RemovePass, ()))
+
+        if remove_object_base:
+            transforms.append((RemoveObject, ()))
+
+        if remove_asserts:
+            transforms.append((RemoveAsserts, ()))
+
+        if remove_debug:
+            transforms.append((RemoveDebug, ()))
+
+        if remove_explicit_return_none:
+            transforms.append((RemoveExplicitReturnNone, ()))
+
+        if constant_folding:
+            transforms.append((FoldConstants, ()))
+
+        self._transforms = tuple(transforms)
+
+        # Only the node types the transforms look for are indexed
+        self._indexed_node_types = frozenset()
+        for transform, _args in self._transforms:
+            if transform.node_types is None:
+                self._indexed_node_types = None
+                break
+            self._indexed_node_types |= frozenset(transform.node_types)
+
+    def minify(self, source, filename=None, shebang=None, stats=None):
+        """
+        Minify a python module
+
+        :param source: The python module source code, or the parsed module
+        :type source: str or bytes or ast.Module
+        :param str filename: The original source filename if known
+        :param shebang: The shebang line to add to the output when the source is a parsed module and preserve_shebang is True
+        :type shebang: str or None
+        :param stats: A collector for the timings and counters of each stage of minification, if they are wanted
+        :type stats: MinifyStats or None
+        :rtype: str
+
+        """
+
+        filename = filename or 'python_minifier.minify source'
+
+        is_module = isinstance(source, ast.Module)
+        if shebang is not None and not is_module:
+            raise ValueError('shebang can only be given when the source is a parsed module')
+
+        # The minifiers to try in turn, until one finishes within the time budget
+        levels = (self,) + self._fallbacks
+
+        # Every level shares the same budget, starting from now
+        deadline = after(self.time_budget) if self.time_budget is not None else None
+
+        with collect(stats), stage('total'):
+
+            if is_module:
+                parsed = source
+                owned = self.mutate_module
+            else:
+                # This will raise if the source file can't be parsed
+                with stage('parse'):
+                    parsed = ast.parse(source, filename)
+                owned = True
+
+            for level, minifier in enumerate(levels):
+                last_level = level == len(levels) - 1
+
+                if last_level:
+                    # The last level always finishes, so there is always a result
+                    seconds = None
+                else:
+                    # The time left is shared by the levels that have a time limit
+                    seconds = remaining(deadline) / (len(levels) - 1 - level)
+                    if seconds <= 0:
+                        continue
+
+                if owned and last_level:
+                    module = parsed
+                else:
+                    # An attempt that runs out of time leaves the module partly transformed
+                    with stage('copy'):
+                        module = copy_ast(parsed)
+
+                if stats is not None:
+                    stats.counters['fallback_level'] = level
+
+                try:
+                    # The annotations of the module are discarded when the attempt ends
+                    with limit(seconds), Annotations():
+                        minified = minifier._minify(module, stats)
+                    break
+                except TimeBudgetExceeded:
+                    pass
+
+        if self.preserve_shebang is True:
+            shebang_line = shebang if is_module else _find_shebang(source)
+            if shebang_line is not None:
+                return shebang_line + '\n' + minified
+
+        return minified
+
+    def _minify(self, module, stats):
+        """
+        Minify a parsed module, which is transformed in place
+
+        :param module: The module to minify
+        :type module: ast.Module
+        :param stats: The active stats collector
+        :type stats: MinifyStats or None
+        :rtype: str
+
+        """
+
+        # The transforms are imported when first used, so that importing the package is fast
+        from python_minifier.rename import (
+            add_namespace,
+            allow_rename_globals,
+            allow_rename_locals,
+            bind_names,
+            rename,
+            rename_literals,
+            resolve_names
+        )
+        from python_minifier.rename.renamer import all_bindings
+        from python_minifier.transforms.remove_exception_brackets import remove_no_arg_exception_call
+        from python_minifier.transforms.remove_posargs import remove_posargs
+        from python_minifier.transforms.suite_transformer import FusedTransformer
+
+        if stats is not None:
+            stats.counters['nodes'] = sum(1 for _ in ast.walk(module))
+
+        with stage('annotate'):
+            add_parent(module, index=NodeIndex(self._indexed_node_types))
+            add_namespace(module)
+
+        transforms = [transform(*args) for transform, args in self._transforms]
+
+        # The transforms are applied together in a single traversal of the module
+        check_deadline()
+        with stage('transforms'):
+            module = FusedTransformer(transforms)(module)
+
+        check_deadline()
+        with stage('bind_names'):
+            bind_names(module)
+
+        with stage('resolve_names'):
+            resolve_names(module)
+
+        module_scope = get_scope(module)
 
-    # This will raise if the source file can't be parsed
-    module = ast.parse(source, filename)
+        if self.remove_builtin_exception_brackets and not module_scope.tainted:
+            with stage('remove_builtin_exception_brackets'):
+                remove_no_arg_exception_call(module)
 
-    add_parent(module)
-    add_namespace(module)
+        rename_locals = self.rename_locals and not module_scope.tainted
+        rename_globals = self.rename_globals and not module_scope.tainted
 
-    if remove_literal_statements:
-        module = RemoveLiteralStatements()(module)
+        # These lists are extended with names found in the module
+        preserve_locals = list(self.preserve_locals) + list(module_scope.preserved)
+        preserve_globals = list(self.preserve_globals) + list(module_scope.preserved)
 
-    if combine_imports:
-        module = CombineImports()(module)
+        check_deadline()
+        with stage('rename'):
+            allow_rename_locals(module, rename_locals, preserve_locals)
+            allow_rename_globals(module, rename_globals, preserve_globals)
+
+            if self.hoist_literals:
+                rename_literals(module)
+
+            if stats is not None:
+                stats.counters['bindings'] = sum(1 for _ in all_bindings(module))
+
+            rename(module, prefix_globals=not rename_globals, preserved_globals=preserve_globals)
+
+        if self.convert_posargs_to_args:
+            with stage('convert_posargs_to_args'):
+                module = remove_posargs(module)
+
+        check_deadline()
+        return unparse(module, self.verify, self.verify_sample_rate)
+
+    def minify_many(self, sources, workers=None, pool='process', compile=None):
+        """
+        Minify many python modules in parallel
+
+        This is the same as :func:`minify_many`, using the options of this Minifier.
+
+        :param sources: The modules to minify, as (name, source) pairs. The name is used as the filename.
+        :type sources: Iterable[tuple[str, str or bytes or ast.Module]]
+        :param workers: The number of workers in the pool. Defaults to the number of CPUs.
+        :type workers: int or None
+        :param str pool: The type of pool to use, either 'process' or 'thread'
+        :param compile: Also compile each minified module to bytecode. True uses the default :class:`CompileOptions`.
+        :type compile: bool or CompileOptions or None
+        :rtype: Iterable[tuple[str, str or tuple[str, bytes] or Exception]]
+
+        """
+
+        if pool not in ('process', 'thread'):
+            raise ValueError('pool must be \'process\' or \'thread\'')
+
+        if compile is True:
+            compile = CompileOptions()
+        elif compile is False:
+            compile = None
+        elif compile is not None and not isinstance(compile, CompileOptions):
+            raise TypeError('compile must be a bool or CompileOptions')
+
+        if compile is not None and compile.invalidation_mode == 'timestamp':
+            raise ValueError('minify_many can only create hash based .pyc files')
+
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+
+        return _minify_many(sources, workers, pool, self, compile)
+
+    def minify_package(self, modules, workers=None, pool='process'):
+        """
+        Minify the modules of a self-contained package in parallel
+
+        This is the same as :func:`minify_package`, using the options of this Minifier.
+
+        :param modules: The modules of the package, as (path, source) pairs
+        :type modules: Iterable[tuple[str, str or bytes or ast.Module]]
+        :param workers: The number of workers in the pool. Defaults to the number of CPUs.
+        :type workers: int or None
+        :param str pool: The type of pool to use, either 'process' or 'thread'
+        :rtype: list[tuple[str, str]]
+
+        """
+
+        from python_minifier.package import minify_package
+
+        if pool not in ('process', 'thread'):
+            raise ValueError('pool must be \'process\' or \'thread\'')
+
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+
+        return minify_package(modules, self, workers, pool)
+
+
+def _remove_annotations_options(remove_annotations):
+    """
+    Get the RemoveAnnotationsOptions for a remove_annotations argument
+
+    :param remove_annotations: The remove_annotations argument to minify
+    :type remove_annotations: bool or RemoveAnnotationsOptions
+    :rtype: RemoveAnnotationsOptions
+    """
 
     if isinstance(remove_annotations, bool):
-        remove_annotations_options = RemoveAnnotationsOptions(
+        return RemoveAnnotationsOptions(
             remove_variable_annotations=remove_annotations,
             remove_return_annotations=remove_annotations,
             remove_argument_annotations=remove_annotations,
             remove_class_attribute_annotations=remove_annotations,
         )
     elif isinstance(remove_annotations, RemoveAnnotationsOptions):
-        remove_annotations_options = remove_annotations
+        return remove_annotations
     else:
         raise TypeError('remove_annotations must be a bool or RemoveAnnotationsOptions')
 
-    if remove_annotations_options:
-        module = RemoveAnnotations(remove_annotations_options)(module)
 
-    if remove_pass:
-        module = RemovePass()(module)
+def _check_verify(verify, verify_sample_rate):
+    """
+    Check the verify and verify_sample_rate arguments are valid
 
-    if remove_object_base:
-        module = RemoveObject()(module)
+    :raises ValueError: If either argument is invalid
+    """
 
-    if remove_asserts:
-        module = RemoveAsserts()(module)
+    if verify not in VERIFY_LEVELS:
+        raise ValueError('verify must be one of ' + ', '.join(repr(level) for level in VERIFY_LEVELS))
 
-    if remove_debug:
-        module = RemoveDebug()(module)
+    if not 0 <= verify_sample_rate <= 1:
+        raise ValueError('verify_sample_rate must be between 0 and 1')
 
-    if remove_explicit_return_none:
-        module = RemoveExplicitReturnNone()(module)
 
-    if constant_folding:
-        module = FoldConstants()(module)
+def _name_list(names):
+    """
+    Get a new list of names from a preserve_locals or preserve_globals argument
 
-    bind_names(module)
-    resolve_names(module)
+    :param names: A name or list of names
+    :type names: str or list[str] or None
+    :rtype: list[str]
+    """
 
-    if remove_builtin_exception_brackets and not module.tainted:
-        remove_no_arg_exception_call(module)
+    if names is None:
+        return []
+    elif isinstance(names, str):
+        return [names]
+    return list(names)
 
-    if module.tainted:
-        rename_globals = False
-        rename_locals = False
 
-    if preserve_locals is None:
-        preserve_locals = []
-    elif isinstance(preserve_locals, str):
-        preserve_locals = [preserve_locals]
-    if preserve_globals is None:
-        preserve_globals = []
-    elif isinstance(preserve_globals, str):
-        preserve_globals = [preserve_globals]
+def minify_many(sources, workers=None, pool='process', compile=None, **options):
+    """
+    Minify many python modules in parallel
+
+    Modules are minified by a pool of worker processes or threads, and the results are yielded in the order
+    they complete. The number of modules waiting to be minified is bounded, so sources may be a lazy iterable.
+
+    The minification options are the same as for :func:`minify`, and are validated once before any module is minified.
+
+    >>> for name, result in minify_many([('a.py', 'a = 1'), ('b.py', 'b = 2')], rename_globals=True):
+    ...     print(name, result)
+
+    :param sources: The modules to minify, as (name, source) pairs. The name is used as the filename.
+    :type sources: Iterable[tuple[str, str or bytes or ast.Module]]
+    :param workers: The number of workers in the pool. Defaults to the number of CPUs.
+    :type workers: int or None
+    :param str pool: The type of pool to use, either 'process' or 'thread'
+    :param compile: Also compile each minified module to bytecode. True uses the default :class:`CompileOptions`.
+        The module is compiled from the minified source encoded as UTF-8, and must use hash based invalidation.
+    :type compile: bool or CompileOptions or None
+    :param options: Minification options, as accepted by :func:`minify`
+    :return: (name, result) pairs, where the result is the minified module or the exception raised when minifying it.
+        When compile is used, a successful result is a (minified module, .pyc file content) pair.
+    :rtype: Iterable[tuple[str, str or tuple[str, bytes] or Exception]]
+
+    """
+
+    for option in options:
+        if option not in _minify_options:
+            raise TypeError('minify_many() got an unexpected keyword argument %r' % option)
 
-    preserve_locals.extend(module.preserved)
-    preserve_globals.extend(module.preserved)
+    return Minifier(**options).minify_many(sources, workers, pool, compile)
 
-    allow_rename_locals(module, rename_locals, preserve_locals)
-    allow_rename_globals(module, rename_globals, preserve_globals)
 
-    if hoist_literals:
-        rename_literals(module)
+def minify_package(modules, workers=None, pool='process', **options):
+    """
+    Minify the modules of a self-contained package in parallel
+
+    This is like :func:`minify_many`, but the modules are minified together. With rename_globals, the module level
+    names that are imported or read as attributes by other modules of the package are renamed too, and every module
+    that uses them is changed to use the new names. Names in ``__all__`` and preserve_globals are not renamed.
+
+    Names are only followed through import statements and attribute access on imported modules. A module that is used
+    in any other way, such as being passed to a function or star imported, keeps all its module level names. Code
+    outside the package must not use the renamed names.
+
+    The path of each module is relative to the directory the package is imported from, e.g. 'package/module.py', and
+    is used to find the name of the module and resolve relative imports.
+
+    >>> minify_package([
+    ...     ('package/__init__.py', 'from package.util import helper\n__all__ = [\'helper\']'),
+    ...     ('package/util.py', 'def helper(): return 1'),
+    ... ], rename_globals=True)
+    [('package/__init__.py', "from package.util import A as helper\n__all__=['helper']"), ('package/util.py', 'def A():return 1')]
+
+    :param modules: The modules of the package, as (path, source) pairs
+    :type modules: Iterable[tuple[str, str or bytes or ast.Module]]
+    :param workers: The number of workers in the pool. Defaults to the number of CPUs.
+    :type workers: int or None
+    :param str pool: The type of pool to use, either 'process' or 'thread'
+    :param options: Minification options, as accepted by :func:`minify`
+    :return: (path, minified module) pairs, in the same order as modules
+    :rtype: list[tuple[str, str]]
+    :raises ValueError: If the path of a module is not relative
+    :raises Exception: The exception raised when analysing or minifying a module, if any module fails
+
+    """
+
+    for option in options:
+        if option not in _minify_options:
+            raise TypeError('minify_package() got an unexpected keyword argument %r' % option)
+
+    return Minifier(**options).minify_package(modules, workers, pool)
+
+
+# The options of a Minifier, which are the options of minify() that don't depend on the module being minified
+_minify_options = Minifier.__init__.__code__.co_varnames[1:Minifier.__init__.__code__.co_argcount]
 
-    rename(module, prefix_globals=not rename_globals, preserved_globals=preserve_globals)
 
-    if convert_posargs_to_args:
-        module = remove_posargs(module)
+def _minify_many(sources, workers, pool, minifier, compile_options):
+    if pool == 'process':
+        worker_pool = multiprocessing.Pool(workers)
+        minify_item = _minify_item_in_process
+    else:
+        worker_pool = multiprocessing.pool.ThreadPool(workers)
+        minify_item = _minify_item
+
+    max_in_flight = 2 * workers
+    results = queue.Queue()
+    in_flight = 0
+    sources = iter(sources)
 
-    minified = unparse(module)
+    # An exception raised outside of minify_item's own handler, such as failing to send the result back from a worker
+    # process, is put on the queue so it is raised here instead of the result never arriving
+    callbacks = {'callback': results.put}
+    if sys.version_info >= (3, 0):
+        callbacks['error_callback'] = results.put
+
+    try:
+        while True:
+            while sources is not None and in_flight < max_in_flight:
+                try:
+                    name, source = next(sources)
+                except StopIteration:
+                    sources = None
+                    break
 
-    if preserve_shebang is True:
-        shebang_line = _find_shebang(source)
-        if shebang_line is not None:
-            return shebang_line + '\n' + minified
+                worker_pool.apply_async(minify_item, (name, source, minifier, compile_options), **callbacks)
+                in_flight += 1
 
-    return minified
+            if in_flight == 0:
+                break
+
+            result = results.get()
+            in_flight -= 1
+
+            if isinstance(result, BaseException):
+                raise result
+
+            yield result
+
+    except BaseException:
+        worker_pool.terminate()
+        raise
+    else:
+        worker_pool.close()
+    finally:
+        worker_pool.join()
+
+
+def _minify_item(name, source, minifier, compile_options=None):
+    from python_minifier.bytecode import compile_module
+
+    try:
+        minified = minifier.minify(source, name)
+
+        if compile_options is not None:
+            return name, (minified, compile_module(minified.encode('utf-8'), name, compile_options))
+
+        return name, minified
+    except Exception as exception:
+        return name, exception
+
+
+def _minify_item_in_process(name, source, minifier, compile_options=None):
+    name, result = _minify_item(name, source, minifier, compile_options)
+
+    if isinstance(result, Exception):
+        result = _picklable(result)
+
+    return name, result
+
+
+def _picklable(exception):
+    """
+    An exception that can be sent back to the parent process
+
+    :param exception: An exception raised in a worker process
+    :type exception: Exception
+    :rtype: Exception
+    """
+
+    try:
+        pickle.dumps(exception)
+    except Exception:
+        if isinstance(exception, UnstableMinification):
+            return UnstableMinification(str(exception.exception), exception.source, exception.minified)
+        return RuntimeError('%s: %s' % (exception.__class__.__name__, exception))
+
+    return exception
 
 
 def _find_shebang(source):
@@ -219,33 +786,60 @@ def _find_shebang(source):
     return None
 
 
-def unparse(module):
+def unparse(module, verify='full', verify_sample_rate=0.1):
     """
     Turn a module AST into python code
 
     This returns an exact representation of the given module,
     such that it can be parsed back into the same AST.
 
+    The python code is verified by parsing it and checking the result is the same as the given module.
+    The verify argument is one of:
+     - full: Compare every node of the parsed code with the module
+     - structural-hash: Compare the structural fingerprint of the parsed code with the fingerprint of the module.
+       The nodes are only compared if the fingerprints differ, to find the difference.
+     - sampled: Fully verify a random fraction of modules, given by verify_sample_rate, and don't verify the rest
+     - off: Don't verify the python code
+
     :param module: The module to turn into python code
     :type: module: :class:`ast.Module`
+    :param str verify: How the python code is verified
+    :param float verify_sample_rate: The fraction of modules that are verified when verify is 'sampled'
     :rtype: str
+    :raises UnstableMinification: If the python code is verified and doesn't parse into the same module
 
     """
 
+    from python_minifier.module_printer import ModulePrinter
+
     assert isinstance(module, ast.Module)
+    _check_verify(verify, verify_sample_rate)
 
-    printer = ModulePrinter()
-    printer(module)
+    if verify == 'sampled':
+        verify = 'full' if random.random() < verify_sample_rate else 'off'
 
-    try:
-        minified_module = ast.parse(printer.code, 'python_minifier.unparse output')
-    except SyntaxError as syntax_error:
-        raise UnstableMinification(syntax_error, '', printer.code)
+    with stage('print'):
+        printer = ModulePrinter()
+        printer(module)
 
-    try:
-        compare_ast(module, minified_module)
-    except CompareError as compare_error:
-        raise UnstableMinification(compare_error, '', printer.code)
+    if verify == 'off':
+        return printer.code
+
+    check_deadline()
+    with stage('verify'):
+        try:
+            minified_module = ast.parse(printer.code, 'python_minifier.unparse output')
+        except SyntaxError as syntax_error:
+            raise UnstableMinification(syntax_error, '', printer.code)
+
+        # The fingerprints are compared directly, so unlike a hash they can't be equal for different modules
+        if verify == 'structural-hash' and structural_fingerprint(module) == structural_fingerprint(minified_module):
+            return printer.code
+
+        try:
+            compare_ast(module, minified_module)
+        except CompareError as compare_error:
+            raise UnstableMinification(compare_error, '', printer.code)
 
     return printer.code
 
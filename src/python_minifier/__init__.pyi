@@ -1,16 +1,24 @@
 import ast
 
-from typing import Any, List, Optional, Text, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Text, Tuple, TypeVar, Union, overload
 
+from .bytecode import CompileOptions as CompileOptions
+from .deadline import TimeBudgetExceeded as TimeBudgetExceeded
+from .stats import MinifyStats as MinifyStats
 from .transforms.remove_annotations_options import RemoveAnnotationsOptions as RemoveAnnotationsOptions
 
 
+VERIFY_LEVELS: Tuple[Text, ...]
+
+DEFAULT_FALLBACKS: Tuple[Dict[Text, Any], ...]
+
+
 class UnstableMinification(RuntimeError):
     def __init__(self, exception: Any, source: Any, minified: Any): ...
 
 
 def minify(
-    source: Union[str, bytes],
+    source: Union[str, bytes, ast.Module],
     filename: Optional[str] = ...,
     remove_annotations: Union[bool, RemoveAnnotationsOptions] = ...,
     remove_pass: bool = ...,
@@ -28,11 +36,126 @@ def minify(
     remove_debug: bool = ...,
     remove_explicit_return_none: bool = ...,
     remove_builtin_exception_brackets: bool = ...,
-    constant_folding: bool = ...
+    constant_folding: bool = ...,
+    verify: Text = ...,
+    verify_sample_rate: float = ...,
+    mutate_module: bool = ...,
+    time_budget: Optional[float] = ...,
+    fallbacks: Optional[Iterable[Dict[Text, Any]]] = ...,
+    shebang: Optional[Text] = ...,
+    stats: Optional[MinifyStats] = ...
 ) -> Text: ...
 
 
-def unparse(module: ast.Module) -> Text: ...
+_Name = TypeVar('_Name')
+
+
+class Minifier:
+    remove_annotations: RemoveAnnotationsOptions
+    hoist_literals: bool
+    rename_locals: bool
+    preserve_locals: Tuple[Text, ...]
+    rename_globals: bool
+    preserve_globals: Tuple[Text, ...]
+    convert_posargs_to_args: bool
+    preserve_shebang: bool
+    remove_builtin_exception_brackets: bool
+    verify: Text
+    verify_sample_rate: float
+    mutate_module: bool
+    time_budget: Optional[float]
+
+    def __init__(
+        self,
+        remove_annotations: Union[bool, RemoveAnnotationsOptions] = ...,
+        remove_pass: bool = ...,
+        remove_literal_statements: bool = ...,
+        combine_imports: bool = ...,
+        hoist_literals: bool = ...,
+        rename_locals: bool = ...,
+        preserve_locals: Optional[List[Text]] = ...,
+        rename_globals: bool = ...,
+        preserve_globals: Optional[List[Text]] = ...,
+        remove_object_base: bool = ...,
+        convert_posargs_to_args: bool = ...,
+        preserve_shebang: bool = ...,
+        remove_asserts: bool = ...,
+        remove_debug: bool = ...,
+        remove_explicit_return_none: bool = ...,
+        remove_builtin_exception_brackets: bool = ...,
+        constant_folding: bool = ...,
+        verify: Text = ...,
+        verify_sample_rate: float = ...,
+        mutate_module: bool = ...,
+        time_budget: Optional[float] = ...,
+        fallbacks: Optional[Iterable[Dict[Text, Any]]] = ...
+    ): ...
+
+    def minify(
+        self,
+        source: Union[str, bytes, ast.Module],
+        filename: Optional[str] = ...,
+        shebang: Optional[Text] = ...,
+        stats: Optional[MinifyStats] = ...
+    ) -> Text: ...
+
+    @overload
+    def minify_many(
+        self,
+        sources: Iterable[Tuple[_Name, Union[str, bytes, ast.Module]]],
+        workers: Optional[int] = ...,
+        pool: Text = ...,
+        compile: None = ...
+    ) -> Iterator[Tuple[_Name, Union[Text, Exception]]]: ...
+
+    @overload
+    def minify_many(
+        self,
+        sources: Iterable[Tuple[_Name, Union[str, bytes, ast.Module]]],
+        workers: Optional[int] = ...,
+        pool: Text = ...,
+        *,
+        compile: Union[bool, CompileOptions]
+    ) -> Iterator[Tuple[_Name, Union[Text, Tuple[Text, bytes], Exception]]]: ...
+
+    def minify_package(
+        self,
+        modules: Iterable[Tuple[Text, Union[str, bytes, ast.Module]]],
+        workers: Optional[int] = ...,
+        pool: Text = ...
+    ) -> List[Tuple[Text, Text]]: ...
+
+
+@overload
+def minify_many(
+    sources: Iterable[Tuple[_Name, Union[str, bytes, ast.Module]]],
+    workers: Optional[int] = ...,
+    pool: Text = ...,
+    compile: None = ...,
+    **options: Any
+) -> Iterator[Tuple[_Name, Union[Text, Exception]]]: ...
+
+
+@overload
+def minify_many(
+    sources: Iterable[Tuple[_Name, Union[str, bytes, ast.Module]]],
+    workers: Optional[int] = ...,
+    pool: Text = ...,
+    *,
+    compile: Union[bool, CompileOptions],
+    **options: Any
+) -> Iterator[Tuple[_Name, Union[Text, Tuple[Text, bytes], Exception]]]: ...
+
+
+def minify_package(
+    modules: Iterable[Tuple[Text, Union[str, bytes, ast.Module]]],
+    workers: Optional[int] = ...,
+    pool: Text = ...,
+    **options: Any
+) -> List[Tuple[Text, Text]]: ...
+
+
+def unparse(module: ast.Module, verify: Text = ..., verify_sample_rate: float = ...) -> Text: ...
 
 
 def awslambda(
@@ -1,10 +1,18 @@
 from __future__ import print_function
 
 import argparse
+import json
+import multiprocessing
 import os
+import socket
 import sys
+import time
 
-from python_minifier import minify
+from python_minifier import VERIFY_LEVELS, MinifyStats, daemon, minify
+from python_minifier.archive import is_archive, minify_archive
+from python_minifier.bytecode import INVALIDATION_MODES, CompileOptions, write_bytecode
+from python_minifier.cache import ResultCache
+from python_minifier.manifest import Manifest, file_state
 from python_minifier.transforms.remove_annotations_options import RemoveAnnotationsOptions
 
 
@@ -20,20 +28,69 @@ def stdout_write_bytes(data):
         sys.stdout.write(data)
 
 
-if sys.version_info >= (3, 8):
-    from importlib import metadata
+# The argument names of the minification options, which are sent to a pyminify server
+MINIFICATION_ARGS = (
+    'combine_imports',
+    'remove_pass',
+    'remove_literal_statements',
+    'hoist_literals',
+    'rename_locals',
+    'preserve_locals',
+    'rename_globals',
+    'preserve_globals',
+    'remove_object_base',
+    'convert_posargs_to_args',
+    'preserve_shebang',
+    'remove_asserts',
+    'remove_debug',
+    'remove_explicit_return_none',
+    'remove_exception_brackets',
+    'constant_folding',
+    'remove_annotations',
+    'remove_variable_annotations',
+    'remove_return_annotations',
+    'remove_argument_annotations',
+    'remove_class_attribute_annotations',
+    'verify',
+    'verify_sample_rate',
+)
 
-    try:
-        version = metadata.version('python-minifier')
-    except metadata.PackageNotFoundError:
-        version = '0.0.0'
-else:
-    from pkg_resources import DistributionNotFound, get_distribution
 
-    try:
-        version = get_distribution('python_minifier').version
-    except DistributionNotFound:
-        version = '0.0.0'
+def get_version():
+    """
+    The installed python-minifier version
+
+    Looking up the version is slow, so this is only done when it is needed.
+
+    :rtype: str
+    """
+
+    if sys.version_info >= (3, 8):
+        from importlib import metadata
+
+        try:
+            return metadata.version('python-minifier')
+        except metadata.PackageNotFoundError:
+            return '0.0.0'
+    else:
+        from pkg_resources import DistributionNotFound, get_distribution
+
+        try:
+            return get_distribution('python_minifier').version
+        except DistributionNotFound:
+            return '0.0.0'
+
+
+class VersionAction(argparse.Action):
+    """
+    Print the version and exit, like the argparse 'version' action but without looking up the version in advance
+    """
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS, help="show program's version number and exit"):
+        super(VersionAction, self).__init__(option_strings=option_strings, dest=dest, default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        parser.exit(message=get_version() + '\n')
 
 
 def main():
@@ -56,64 +113,442 @@ examples:
 
   # Minifying multiple paths in place
   pyminify file1.py file2.py src/ --in-place
+
+  # Minifying all *.py files in a directory in place, using all available CPUs
+  pyminify src/ --in-place --jobs auto
+
+  # Reusing results for unchanged modules from previous runs
+  pyminify src/ --in-place --cache-dir ~/.cache/pyminify
+
+  # Minifying in place, skipping files that were minified by a previous run
+  pyminify src/ --in-place --manifest src/.pyminify-manifest
+
+  # Minifying all *.py files in a directory in place, and writing .pyc files for them to __pycache__
+  pyminify src/ --in-place --compile --compile-optimize 2
+
+  # Reporting the time spent in each stage of minifying a file, as a JSON line written to stderr
+  pyminify example.py --output example.min.py --stats json
+
+  # Minifying the python modules in a wheel or zip archive
+  pyminify package.whl --output package.min.whl --jobs auto
+
+  # Minifying a stream of newline delimited JSON requests from stdin, writing a JSON response line for each
+  pyminify --ndjson --jobs auto
+
+  # Starting a server that stays running between invocations, and minifying a file using it
+  pyminify --serve /tmp/pyminify.sock --jobs auto &
+  pyminify --connect /tmp/pyminify.sock example.py --output example.min.py
 """
 
     args = parse_args()
 
-    if len(args.path) == 1 and args.path[0] == '-':
-        # minify stdin
-        source = sys.stdin.buffer.read() if sys.version_info >= (3, 0) else sys.stdin.read()
+    cache = None
+    if args.cache_dir:
+        cache = ResultCache(args.cache_dir, get_version(), max_size=args.cache_max_size * 1024 * 1024)
+
+    manifest = None
+    if args.manifest:
+        manifest = Manifest(args.manifest)
+
+    if args.serve:
+        serve(args, cache)
+
+    elif args.ndjson:
+        minify_ndjson(args, cache)
+
+    elif len(args.path) == 1 and args.path[0] == '-':
+        minify_stdin(args, cache)
+
+    elif len(args.path) == 1 and is_archive(args.path[0]):
+        minify_archive_file(args.path[0], args, cache)
+
+    elif args.in_place and args.jobs > 1:
+        # minify source paths using a pool of worker processes
+        pool = multiprocessing.Pool(args.jobs, initializer=_init_worker, initargs=(args, cache))
         try:
-            minified = do_minify(source, 'stdin', args)
-        except MinificationNotBeneficialError:
-            # Use original source when minification isn't beneficial
-            if args.output:
-                with open(args.output, 'wb') as f:
-                    f.write(source)
-            else:
-                # Write original source to stdout
-                stdout_write_bytes(source)
-            return
+            for path, state in _worker_results(pool.imap_unordered(_minify_worker, changed_modules(args, manifest)), cache):
+                sys.stdout.write(path + '\n')
+                sys.stdout.flush()
 
-        if args.output:
-            with open(args.output, 'wb') as f:
-                f.write(minified)
+                if manifest is not None:
+                    manifest.record(path, state)
+        except BaseException:
+            pool.terminate()
+            raise
         else:
-            stdout_write_bytes(minified)
+            pool.close()
+        finally:
+            pool.join()
+            if manifest is not None:
+                manifest.save()
 
     else:
         # minify source paths
-        for path in source_modules(args):
-            if args.output or args.in_place:
-                sys.stdout.write(path + '\n')
+        try:
+            for path in changed_modules(args, manifest):
+                if args.output or args.in_place:
+                    sys.stdout.write(path + '\n')
+
+                written = minify_file(path, args, cache)
+
+                if manifest is not None:
+                    manifest.record(path, file_state(path, written))
+        finally:
+            if manifest is not None:
+                manifest.save()
+
+    if cache is not None:
+        cache.evict()
+
+        if args.cache_stats:
+            sys.stderr.write(cache.stats() + '\n')
+
+
+def serve(args, cache=None):
+    """
+    Run a pyminify server until it has been idle for the idle timeout
+
+    :param argparse.Namespace args: The parsed command line arguments
+    :param cache: The result cache to use, if any
+    :type cache: ResultCache or None
+    """
+
+    pool = multiprocessing.Pool(args.jobs, initializer=_init_worker, initargs=(args, cache))
+
+    def minify_request(source, filename, options):
+        return pool.apply(_serve_worker, (source, filename, options))
+
+    try:
+        server = daemon.MinifyServer(args.serve, minify_request, args.idle_timeout)
+        server.serve_until_idle()
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
 
-            with open(path, 'rb') as f:
-                source = f.read()
-
-            try:
-                minified = do_minify(source, path, args)
-            except MinificationNotBeneficialError:
-                # Use original source when minification isn't beneficial
-                if args.in_place:
-                    # File is already the original, no need to write
-                    pass
-                elif args.output:
-                    # Write original source to output
-                    with open(args.output, 'wb') as f:
-                        f.write(source)
-                else:
-                    # Write original source to stdout
-                    stdout_write_bytes(source)
-                continue
-
-            if args.in_place:
-                with open(path, 'wb') as f:
-                    f.write(minified)
-            elif args.output:
-                with open(args.output, 'wb') as f:
-                    f.write(minified)
-            else:
-                stdout_write_bytes(minified)
+def _serve_worker(source, filename, options):
+    return minify_source(source, filename, argparse.Namespace(**options), _worker_cache)
+
+
+def minify_ndjson(args, cache=None):
+    """
+    Minify modules from newline delimited JSON requests read from stdin
+
+    Each request is a JSON object on a single line, with these fields:
+     - id: Any value, which is returned in the response
+     - source: The module source code
+     - filename: (optional) The filename to use for error reporting
+     - options: (optional) An object of minify() keyword arguments, that override the command line options
+
+    A single line JSON response is written to stdout for each request, with these fields:
+     - id: The id of the request
+     - minified: The minified module, or null if there was an error
+     - error: null, or an object with the 'type' and 'message' of the exception raised
+     - timings: An object of timings in seconds. 'total' is the time taken to handle the request, and the other
+       timings are the stages of minification, as in :class:`python_minifier.MinifyStats`. A result from the cache
+       only has the total.
+
+    When --jobs is greater than 1, requests are minified in parallel and responses are written in the order they finish.
+
+    :param argparse.Namespace args: The parsed command line arguments
+    :param cache: The result cache to use, if any
+    :type cache: ResultCache or None
+    """
+
+    stdin = sys.stdin.buffer if sys.version_info >= (3, 0) else sys.stdin
+    requests = (line for line in iter(stdin.readline, b'') if line.strip())
+
+    def write_response(response):
+        stdout_write_bytes(response.encode('utf-8') + b'\n')
+        sys.stdout.flush()
+
+    if args.jobs == 1:
+        base_options = minification_options(args)
+        for line in requests:
+            write_response(ndjson_response(line, base_options, cache))
+        return
+
+    pool = multiprocessing.Pool(args.jobs, initializer=_init_worker, initargs=(args, cache))
+    try:
+        for response in _worker_results(pool.imap_unordered(_ndjson_worker, requests), cache):
+            write_response(response)
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
+
+def ndjson_response(line, base_options, cache=None):
+    """
+    Minify the module in a JSON request
+
+    :param bytes line: The JSON request
+    :param dict base_options: The minify() options to use for options not given in the request
+    :param cache: The result cache to use, if any
+    :type cache: ResultCache or None
+    :return: The JSON response
+    :rtype: str
+    """
+
+    start_time = time.time()
+    response = {'id': None, 'minified': None, 'error': None}
+    stats = MinifyStats()
+
+    try:
+        request = json.loads(line.decode('utf-8'))
+        response['id'] = request.get('id')
+
+        options = dict(base_options)
+        for name, value in request.get('options', {}).items():
+            if name not in options:
+                raise TypeError('Unknown option %r' % name)
+            if name == 'remove_annotations' and isinstance(value, dict):
+                value = RemoveAnnotationsOptions(**value)
+            options[name] = value
+
+        source = request['source']
+        source_bytes = source.encode('utf-8')
+
+        minified = None
+        if cache is not None:
+            cache_key = cache.key(source_bytes, options)
+            minified = cache.get(cache_key)
+
+        if minified is None:
+            minified = minify(source, filename=request.get('filename', 'stdin'), stats=stats, **options).encode('utf-8')
+
+            if cache is not None:
+                cache.put(cache_key, minified)
+
+        if len(minified) > len(source_bytes) and not os.environ.get('PYMINIFY_FORCE_BEST_EFFORT'):
+            # Minification wasn't beneficial, so use the original source
+            response['minified'] = source
+        else:
+            response['minified'] = minified.decode('utf-8')
+
+    except Exception as e:
+        response['error'] = {'type': e.__class__.__name__, 'message': str(e)}
+
+    response['timings'] = dict(stats.timings, total=time.time() - start_time)
+    return json.dumps(response)
+
+
+def _ndjson_worker(line):
+    return _counting_cache_use(ndjson_response, line, minification_options(_worker_args), _worker_cache)
+
+
+def minify_archive_file(path, args, cache=None):
+    """
+    Minify the python modules in a zip archive
+
+    Modules are minified in parallel when --jobs is greater than 1.
+    The path of each module in the archive is printed as it finishes.
+
+    :param str path: The path of the archive
+    :param argparse.Namespace args: The parsed command line arguments
+    :param cache: The result cache to use, if any
+    :type cache: ResultCache or None
+    """
+
+    def minify_serially(modules):
+        for name, source in modules:
+            yield _minify_member(name, source, args, cache)
+
+    def minify_modules(modules):
+        if args.jobs == 1:
+            results = minify_serially(modules)
+        else:
+            results = _worker_results(pool.imap_unordered(_archive_worker, modules), cache)
+
+        for name, minified in results:
+            sys.stdout.write(name + '\n')
+            sys.stdout.flush()
+
+            yield name, minified
+
+    pool = None
+    if args.jobs > 1:
+        pool = multiprocessing.Pool(args.jobs, initializer=_init_worker, initargs=(args, cache))
+
+    try:
+        minify_archive(path, args.output or path, minify_modules)
+    except BaseException:
+        if pool is not None:
+            pool.terminate()
+        raise
+    else:
+        if pool is not None:
+            pool.close()
+    finally:
+        if pool is not None:
+            pool.join()
+
+
+def _minify_member(name, source, args, cache):
+    try:
+        minified = do_minify(source, name, args, cache)
+    except MinificationNotBeneficialError:
+        minified = source
+
+    return name, minified
+
+
+def _archive_worker(member):
+    name, source = member
+    return _counting_cache_use(_minify_member, name, source, _worker_args, _worker_cache)
+
+
+def minify_stdin(args, cache=None):
+    """
+    Minify a module read from stdin and write the result
+
+    :param argparse.Namespace args: The parsed command line arguments
+    :param cache: The result cache to use, if any
+    :type cache: ResultCache or None
+    """
+
+    source = sys.stdin.buffer.read() if sys.version_info >= (3, 0) else sys.stdin.read()
+    try:
+        minified = do_minify(source, 'stdin', args, cache)
+    except MinificationNotBeneficialError:
+        # Use original source when minification isn't beneficial
+        if args.output:
+            write_file(args.output, source, args)
+        else:
+            # Write original source to stdout
+            stdout_write_bytes(source)
+        return
+
+    if args.output:
+        write_file(args.output, minified, args)
+    else:
+        stdout_write_bytes(minified)
+
+
+def minify_file(path, args, cache=None):
+    """
+    Minify a source file and write the result
+
+    The minified module is written to the destination chosen by the command line arguments.
+    If minification isn't beneficial the original source is used instead.
+
+    :param str path: Path to the source module
+    :param argparse.Namespace args: The parsed command line arguments
+    :param cache: The result cache to use, if any
+    :type cache: ResultCache or None
+    :return: The content of the file after minifying in place
+    :rtype: bytes or None
+    """
+
+    with open(path, 'rb') as f:
+        source = f.read()
+
+    try:
+        minified = do_minify(source, path, args, cache)
+    except MinificationNotBeneficialError:
+        # Use original source when minification isn't beneficial
+        if args.in_place:
+            # File is already the original, no need to write
+            if args.compile_options is not None:
+                write_bytecode(path, source, args.compile_options)
+            return source
+        elif args.output:
+            # Write original source to output
+            write_file(args.output, source, args)
+        else:
+            # Write original source to stdout
+            stdout_write_bytes(source)
+        return None
+
+    if args.in_place:
+        write_file(path, minified, args)
+        return minified
+    elif args.output:
+        write_file(args.output, minified, args)
+    else:
+        stdout_write_bytes(minified)
+
+    return None
+
+
+def write_file(path, data, args):
+    """
+    Write a module, and its .pyc file if --compile was used
+
+    The module is compiled from the data in memory, rather than reading the file back.
+
+    :param str path: The path to write the module to
+    :param bytes data: The module content
+    :param argparse.Namespace args: The parsed command line arguments
+    """
+
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    if args.compile_options is not None:
+        write_bytecode(path, data, args.compile_options)
+
+
+_worker_args = None
+_worker_cache = None
+
+
+def _init_worker(args, cache):
+    global _worker_args, _worker_cache
+    _worker_args = args
+    _worker_cache = cache
+
+
+def _counting_cache_use(function, *args):
+    """
+    Call a function in a worker process, counting the hits and misses of the worker's cache
+
+    The counts are returned with the result, so the parent process can add them to its own cache
+    with :func:`_worker_results`.
+
+    :return: The result of the function, and the number of cache hits and misses it made
+    :rtype: tuple
+    """
+
+    if _worker_cache is None:
+        return function(*args), 0, 0
+
+    hits, misses = _worker_cache.hits, _worker_cache.misses
+    result = function(*args)
+    return result, _worker_cache.hits - hits, _worker_cache.misses - misses
+
+
+def _worker_results(results, cache):
+    """
+    The results of worker processes, adding their cache hits and misses to the cache
+
+    :param results: The (result, hits, misses) tuples returned by :func:`_counting_cache_use` in the workers
+    :param cache: The result cache of the parent process, if any
+    :type cache: ResultCache or None
+    """
+
+    for result, hits, misses in results:
+        if cache is not None:
+            cache.hits += hits
+            cache.misses += misses
+
+        yield result
+
+
+def _minify_path(path):
+    written = minify_file(path, _worker_args, _worker_cache)
+    return path, file_state(path, written) if _worker_args.manifest else None
+
+
+def _minify_worker(path):
+    return _counting_cache_use(_minify_path, path)
 
 
 def parse_args():
@@ -121,9 +556,10 @@ def parse_args():
 
     parser.add_argument(
         'path',
-        nargs='+',
+        nargs='*',
         type=str,
-        help='The source file or directory to minify. Use "-" to read from stdin. Directories are recursively searched for ".py" files to minify. May be used multiple times',
+        help='The source file or directory to minify. Use "-" to read from stdin. Directories are recursively searched for ".py" files to minify. '
+             'A single wheel or zip archive can be given to minify the ".py" files it contains. May be used multiple times',
     )
 
     output_options = parser.add_mutually_exclusive_group()
@@ -139,6 +575,137 @@ def parse_args():
         help='Overwrite existing files. Required when there is more than one source module',
         dest='in_place'
     )
+    cache_options = parser.add_argument_group('cache options', 'Options that control reuse of previous results')
+    cache_options.add_argument(
+        '--cache-dir',
+        action='store',
+        help='Directory to cache minified modules in. Modules with the same source and options as a cached result are not minified again',
+        dest='cache_dir',
+        metavar='DIR'
+    )
+    cache_options.add_argument(
+        '--cache-max-size',
+        type=int,
+        default=256,
+        help='The size the cache directory is trimmed to after minifying, in megabytes. The least recently used results are removed first. Defaults to 256',
+        dest='cache_max_size',
+        metavar='MB'
+    )
+    cache_options.add_argument(
+        '--cache-stats',
+        action='store_true',
+        help='Print a summary of cache hits and misses to stderr',
+        dest='cache_stats'
+    )
+
+    parser.add_argument(
+        '--manifest',
+        action='store',
+        help='Path to a manifest of files minified in place. Files that are unchanged since they were recorded in the manifest are skipped, '
+             'and the manifest is updated with the files that are minified. Can only be used with --in-place',
+        dest='manifest',
+        metavar='PATH'
+    )
+    parser.add_argument(
+        '--ndjson',
+        action='store_true',
+        help='Read newline delimited JSON minification requests from stdin, and write a JSON response line for each to stdout. '
+             'Requests have "id", "source" and optional "filename" and "options" fields. '
+             'Options given in a request override the command line options for that request',
+        dest='ndjson'
+    )
+
+    server_options = parser.add_argument_group('server options', 'Options for keeping pyminify running between invocations')
+    server_options.add_argument(
+        '--serve',
+        action='store',
+        help='Start a server listening on a unix domain socket at this path, instead of minifying. '
+             'Modules are minified by a pool of --jobs worker processes',
+        dest='serve',
+        metavar='SOCKET'
+    )
+    server_options.add_argument(
+        '--idle-timeout',
+        type=float,
+        default=600,
+        help='Number of seconds without a request before the server stops. Defaults to 600',
+        dest='idle_timeout',
+        metavar='SECONDS'
+    )
+    server_options.add_argument(
+        '--connect',
+        action='store',
+        help='Minify using the server listening on a unix domain socket at this path. '
+             'The minification options given to the client are used',
+        dest='connect',
+        metavar='SOCKET'
+    )
+
+    bytecode_options = parser.add_argument_group('bytecode options', 'Options for compiling minified modules to bytecode')
+    bytecode_options.add_argument(
+        '--compile',
+        action='store_true',
+        help='Compile each module that is written to bytecode, and write a .pyc file where the import system will find it. '
+             'The module is compiled from the minified source in memory. Can only be used with --output or --in-place',
+        dest='compile'
+    )
+    bytecode_options.add_argument(
+        '--compile-optimize',
+        type=int,
+        choices=[-1, 0, 1, 2],
+        default=-1,
+        help='The optimization level to compile with. -1 uses the optimization level of the python interpreter running pyminify. Defaults to -1',
+        dest='compile_optimize',
+        metavar='LEVEL'
+    )
+    bytecode_options.add_argument(
+        '--compile-invalidation',
+        choices=INVALIDATION_MODES,
+        help='How the import system checks a .pyc file is up to date with its source module. '
+             'Defaults to checked-hash on Python 3.7 and later, and timestamp otherwise',
+        dest='compile_invalidation',
+        metavar='MODE'
+    )
+
+    parser.add_argument(
+        '--stats',
+        choices=['json'],
+        help='Report the time spent in each stage of minifying each module, and counters of the work done. '
+             'With "json", a JSON object is written to stderr on a single line for each module that is minified',
+        dest='stats',
+        metavar='FORMAT'
+    )
+
+    parser.add_argument(
+        '--verify',
+        choices=VERIFY_LEVELS,
+        default='full',
+        help='How each minified module is checked to parse into the same module as the transformed source. '
+             '"full" compares every node, "structural-hash" compares the structural fingerprints of the modules, '
+             '"sampled" fully verifies a random fraction of modules and "off" does no verification. Defaults to full',
+        dest='verify',
+        metavar='LEVEL'
+    )
+    parser.add_argument(
+        '--verify-sample-rate',
+        type=sample_rate,
+        default=0.1,
+        help='The fraction of modules to verify with --verify sampled. Defaults to 0.1',
+        dest='verify_sample_rate',
+        metavar='FRACTION'
+    )
+
+    parser.add_argument(
+        '--jobs', '-j',
+        type=jobs_count,
+        default=1,
+        help='Number of worker processes to minify with, or "auto" to use one per CPU. '
+             'When greater than 1, the modules of --in-place paths or an archive and --ndjson requests are minified in parallel, '
+             'and each path, archive member or response is written when it finishes. A --serve server minifies requests with this many workers. '
+             'Defaults to 1',
+        dest='jobs',
+        metavar='N'
+    )
 
     # Minification arguments
     minification_options = parser.add_argument_group('minification options', 'Options that affect how the source is minified')
@@ -276,11 +843,43 @@ def parse_args():
         dest='remove_class_attribute_annotations',
     )
 
-    parser.add_argument('--version', '-v', action='version', version=version)
+    parser.add_argument('--version', '-v', action=VersionAction)
 
     args = parser.parse_args()
+    args.compile_options = None
 
     # Handle some invalid argument combinations
+    if (args.compile_optimize != -1 or args.compile_invalidation) and not args.compile:
+        sys.stderr.write('error: --compile-optimize and --compile-invalidation require --compile\n')
+        sys.exit(1)
+    if args.stats and (args.serve or args.connect or args.ndjson):
+        sys.stderr.write('error: --stats can not be used with --serve, --connect or --ndjson\n')
+        sys.exit(1)
+    if args.compile and (args.serve or args.ndjson):
+        sys.stderr.write('error: --compile can not be used with --serve or --ndjson\n')
+        sys.exit(1)
+    if (args.serve or args.connect) and not hasattr(socket, 'AF_UNIX'):
+        sys.stderr.write('error: unix domain sockets are not supported on this platform\n')
+        sys.exit(1)
+    if args.serve:
+        if args.path:
+            sys.stderr.write('error: path arguments are not valid with --serve\n')
+            sys.exit(1)
+        if args.connect or args.output or args.in_place:
+            sys.stderr.write('error: --serve can not be used with --connect, --output or --in-place\n')
+            sys.exit(1)
+        return args
+    if args.ndjson:
+        if args.path:
+            sys.stderr.write('error: path arguments are not valid with --ndjson\n')
+            sys.exit(1)
+        if args.output or args.in_place or args.manifest:
+            sys.stderr.write('error: --ndjson can not be used with --output, --in-place or --manifest\n')
+            sys.exit(1)
+        return args
+    if not args.path:
+        parser.error('the following arguments are required: path')
+
     if '-' in args.path and len(args.path) != 1:
         sys.stderr.write('error: multiple path arguments, reading from stdin not allowed\n')
         sys.exit(1)
@@ -293,6 +892,35 @@ def parse_args():
     if len(args.path) == 1 and os.path.isdir(args.path[0]) and not args.in_place:
         sys.stderr.write('error: path ' + args.path[0] + ' is a directory, --in-place required\n')
         sys.exit(1)
+    if len(args.path) == 1 and is_archive(args.path[0]):
+        if not (args.output or args.in_place):
+            sys.stderr.write('error: path ' + args.path[0] + ' is an archive, --output or --in-place required\n')
+            sys.exit(1)
+        if args.manifest:
+            sys.stderr.write('error: --manifest can not be used with an archive\n')
+            sys.exit(1)
+        if args.compile:
+            sys.stderr.write('error: --compile can not be used with an archive\n')
+            sys.exit(1)
+
+    if args.manifest and not args.in_place:
+        sys.stderr.write('error: --manifest can only be used with --in-place\n')
+        sys.exit(1)
+
+    if args.compile:
+        if not (args.output or args.in_place):
+            sys.stderr.write('error: --compile can only be used with --output or --in-place\n')
+            sys.exit(1)
+
+        try:
+            args.compile_options = CompileOptions(args.compile_optimize, args.compile_invalidation)
+        except ValueError as e:
+            sys.stderr.write('error: ' + str(e) + '\n')
+            sys.exit(1)
+
+    if args.cache_stats and not args.cache_dir:
+        sys.stderr.write('error: --cache-stats requires --cache-dir\n')
+        sys.exit(1)
 
     if args.remove_class_attribute_annotations and not args.remove_annotations:
         sys.stderr.write('error: --remove-class-attribute-annotations would do nothing when used with --no-remove-annotations\n')
@@ -301,6 +929,50 @@ def parse_args():
     return args
 
 
+def jobs_count(value):
+    """
+    Parse the --jobs argument
+
+    :param str value: A positive number of jobs, or 'auto'
+    :rtype: int
+    """
+
+    if value == 'auto':
+        try:
+            return multiprocessing.cpu_count()
+        except NotImplementedError:
+            return 1
+
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid jobs value: %r' % value)
+
+    if jobs < 1:
+        raise argparse.ArgumentTypeError('jobs must be at least 1')
+
+    return jobs
+
+
+def sample_rate(value):
+    """
+    Parse the --verify-sample-rate argument
+
+    :param str value: A fraction between 0 and 1
+    :rtype: float
+    """
+
+    try:
+        rate = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid sample rate: %r' % value)
+
+    if not 0 <= rate <= 1:
+        raise argparse.ArgumentTypeError('sample rate must be between 0 and 1')
+
+    return rate
+
+
 def source_modules(args):
 
     def error(os_error):
@@ -316,15 +988,27 @@ def source_modules(args):
             yield path_arg
 
 
-def do_minify(source, filename, minification_args):
-    """Minify Python source code with size-based fallback.
+def changed_modules(args, manifest=None):
+    """
+    The source modules that are not unchanged since they were recorded in the manifest
+
+    :param argparse.Namespace args: The parsed command line arguments
+    :param manifest: The manifest of previously minified files, if any
+    :type manifest: Manifest or None
+    :rtype: Iterable[str]
+    """
+
+    for path in source_modules(args):
+        if manifest is None or not manifest.is_unchanged(path):
+            yield path
+
+
+def minification_options(minification_args):
+    """
+    Get the minify() keyword arguments selected by the command line arguments
 
-    :param bytes source: Source code as bytes (from file 'rb' or stdin.buffer)
-    :param str filename: Filename for error reporting
     :param argparse.Namespace minification_args: CLI arguments for minification options
-    :returns: Minified source code as UTF-8 bytes
-    :rtype: bytes
-    :raises MinificationNotBeneficialError: When minified output is larger than original
+    :rtype: dict
     """
 
     preserve_globals = []
@@ -354,9 +1038,7 @@ def do_minify(source, filename, minification_args):
             remove_class_attribute_annotations=minification_args.remove_class_attribute_annotations,
         )
 
-    minified_result = minify(
-        source,
-        filename=filename,
+    return dict(
         combine_imports=minification_args.combine_imports,
         remove_pass=minification_args.remove_pass,
         remove_annotations=remove_annotations,
@@ -373,11 +1055,30 @@ def do_minify(source, filename, minification_args):
         remove_debug=minification_args.remove_debug,
         remove_explicit_return_none=minification_args.remove_explicit_return_none,
         remove_builtin_exception_brackets=minification_args.remove_exception_brackets,
-        constant_folding=minification_args.constant_folding
+        constant_folding=minification_args.constant_folding,
+        verify=minification_args.verify,
+        verify_sample_rate=minification_args.verify_sample_rate
     )
 
-    # Encode minified result to bytes for comparison and output
-    minified_bytes = minified_result.encode('utf-8')
+
+def do_minify(source, filename, minification_args, cache=None):
+    """Minify Python source code with size-based fallback.
+
+    :param bytes source: Source code as bytes (from file 'rb' or stdin.buffer)
+    :param str filename: Filename for error reporting
+    :param argparse.Namespace minification_args: CLI arguments for minification options
+    :param cache: A cache of previous results to use, if any
+    :type cache: ResultCache or None
+    :returns: Minified source code as UTF-8 bytes
+    :rtype: bytes
+    :raises MinificationNotBeneficialError: When minified output is larger than original
+    """
+
+    if getattr(minification_args, 'connect', None):
+        options = dict((name, getattr(minification_args, name)) for name in MINIFICATION_ARGS)
+        minified_bytes = daemon.request(minification_args.connect, source, filename, options)
+    else:
+        minified_bytes = minify_source(source, filename, minification_args, cache)
 
     # Check if environment variable forces minified output
     if os.environ.get('PYMINIFY_FORCE_BEST_EFFORT'):
@@ -390,5 +1091,43 @@ def do_minify(source, filename, minification_args):
     return minified_bytes
 
 
+def minify_source(source, filename, minification_args, cache=None):
+    """
+    Minify Python source code
+
+    :param bytes source: Source code as bytes
+    :param str filename: Filename for error reporting
+    :param argparse.Namespace minification_args: CLI arguments for minification options
+    :param cache: A cache of previous results to use, if any
+    :type cache: ResultCache or None
+    :returns: Minified source code as UTF-8 bytes
+    :rtype: bytes
+    """
+
+    options = minification_options(minification_args)
+
+    minified_bytes = None
+    if cache is not None:
+        cache_key = cache.key(source, options)
+        minified_bytes = cache.get(cache_key)
+
+    if minified_bytes is None:
+        stats = MinifyStats() if getattr(minification_args, 'stats', None) else None
+
+        minified_result = minify(source, filename=filename, stats=stats, **options)
+
+        if stats is not None:
+            sys.stderr.write(json.dumps(dict(stats.as_dict(), filename=filename), sort_keys=True) + '\n')
+            sys.stderr.flush()
+
+        # Encode minified result to bytes for comparison and output
+        minified_bytes = minified_result.encode('utf-8')
+
+        if cache is not None:
+            cache.put(cache_key, minified_bytes)
+
+    return minified_bytes
+
+
 if __name__ == '__main__':
     main()
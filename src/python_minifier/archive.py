@@ -0,0 +1,128 @@
+"""
+Minify the python modules in a zip archive, such as a wheel
+
+The archive is read and written directly, without extracting it to disk.
+The RECORD file of a wheel is regenerated with the hashes and sizes of the new content.
+
+"""
+
+import base64
+import hashlib
+import os
+import tempfile
+import zipfile
+
+from python_minifier.cache import replace_file
+
+
+def is_archive(path):
+    """
+    Is a path a zip archive that can be minified
+
+    :param str path: The path to check
+    :rtype: bool
+    """
+
+    return path.endswith(('.whl', '.zip')) and zipfile.is_zipfile(path)
+
+
+def _is_record(name):
+    return name.endswith('.dist-info/RECORD') and name.count('/') == 1
+
+
+def _record_hash(data):
+    digest = base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b'=')
+    return 'sha256=' + digest.decode('ascii')
+
+
+def _record_row(path, hash, size):
+    if ',' in path or '"' in path:
+        path = '"' + path.replace('"', '""') + '"'
+    return '%s,%s,%s\n' % (path, hash, size)
+
+
+def minify_archive(archive_path, output_path, minify_modules):
+    """
+    Minify the python modules in a zip archive
+
+    Every member of the archive is written to the output archive in the same order, with the same
+    compression type, timestamp and permissions. Python modules are replaced with the minified
+    content returned by minify_modules.
+
+    If the archive contains a wheel RECORD file, it is regenerated for the new content.
+
+    :param str archive_path: The path of the archive to read
+    :param str output_path: The path of the archive to write. This may be the same as archive_path, in which case
+        the archive is only replaced once the new archive is complete.
+    :param minify_modules: A function that takes an iterable of (member name, source bytes) pairs and returns an
+        iterable of (member name, minified bytes) pairs, in any order
+    :return: The names of the modules that were minified
+    :rtype: list[str]
+    """
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_path)), prefix='.', suffix='.tmp')
+    os.close(fd)
+
+    # mkstemp creates the file readable only by the owner
+    mode = os.stat(output_path).st_mode if os.path.exists(output_path) else 0o644
+    os.chmod(temp_path, mode & 0o777)
+
+    try:
+        modules = _write_minified_archive(archive_path, temp_path, minify_modules)
+        replace_file(temp_path, output_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+    return modules
+
+
+def _write_minified_archive(archive_path, output_path, minify_modules):
+    with zipfile.ZipFile(archive_path) as source_archive:
+        members = source_archive.infolist()
+
+        modules = [info.filename for info in members if info.filename.endswith('.py')]
+        minified = dict(minify_modules((name, source_archive.read(name)) for name in modules))
+
+        record = None
+
+        with zipfile.ZipFile(output_path, 'w') as output_archive:
+            output_archive.comment = source_archive.comment
+
+            records = []
+
+            for info in members:
+                if _is_record(info.filename):
+                    record = info
+                    continue
+
+                if info.filename in minified:
+                    data = minified[info.filename]
+                else:
+                    data = source_archive.read(info)
+
+                output_info = zipfile.ZipInfo(info.filename, info.date_time)
+                output_info.compress_type = info.compress_type
+                output_info.comment = info.comment
+                output_info.create_system = info.create_system
+                output_info.external_attr = info.external_attr
+
+                output_archive.writestr(output_info, data)
+
+                if info.filename.endswith('/'):
+                    continue
+                elif info.filename.endswith(('.dist-info/RECORD.jws', '.dist-info/RECORD.p7s')):
+                    # Signatures of the RECORD are not themselves hashed
+                    records.append(_record_row(info.filename, '', ''))
+                else:
+                    records.append(_record_row(info.filename, _record_hash(data), len(data)))
+
+            if record is not None:
+                records.append(_record_row(record.filename, '', ''))
+
+                output_info = zipfile.ZipInfo(record.filename, record.date_time)
+                output_info.compress_type = record.compress_type
+                output_info.external_attr = record.external_attr
+                output_archive.writestr(output_info, ''.join(records).encode('utf-8'))
+
+    return modules
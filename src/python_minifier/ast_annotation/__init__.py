@@ -1,8 +1,22 @@
 """
 This module provides utilities for annotating Abstract Syntax Tree (AST) nodes with parent references.
+
+The annotations are not set as attributes of the nodes, but kept in the side tables of an :class:`Annotations`.
+The tables used are those of the active Annotations for the current thread.
 """
 
+import array
 import ast
+import threading
+
+from python_minifier.util import _reversed_fields
+
+try:
+    import typing  # noqa: F401
+    from typing import Optional  # noqa: F401
+except ImportError:
+    # Python 2
+    pass
 
 class _NoParent(ast.AST):
     """A placeholder class used to indicate that a node has no parent."""
@@ -11,8 +25,172 @@ class _NoParent(ast.AST):
         # type: () -> str
         return 'NoParent()'
 
-def add_parent(node, parent=_NoParent()):
-    # type: (ast.AST, ast.AST) -> None
+_no_parent = _NoParent()
+
+# The parser may share a single instance of these nodes between every node that uses them
+_shared_node_types = (ast.expr_context, ast.boolop, ast.operator, ast.unaryop, ast.cmpop)  # type: tuple[type, ...]
+
+class NodeIndex(object):
+    """
+    The nodes in an AST, by node type.
+
+    Context and operator nodes are not indexed, as an instance can be shared by many nodes.
+
+    >>> tree = ast.parse('a = 1; b = 2')
+    >>> index = NodeIndex()
+    >>> add_parent(tree, index=index)
+    >>> index.count('Assign')
+    2
+    >>> index.count('Pass')
+    0
+
+    The index can be limited to the node types that will be looked up, which uses less memory for large modules.
+
+    >>> index = NodeIndex(node_types=['Pass'])
+    >>> add_parent(ast.parse('pass; a = 1'), index=index)
+    >>> index.count('Pass')
+    1
+
+    :param node_types: The names of the node types to index, or None to index every node type.
+    """
+
+    def __init__(self, node_types=None):
+        # type: (Optional[typing.Iterable[str]]) -> None
+        self._node_types = None if node_types is None else frozenset(node_types)  # type: Optional[frozenset[str]]
+        self._nodes = {}  # type: dict[str, set[ast.AST]]
+
+    def add(self, node):
+        # type: (ast.AST) -> None
+        """
+        Add a node to the index.
+
+        :param node: The node to add. Its children are not added.
+        """
+
+        if isinstance(node, _shared_node_types):
+            return
+
+        node_type = node.__class__.__name__
+
+        if self._node_types is not None and node_type not in self._node_types:
+            return
+
+        nodes = self._nodes.get(node_type)
+        if nodes is None:
+            nodes = self._nodes[node_type] = set()
+
+        nodes.add(node)
+
+    def count(self, node_type):
+        # type: (str) -> int
+        """
+        The number of nodes of a type.
+
+        :param node_type: The name of the node class, e.g. 'Assert'.
+        :raises ValueError: If the node type is not indexed.
+        """
+
+        self._check_indexed(node_type)
+        return len(self._nodes.get(node_type, ()))
+
+    def nodes(self, node_type):
+        # type: (str) -> frozenset[ast.AST]
+        """
+        The nodes of a type.
+
+        :param node_type: The name of the node class, e.g. 'Assert'.
+        :raises ValueError: If the node type is not indexed.
+        """
+
+        self._check_indexed(node_type)
+        return frozenset(self._nodes.get(node_type, ()))
+
+    def _check_indexed(self, node_type):
+        # type: (str) -> None
+        if self._node_types is not None and node_type not in self._node_types:
+            raise ValueError('%s nodes are not indexed' % node_type)
+
+
+
+
+class Annotations(object):
+    """
+    Side tables of the annotations of ASTs.
+
+    Each node is given an id when it is first annotated. The parent and namespace of each node are kept in arrays
+    indexed by the node id, and the scopes of namespace nodes are kept in a separate table.
+
+    An Annotations is made the active annotations for the current thread by using it as a context manager.
+
+    >>> tree = ast.parse('a = 1')
+    >>> with Annotations():
+    ...     add_parent(tree)
+    ...     get_parent(tree.body[0]) is tree
+    True
+
+    When no Annotations is active, each thread has its own default annotations. Annotating the root of a new AST
+    with :func:`add_parent` replaces them, so the annotations of the previous AST are discarded.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self._ids = {}  # type: dict[ast.AST, int]
+        self._nodes = []  # type: list[ast.AST]
+        self._parents = array.array('i')
+        self._namespaces = array.array('i')
+        self._scopes = {}  # type: dict[int, typing.Any]
+        self._indexes = {}  # type: dict[int, NodeIndex]
+        self._previous = None  # type: Optional[Annotations]
+
+    def __enter__(self):
+        # type: () -> Annotations
+        self._previous = _local.annotations
+        _local.annotations = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # type: (typing.Any, typing.Any, typing.Any) -> None
+        _local.annotations = self._previous
+
+    def node_id(self, node):
+        # type: (ast.AST) -> int
+        """
+        The id of a node, which is assigned if the node doesn't have one.
+        """
+
+        node_id = self._ids.get(node)
+        if node_id is None:
+            node_id = self._ids[node] = len(self._nodes)
+            self._nodes.append(node)
+            self._parents.append(-1)
+            self._namespaces.append(-1)
+        return node_id
+
+
+class _Local(threading.local):
+    """The active annotations, and the default annotations of a thread."""
+
+    def __init__(self):
+        # type: () -> None
+        self.annotations = None  # type: Optional[Annotations]
+        self.default = Annotations()
+
+_local = _Local()
+
+
+def active():
+    # type: () -> Annotations
+    """
+    The active annotations for the current thread.
+
+    If no :class:`Annotations` is active, this is the default annotations of the thread.
+    """
+
+    return _local.annotations or _local.default
+
+
+def add_parent(node, parent=_NoParent(), index=None):
+    # type: (ast.AST, ast.AST, Optional[NodeIndex]) -> None
     """
     Recursively adds a parent reference to each node in the AST.
 
@@ -21,13 +199,80 @@ def add_parent(node, parent=_NoParent()):
     >>> get_parent(tree.body[0]) == tree
     True
 
+    If an index is given, every node is also added to it.
+    When the node is the root of the AST, the index can then be found from any node with :func:`get_node_index`.
+
     :param node: The current AST node.
     :param parent: The parent :class:`ast.AST` node.
+    :param index: The :class:`NodeIndex` to add the nodes to, if any.
+    """
+
+    if isinstance(parent, _NoParent) and _local.annotations is None:
+        _local.default = Annotations()
+
+    annotations = active()
+    ids = annotations._ids
+    nodes = annotations._nodes
+    parents = annotations._parents
+    namespaces = annotations._namespaces
+
+    if index is not None and isinstance(parent, _NoParent):
+        annotations._indexes[annotations.node_id(node)] = index
+
+    parent_id = -1 if isinstance(parent, _NoParent) else annotations.node_id(parent)
+
+    # The stack holds the id of the parent of each node, instead of the parent node
+    stack = [(node, parent_id)]
+    pop = stack.pop
+    push = stack.append
+
+    while stack:
+        node, parent_id = pop()
+
+        node_id = ids.get(node)
+        if node_id is None:
+            node_id = ids[node] = len(nodes)
+            nodes.append(node)
+            parents.append(parent_id)
+            namespaces.append(-1)
+        else:
+            parents[node_id] = parent_id
+
+        if index is not None:
+            index.add(node)
+
+        for field in _reversed_fields(type(node)):
+            value = getattr(node, field, None)
+            if isinstance(value, ast.AST):
+                push((value, node_id))
+            elif isinstance(value, list):
+                for child in reversed(value):
+                    if isinstance(child, ast.AST):
+                        push((child, node_id))
+
+
+def get_node_index(node):
+    # type: (ast.AST) -> Optional[NodeIndex]
     """
+    Get the index of an AST.
 
-    node._parent = parent  # type: ignore[attr-defined]
-    for child in ast.iter_child_nodes(node):
-        add_parent(child, node)
+    >>> tree = ast.parse('a = 1')
+    >>> index = NodeIndex()
+    >>> add_parent(tree, index=index)
+    >>> get_node_index(tree) is index
+    True
+
+    The index is of the nodes when the AST was annotated, and is not updated when the AST is changed.
+
+    :param node: The root of an AST annotated by :func:`add_parent`.
+    :return: The index given to :func:`add_parent` for the AST, or None if it wasn't indexed.
+    """
+
+    annotations = active()
+    node_id = annotations._ids.get(node)
+    if node_id is None:
+        return None
+    return annotations._indexes.get(node_id)
 
 def get_parent(node):
     # type: (ast.AST) -> ast.AST
@@ -44,10 +289,12 @@ def get_parent(node):
     :raises ValueError: If the node has no parent.
     """
 
-    if not hasattr(node, '_parent') or isinstance(node._parent, _NoParent):  # type: ignore[attr-defined]
+    annotations = active()
+    node_id = annotations._ids.get(node)
+    if node_id is None or annotations._parents[node_id] == -1:
         raise ValueError('Node has no parent')
 
-    return node._parent  # type: ignore[attr-defined]
+    return annotations._nodes[annotations._parents[node_id]]
 
 def set_parent(node, parent):
     # type: (ast.AST, ast.AST) -> None
@@ -79,4 +326,75 @@ def set_parent(node, parent):
     :param parent: The parent AST node.
     """
 
-    node._parent = parent  # type: ignore[attr-defined]
+    annotations = active()
+    annotations._parents[annotations.node_id(node)] = annotations.node_id(parent)
+
+def get_namespace(node):
+    # type: (ast.AST) -> ast.AST
+    """
+    Retrieves the namespace node the given AST node is in.
+
+    Namespaces are added by :func:`python_minifier.rename.add_namespace`.
+    A namespace node, such as a function, is in its own namespace.
+
+    >>> from python_minifier.rename import add_namespace
+    >>> tree = ast.parse('def f(): pass')
+    >>> add_parent(tree)
+    >>> add_namespace(tree)
+    >>> get_namespace(tree.body[0].body[0]) is tree.body[0]
+    True
+
+    :param node: The AST node whose namespace is to be retrieved.
+    :return: The namespace node.
+    :raises ValueError: If the node has no namespace.
+    """
+
+    annotations = _local.annotations or _local.default
+    node_id = annotations._ids.get(node)
+    if node_id is None or annotations._namespaces[node_id] == -1:
+        raise ValueError('Node has no namespace')
+
+    return annotations._nodes[annotations._namespaces[node_id]]
+
+def set_namespace(node, namespace):
+    # type: (ast.AST, ast.AST) -> None
+    """
+    Set the namespace node the given AST node is in.
+
+    :param node: The AST node whose namespace is to be set.
+    :param namespace: The namespace node.
+    """
+
+    annotations = _local.annotations or _local.default
+    ids = annotations._ids
+    node_id = ids[node] if node in ids else annotations.node_id(node)
+    annotations._namespaces[node_id] = ids[namespace] if namespace in ids else annotations.node_id(namespace)
+
+def get_scope(node):
+    # type: (ast.AST) -> typing.Any
+    """
+    Retrieves the scope of the given namespace node.
+
+    :param node: The namespace node whose scope is to be retrieved.
+    :return: The :class:`python_minifier.rename.scope.Scope` of the namespace.
+    :raises ValueError: If the node has no scope.
+    """
+
+    annotations = _local.annotations or _local.default
+    node_id = annotations._ids.get(node)
+    if node_id is None or node_id not in annotations._scopes:
+        raise ValueError('Node has no scope')
+
+    return annotations._scopes[node_id]
+
+def set_scope(node, scope):
+    # type: (ast.AST, typing.Any) -> None
+    """
+    Set the scope of the given namespace node.
+
+    :param node: The namespace node whose scope is to be set.
+    :param scope: The :class:`python_minifier.rename.scope.Scope` of the namespace.
+    """
+
+    annotations = active()
+    annotations._scopes[annotations.node_id(node)] = scope
@@ -1,5 +1,13 @@
 import python_minifier.ast_compat as ast
 
+from python_minifier.ast_annotation import get_namespace
+
+try:
+    from typing import Dict, Tuple  # noqa: F401
+except ImportError:
+    # Python 2
+    pass
+
 
 class CompareError(RuntimeError):
     """
@@ -15,15 +23,20 @@ class CompareError(RuntimeError):
         return 'NodeError(%r, %r)' % (self.lnode, self.rnode)
 
     def namespace(self, node):
-        if hasattr(node, 'namespace'):
-            if isinstance(node.namespace, (ast.FunctionDef, ast.ClassDef, ast.AsyncFunctionDef)):
-                return self.namespace(node.namespace) + '.' + node.namespace.name
-            elif isinstance(node.namespace, ast.Module):
-                return ''
-            else:
-                return repr(node.namespace.__class__)
-
-        return None
+        if not isinstance(node, ast.AST):
+            return None
+
+        try:
+            namespace = get_namespace(node)
+        except ValueError:
+            return None
+
+        if isinstance(namespace, (ast.FunctionDef, ast.ClassDef, ast.AsyncFunctionDef)):
+            return self.namespace(namespace) + '.' + namespace.name
+        elif isinstance(namespace, ast.Module):
+            return ''
+        else:
+            return repr(namespace.__class__)
 
     def __str__(self):
         error = ''
@@ -40,30 +53,139 @@ class CompareError(RuntimeError):
         return error
 
 
+_field_tables = {}  # type: Dict[type, Tuple[str, ...]]
+_reversed_field_tables = {}  # type: Dict[type, Tuple[str, ...]]
+
+
+def _fields(node_type):
+    """
+    The fields of a node class that are compared
+
+    The table for each class is computed once. The kind field of Constant nodes is not compared.
+
+    :param type node_type: The class of the node
+    :rtype: tuple[str]
+    """
+
+    fields = _field_tables.get(node_type)
+    if fields is None:
+        fields = tuple(field for field in node_type._fields if not (field == 'kind' and issubclass(node_type, ast.Constant)))
+        _field_tables[node_type] = fields
+        _reversed_field_tables[node_type] = tuple(reversed(fields))
+    return fields
+
+
+class _ListField(object):
+    """
+    Marks the start of a list field in the fingerprint of an AST
+    """
+
+
+def structural_fingerprint(node):
+    """
+    A fingerprint of the structure of a Python Abstract Syntax Tree
+
+    The fingerprint is a flat tuple of the node types and field values of the AST, in depth first order.
+    ASTs compare equal with :func:`compare_ast` exactly when their fingerprints are equal.
+
+    >>> structural_fingerprint(ast.parse('a = 1')) == structural_fingerprint(ast.parse('a=1'))
+    True
+
+    :param node: The root of the AST
+    :type node: :class:`ast.AST`
+    :rtype: tuple
+
+    """
+
+    tokens = []
+    stack = [node]
+
+    # This is called for every module and every constant folding and f-string candidate, so avoids attribute lookups
+    append = tokens.append
+    push = stack.append
+    extend = stack.extend
+    pop = stack.pop
+    reversed_field_tables = _reversed_field_tables
+    AST = ast.AST
+
+    while stack:
+        node = pop()
+
+        if not isinstance(node, AST):
+            append(node)
+            continue
+
+        node_type = type(node)
+        append(node_type)
+
+        fields = reversed_field_tables.get(node_type)
+        if fields is None:
+            _fields(node_type)
+            fields = reversed_field_tables[node_type]
+
+        # The fields are pushed in reverse order, so they are popped in order
+        for field in fields:
+            value = getattr(node, field, None)
+            if type(value) is list:
+                push(len(value))
+                extend(value[::-1])
+                push(_ListField)
+            else:
+                push(value)
+
+    return tuple(tokens)
+
+
 def compare_ast(l_ast, r_ast):
     """
     Compare Python Abstract Syntax Trees
 
-    >>> compare_ast(l_ast, r_ast)
+    >>> compare_ast(ast.parse('a = 1'), ast.parse('a=1'))
 
     If the AST's are not identical, an exception will be raised.
 
+    The fingerprints of the ASTs are compared first. The ASTs are only compared node by node if they differ,
+    to describe the difference.
+
     """
 
-    def counter():
-        i = 0
-        while True:
-            yield i
-            i += 1
+    if structural_fingerprint(l_ast) == structural_fingerprint(r_ast):
+        return
 
-    if type(l_ast) != type(r_ast):
-        raise CompareError(l_ast, r_ast, msg='Nodes do not match! %r != %r' % (l_ast, r_ast))
+    _compare(l_ast, r_ast)
+
+
+def _compare(l_ast, r_ast):
+    """
+    Compare ASTs node by node, raising a CompareError for the first difference
+
+    A stack of the nodes being compared is used instead of recursion.
+    """
 
-    for field in set(l_ast._fields + r_ast._fields):
+    stack = [_compare_fields(l_ast, r_ast)]
 
-        if field == 'kind' and isinstance(l_ast, ast.Constant):
+    while stack:
+        try:
+            left, right = next(stack[-1])
+        except StopIteration:
+            stack.pop()
             continue
 
+        stack.append(_compare_fields(left, right))
+
+
+def _compare_fields(l_ast, r_ast):
+    """
+    Compare the fields of two nodes
+
+    Each pair of child nodes is yielded to be compared before the next field is compared.
+    """
+
+    if type(l_ast) != type(r_ast):
+        raise CompareError(l_ast, r_ast, msg='Nodes do not match! %r != %r' % (l_ast, r_ast))
+
+    for field in _fields(type(l_ast)):
+
         if isinstance(getattr(l_ast, field, None), list):
 
             l_list = getattr(l_ast, field, None)
@@ -77,9 +199,9 @@ def compare_ast(l_ast, r_ast):
                     % (type(l_ast), field, len(l_list), type(r_ast), field, len(r_list)),
                 )
 
-            for i, left, right in zip(counter(), l_list, r_list):
+            for i, (left, right) in enumerate(zip(l_list, r_list)):
                 if isinstance(left, ast.AST) or isinstance(right, ast.AST):
-                    compare_ast(left, right)
+                    yield left, right
                 elif left != right:
                     raise CompareError(
                         l_ast,
@@ -93,7 +215,7 @@ def compare_ast(l_ast, r_ast):
             right_field = getattr(r_ast, field, None)
 
             if isinstance(left_field, ast.AST) or isinstance(right_field, ast.AST):
-                compare_ast(left_field, right_field)
+                yield left_field, right_field
             elif left_field != right_field:
                 raise CompareError(
                     l_ast,
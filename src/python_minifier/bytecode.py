@@ -0,0 +1,171 @@
+"""
+Compile minified modules to bytecode
+
+A minified module is compiled directly from the source in memory, and written as a .pyc file in the
+location the import system looks for it. This saves the cost of compiling the module when it is first imported.
+
+"""
+
+import errno
+import marshal
+import os
+import struct
+import sys
+
+from python_minifier.cache import atomic_write
+
+if sys.version_info >= (3, 4):
+    import importlib.util
+
+    MAGIC_NUMBER = importlib.util.MAGIC_NUMBER
+else:
+    import imp
+
+    MAGIC_NUMBER = imp.get_magic()
+
+INVALIDATION_MODES = ('timestamp', 'checked-hash', 'unchecked-hash')
+
+
+class CompileOptions(object):
+    """
+    Options for compiling minified modules to bytecode
+
+    :param optimize: The optimization level to compile with, as for the builtin compile function.
+        -1 uses the optimization level of the current interpreter.
+    :type optimize: int
+    :param invalidation_mode: How the import system checks the .pyc file is up to date with the source module.
+        One of 'timestamp', 'checked-hash' or 'unchecked-hash'. Hash based .pyc files require Python 3.7 or later, and
+        are the default when available.
+    :type invalidation_mode: str or None
+    """
+
+    optimize = -1
+    invalidation_mode = None
+
+    def __init__(self, optimize=-1, invalidation_mode=None):
+        if optimize not in (-1, 0, 1, 2):
+            raise ValueError('optimize must be -1, 0, 1 or 2')
+
+        if sys.version_info < (3, 2) and optimize not in (-1, sys.flags.optimize):
+            raise ValueError('optimize must be the optimization level of the current interpreter on Python 2')
+
+        if invalidation_mode is None:
+            invalidation_mode = 'checked-hash' if sys.version_info >= (3, 7) else 'timestamp'
+
+        if invalidation_mode not in INVALIDATION_MODES:
+            raise ValueError('invalidation_mode must be one of ' + ', '.join(repr(mode) for mode in INVALIDATION_MODES))
+
+        if invalidation_mode != 'timestamp' and sys.version_info < (3, 7):
+            raise ValueError('Hash based .pyc files require Python 3.7 or later')
+
+        self.optimize = optimize
+        self.invalidation_mode = invalidation_mode
+
+    def __repr__(self):
+        return 'CompileOptions(optimize=%r, invalidation_mode=%r)' % (self.optimize, self.invalidation_mode)
+
+    @property
+    def optimization_level(self):
+        """
+        The optimization level the module is compiled with
+
+        :rtype: int
+        """
+
+        return sys.flags.optimize if self.optimize == -1 else self.optimize
+
+
+def compile_module(source, filename, options, source_mtime=None):
+    """
+    Compile a module to the content of a .pyc file
+
+    :param bytes source: The module source, exactly as it is written to the source file
+    :param str filename: The path of the source file, which is recorded in the code object
+    :param options: The compile options
+    :type options: CompileOptions
+    :param source_mtime: The modification time of the source file, required for timestamp invalidation
+    :type source_mtime: float or None
+    :rtype: bytes
+    """
+
+    if sys.version_info >= (3, 2):
+        code = compile(source, filename, 'exec', dont_inherit=True, optimize=options.optimize)
+    else:
+        code = compile(source, filename, 'exec', 0, True)
+
+    if options.invalidation_mode == 'timestamp':
+        if source_mtime is None:
+            raise ValueError('The source modification time is required for timestamp invalidation')
+
+        mtime = struct.pack('<I', int(source_mtime) & 0xFFFFFFFF)
+        size = struct.pack('<I', len(source) & 0xFFFFFFFF)
+
+        if sys.version_info >= (3, 7):
+            header = MAGIC_NUMBER + struct.pack('<I', 0) + mtime + size
+        elif sys.version_info >= (3, 3):
+            header = MAGIC_NUMBER + mtime + size
+        else:
+            header = MAGIC_NUMBER + mtime
+    else:
+        flags = 0b01 | (0b10 if options.invalidation_mode == 'checked-hash' else 0)
+        header = MAGIC_NUMBER + struct.pack('<I', flags) + importlib.util.source_hash(source)
+
+    return header + marshal.dumps(code)
+
+
+def cache_path(path, options):
+    """
+    The path the import system looks for the .pyc file of a source file
+
+    :param str path: The path of the source file
+    :param options: The compile options
+    :type options: CompileOptions
+    :rtype: str
+    """
+
+    optimization_level = options.optimization_level
+
+    if sys.version_info >= (3, 5):
+        return importlib.util.cache_from_source(path, optimization=optimization_level or '')
+    elif sys.version_info >= (3, 4):
+        return importlib.util.cache_from_source(path, debug_override=not optimization_level)
+    elif sys.version_info >= (3, 2):
+        return imp.cache_from_source(path, debug_override=not optimization_level)
+    else:
+        return path + ('o' if optimization_level else 'c')
+
+
+def write_bytecode(path, source, options):
+    """
+    Compile a source file that has just been written, and write its .pyc file
+
+    The source file is not read again, the module is compiled from the source given.
+
+    :param str path: The path of the source file
+    :param bytes source: The content that was written to the source file
+    :param options: The compile options
+    :type options: CompileOptions
+    :return: The path of the .pyc file
+    :rtype: str
+    """
+
+    source_mtime = None
+    if options.invalidation_mode == 'timestamp':
+        source_mtime = os.stat(path).st_mtime
+
+    bytecode = compile_module(source, path, options, source_mtime)
+
+    pyc_path = cache_path(path, options)
+
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(pyc_path)))
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+    atomic_write(pyc_path, bytecode)
+
+    # Give the .pyc file the same permissions as the source, like the import system does
+    os.chmod(pyc_path, os.stat(path).st_mode & 0o666)
+
+    return pyc_path
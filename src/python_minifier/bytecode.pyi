@@ -0,0 +1,28 @@
+from typing import Optional, Text, Tuple
+
+MAGIC_NUMBER: bytes
+INVALIDATION_MODES: Tuple[Text, ...]
+
+
+class CompileOptions:
+    optimize: int
+    invalidation_mode: Optional[Text]
+
+    def __init__(
+        self,
+        optimize: int = ...,
+        invalidation_mode: Optional[Text] = ...
+    ):
+        ...
+
+    @property
+    def optimization_level(self) -> int: ...
+
+
+def compile_module(source: bytes, filename: Text, options: CompileOptions, source_mtime: Optional[float] = ...) -> bytes: ...
+
+
+def cache_path(path: Text, options: CompileOptions) -> Text: ...
+
+
+def write_bytecode(path: Text, source: bytes, options: CompileOptions) -> Text: ...
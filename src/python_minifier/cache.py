@@ -0,0 +1,233 @@
+"""
+A content addressed cache of minification results
+
+Results are stored as files in a cache directory, named by a hash of everything that can affect the
+minified output - the source bytes, the minification options, the python-minifier version and source
+files, and the python interpreter version.
+
+The cache is safe to share between concurrent processes. Entries are written to a temporary file
+and atomically renamed into place, so readers only ever see complete entries.
+
+The least recently used entries are evicted when the cache grows larger than its size limit.
+
+"""
+
+import errno
+import hashlib
+import os
+import sys
+import tempfile
+
+try:
+    replace_file = os.replace
+except AttributeError:
+    # Python 2
+    replace_file = os.rename
+
+
+def atomic_write(path, data):
+    """
+    Write a file so that readers see either the previous content or the complete new content
+
+    The data is written to a temporary file in the same directory, which is then renamed over path.
+
+    :param str path: The file to write
+    :param bytes data: The new file content
+
+    """
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        replace_file(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def source_digest(directory):
+    """
+    A hash of the python source files in a directory tree
+
+    The installed python-minifier version is not changed by editing a development or editable install,
+    so a hash of the package source is included in cache keys as well.
+
+    :param str directory: The directory to hash the source files of
+    :rtype: str
+
+    """
+
+    digest = hashlib.sha256()
+
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for file in sorted(files):
+            if not file.endswith('.py'):
+                continue
+
+            path = os.path.join(root, file)
+            with open(path, 'rb') as f:
+                data = f.read()
+
+            name = os.path.relpath(path, directory).replace(os.sep, '/').encode('utf-8')
+            digest.update(str(len(name)).encode() + b':' + name + str(len(data)).encode() + b':' + data)
+
+    return digest.hexdigest()
+
+
+class ResultCache(object):
+    """
+    An on-disk cache of minified modules
+
+    :param str directory: The cache directory, which is created if it doesn't exist
+    :param str version: The python-minifier version
+    :param int max_size: The size in bytes the cache will be trimmed to by :meth:`evict`
+
+    """
+
+    def __init__(self, directory, version, max_size=256 * 1024 * 1024):
+        self.directory = directory
+        self.version = version
+        self.max_size = max_size
+
+        # Hashed once here, so the workers the cache is passed to don't hash it again
+        self.source_digest = source_digest(os.path.dirname(os.path.abspath(__file__)))
+
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, source, options):
+        """
+        Create the cache key for a module
+
+        :param bytes source: The source module
+        :param dict options: The keyword arguments that will be passed to :func:`python_minifier.minify`
+        :rtype: str
+
+        """
+
+        digest = hashlib.sha256()
+
+        def update(value):
+            if not isinstance(value, bytes):
+                value = value.encode('utf-8')
+            digest.update(str(len(value)).encode() + b':' + value)
+
+        update(self.version)
+        update(self.source_digest)
+        update(sys.version)
+        update(repr(sys.version_info))
+
+        for name in sorted(options):
+            update(name + '=' + repr(options[name]))
+
+        update(source)
+
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        """
+        Get a cached result
+
+        A hit marks the entry as recently used.
+
+        :param str key: The cache key
+        :return: The cached minified module, or None if there is no entry for the key
+        :rtype: bytes or None
+
+        """
+
+        path = self._path(key)
+
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except (IOError, OSError):
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path, None)
+        except OSError:
+            # The entry may have been evicted by another process
+            pass
+
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """
+        Add a result to the cache
+
+        :param str key: The cache key
+        :param bytes data: The minified module
+
+        """
+
+        directory = os.path.dirname(self._path(key))
+
+        try:
+            os.makedirs(directory)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+        try:
+            atomic_write(self._path(key), data)
+        except (IOError, OSError):
+            # Another process may have won the race to write this entry
+            pass
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache is no larger than max_size
+        """
+
+        entries = []
+        total_size = 0
+
+        for root, _dirs, files in os.walk(self.directory):
+            for file in files:
+                if file.endswith('.tmp'):
+                    continue
+
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        if total_size <= self.max_size:
+            return
+
+        for _mtime, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                # Already removed by another process
+                pass
+
+            total_size -= size
+            if total_size <= self.max_size:
+                return
+
+    def stats(self):
+        """
+        A summary of cache hits and misses
+
+        :rtype: str
+        """
+
+        lookups = self.hits + self.misses
+        hit_rate = (100.0 * self.hits / lookups) if lookups else 0.0
+        return 'cache: %d hits, %d misses (%.1f%% hit rate)' % (self.hits, self.misses, hit_rate)
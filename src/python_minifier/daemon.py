@@ -0,0 +1,194 @@
+"""
+A long running pyminify server
+
+The server listens on a unix domain socket, and keeps python-minifier loaded between requests.
+Clients connect, send a single request and receive a single response on each connection.
+
+A message is a JSON header line followed by the number of bytes given by the header's ``size`` field.
+A request header has ``filename`` and ``options`` fields, and is followed by the source module.
+A response header has a ``status`` field, which is either ``ok`` followed by the minified module,
+or ``error`` with the exception in the ``error`` field.
+
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+
+try:
+    import socketserver
+except ImportError:
+    # Python 2
+    import SocketServer as socketserver  # type: ignore
+
+
+class DaemonError(RuntimeError):
+    """
+    Raised when the server fails to minify a module
+    """
+
+
+def write_message(stream, header, data):
+    """
+    Write a message to a stream
+
+    :param stream: A binary file-like object
+    :param dict header: The message header
+    :param bytes data: The message body
+    """
+
+    header = dict(header, size=len(data))
+    stream.write(json.dumps(header).encode('utf-8') + b'\n')
+    stream.write(data)
+    stream.flush()
+
+
+def read_message(stream):
+    """
+    Read a message from a stream
+
+    :param stream: A binary file-like object
+    :return: The message header and body
+    :rtype: tuple[dict, bytes]
+    """
+
+    line = stream.readline()
+    if not line.endswith(b'\n'):
+        raise DaemonError('Connection closed before a complete message was received')
+
+    header = json.loads(line.decode('utf-8'))
+
+    data = stream.read(header['size'])
+    if len(data) != header['size']:
+        raise DaemonError('Connection closed before a complete message was received')
+
+    return header, data
+
+
+class MinifyRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        header, source = read_message(self.rfile)
+
+        try:
+            minified = self.server.minify(source, header['filename'], header['options'])
+        except Exception as e:
+            write_message(self.wfile, {'status': 'error', 'error': '%s: %s' % (e.__class__.__name__, e)}, b'')
+            return
+
+        write_message(self.wfile, {'status': 'ok'}, minified)
+
+
+class MinifyServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    A server that minifies modules sent to a unix domain socket
+
+    Each connection is handled by a new thread, which should hand the work to a worker pool.
+    The server stops when it has been idle for idle_timeout seconds.
+
+    :param str socket_path: The path of the unix domain socket to listen on
+    :param minify: A function that minifies a module. It is called with the source bytes, the filename and
+        the options dict from the request, and should return the minified bytes.
+    :param float idle_timeout: The number of seconds without a request before the server stops
+
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, minify, idle_timeout):
+        if os.path.exists(socket_path):
+            if is_listening(socket_path):
+                raise DaemonError('A server is already listening on ' + socket_path)
+
+            # This is left over from a server that didn't exit cleanly
+            os.remove(socket_path)
+
+        socketserver.UnixStreamServer.__init__(self, socket_path, MinifyRequestHandler)
+
+        self.minify = minify
+        self.idle_timeout = idle_timeout
+        self.timeout = min(idle_timeout, 1.0)
+
+        self._lock = threading.Lock()
+        self._active_requests = 0
+        self._last_activity = time.time()
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self._active_requests += 1
+        socketserver.ThreadingMixIn.process_request(self, request, client_address)
+
+    def shutdown_request(self, request):
+        socketserver.UnixStreamServer.shutdown_request(self, request)
+        with self._lock:
+            self._active_requests -= 1
+            self._last_activity = time.time()
+
+    def is_idle(self):
+        with self._lock:
+            return self._active_requests == 0 and time.time() - self._last_activity >= self.idle_timeout
+
+    def serve_until_idle(self):
+        """
+        Handle requests until the server has been idle for idle_timeout seconds
+        """
+
+        try:
+            while not self.is_idle():
+                self.handle_request()
+        finally:
+            self.server_close()
+            try:
+                os.remove(self.server_address)
+            except OSError:
+                pass
+
+
+def is_listening(socket_path):
+    """
+    Is a server accepting connections on a unix domain socket
+
+    :param str socket_path: The path of the socket
+    :rtype: bool
+    """
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        return True
+    except socket.error:
+        return False
+    finally:
+        sock.close()
+
+
+def request(socket_path, source, filename, options):
+    """
+    Ask a server to minify a module
+
+    :param str socket_path: The path of the unix domain socket the server is listening on
+    :param bytes source: The source module
+    :param str filename: The filename to use for error reporting
+    :param dict options: The minification options, which must be JSON serializable
+    :return: The minified module
+    :rtype: bytes
+    :raises DaemonError: If the server failed to minify the module
+    """
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        stream = sock.makefile('rwb')
+        try:
+            write_message(stream, {'filename': filename, 'options': options}, source)
+            header, minified = read_message(stream)
+        finally:
+            stream.close()
+    finally:
+        sock.close()
+
+    if header['status'] != 'ok':
+        raise DaemonError(header['error'])
+
+    return minified
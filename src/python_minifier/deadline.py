@@ -0,0 +1,82 @@
+"""
+Cooperative time limits for minifying a module
+
+A time limit is made active for the current thread with :class:`limit`. The stages of minification, and the loops
+inside them that can take a long time for unusual modules, call :func:`check`. This raises
+:class:`TimeBudgetExceeded` once the time limit has passed, and does nothing when there is no active limit.
+
+"""
+
+import threading
+import time
+
+try:
+    _clock = time.perf_counter
+except AttributeError:
+    # Python 2
+    _clock = time.time
+
+_local = threading.local()
+
+
+class TimeBudgetExceeded(RuntimeError):
+    """
+    Raised when minifying a module takes longer than its time budget
+    """
+
+    def __str__(self):
+        return 'The time budget for minifying the module was exceeded'
+
+
+class limit(object):
+    """
+    Make a time limit active for the current thread
+
+    :param seconds: The time allowed from entering the context, or None for no limit
+    :type seconds: float or None
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def __enter__(self):
+        self.previous = getattr(_local, 'deadline', None)
+        _local.deadline = None if self.seconds is None else _clock() + self.seconds
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.deadline = self.previous
+
+
+def after(seconds):
+    """
+    The deadline a number of seconds from now
+
+    :param float seconds: The time allowed from now
+    :rtype: float
+    """
+
+    return _clock() + seconds
+
+
+def remaining(deadline):
+    """
+    The time left before a deadline
+
+    :param float deadline: A deadline from :func:`after`
+    :return: The seconds left, which is not positive once the deadline has passed
+    :rtype: float
+    """
+
+    return deadline - _clock()
+
+
+def check():
+    """
+    Check the active time limit has not passed
+
+    :raises TimeBudgetExceeded: If the active time limit has passed
+    """
+
+    deadline = getattr(_local, 'deadline', None)
+    if deadline is not None and _clock() > deadline:
+        raise TimeBudgetExceeded()
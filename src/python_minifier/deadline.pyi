@@ -0,0 +1,29 @@
+from types import TracebackType
+from typing import Optional, Type
+
+
+class TimeBudgetExceeded(RuntimeError): ...
+
+
+class limit:
+    seconds: Optional[float]
+
+    def __init__(self, seconds: Optional[float]) -> None: ...
+
+    def __enter__(self) -> None: ...
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType]
+    ) -> None: ...
+
+
+def after(seconds: float) -> float: ...
+
+
+def remaining(deadline: float) -> float: ...
+
+
+def check() -> None: ...
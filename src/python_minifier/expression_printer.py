@@ -83,14 +83,19 @@ class ExpressionPrinter(object):
         Prefer to call the correct method directly if you already know
         the node type.
 
+        A visit_ method that prints a child expression last may return the child instead of visiting it.
+        The child is then visited by the loop here, so long chains of these nodes (like `not not a`)
+        don't recurse. Methods that return a child must only be called through this method.
+
         :param node: The node to visit
         :type node: ast.Node
 
         """
 
-        method = 'visit_' + node.__class__.__name__
-        visitor = getattr(self, method, self.visit_Unknown)
-        return visitor(node)
+        while node is not None:
+            method = 'visit_' + node.__class__.__name__
+            visitor = getattr(self, method, self.visit_Unknown)
+            node = visitor(node)
 
     def visit_Unknown(self, node):
         raise RuntimeError('Unknown node %r' % node)
@@ -127,55 +132,89 @@ class ExpressionPrinter(object):
         self.printer.bytesliteral(node.s)
 
     def visit_List(self, node):
-        self.printer.delimiter('[')
-        self._exprlist(node.elts)
-        self.printer.delimiter(']')
+        self._display(node)
 
     def visit_Tuple(self, node):
-
-        if len(node.elts) == 0:
-            self.printer.delimiter('(')
-            self.printer.delimiter(')')
-            return
-
-        self._exprlist(node.elts)
-
-        if len(node.elts) == 1:
-            self.printer.delimiter(',')
+        self._display(node)
 
     def visit_Set(self, node):
-        self.printer.delimiter('{')
-        self._exprlist(node.elts)
-        self.printer.delimiter('}')
+        self._display(node)
 
     def visit_Dict(self, node):
-        assert isinstance(node, ast.Dict)
+        self._display(node)
 
-        def key_datum(key, datum):
-
-            if key is None:
-                self.printer.operator('**')
-
-                if 0 < self.precedence(datum) <= 7:
-                    self.printer.delimiter('(')
-                    self._expression(datum)
-                    self.printer.delimiter(')')
-                else:
-                    self._expression(datum)
-            else:
-                self._expression(key)
-                self.printer.delimiter(':')
+    def _display(self, node):
+        """
+        Print a list, tuple, set or dict display
 
-                self._expression(datum)
+        Displays nested in displays, like [[[a]]], are printed using an explicit stack instead of recursing.
+        The stack holds the (function, argument) calls that print the rest of the displays, in reverse order.
+        """
 
-        self.printer.delimiter('{')
+        delimiter = self.printer.delimiter
+        stack = []
 
-        delimiter = Delimiter(self.printer)
-        for key, datum in zip(node.keys, node.values):
-            delimiter.new_item()
-            key_datum(key, datum)
+        def add_element(items, element):
+            if isinstance(element, ast.Tuple) and len(element.elts) > 0:
+                items.append((delimiter, '('))
+                items.append((expand, element))
+                items.append((delimiter, ')'))
+            elif isinstance(element, (ast.List, ast.Tuple, ast.Set, ast.Dict)):
+                items.append((expand, element))
+            else:
+                items.append((self._expression, element))
+
+        def expand(display):
+            items = []
+
+            if isinstance(display, ast.Dict):
+                items.append((delimiter, '{'))
+                for i, (key, datum) in enumerate(zip(display.keys, display.values)):
+                    if i > 0:
+                        items.append((delimiter, ','))
+
+                    if key is None:
+                        items.append((self.printer.operator, '**'))
+                        if 0 < self.precedence(datum) <= 7:
+                            items.append((delimiter, '('))
+                            items.append((self._expression, datum))
+                            items.append((delimiter, ')'))
+                        else:
+                            add_element(items, datum)
+                    else:
+                        add_element(items, key)
+                        items.append((delimiter, ':'))
+                        add_element(items, datum)
+                items.append((delimiter, '}'))
+
+            elif isinstance(display, ast.Tuple) and len(display.elts) == 0:
+                items.append((delimiter, '('))
+                items.append((delimiter, ')'))
 
-        self.printer.delimiter('}')
+            else:
+                if isinstance(display, ast.List):
+                    items.append((delimiter, '['))
+                elif isinstance(display, ast.Set):
+                    items.append((delimiter, '{'))
+
+                for i, element in enumerate(display.elts):
+                    if i > 0:
+                        items.append((delimiter, ','))
+                    add_element(items, element)
+
+                if isinstance(display, ast.List):
+                    items.append((delimiter, ']'))
+                elif isinstance(display, ast.Set):
+                    items.append((delimiter, '}'))
+                elif len(display.elts) == 1:
+                    items.append((delimiter, ','))
+
+            stack.extend(reversed(items))
+
+        expand(node)
+        while stack:
+            function, argument = stack.pop()
+            function(argument)
 
     def visit_Ellipsis(self, node):
         self.printer.delimiter('.')
@@ -228,7 +267,7 @@ class ExpressionPrinter(object):
             self._expression(node.operand)
             self.printer.delimiter(')')
         else:
-            self._expression(node.operand)
+            return self._last_expression(node.operand)
 
     def visit_UAdd(self, node):
         self.printer.operator('+')
@@ -243,9 +282,26 @@ class ExpressionPrinter(object):
         self.printer.operator('~')
 
     def visit_BinOp(self, node):
+        # A chain of left associative operators like a+b+c is nested in the left operand of each BinOp.
+        # The chain is printed in a loop instead of recursing down it.
+        chain = []
+        while (
+            isinstance(node.left, ast.BinOp)
+            and self._is_left_associative(node.op)
+            and self.precedence(node.left) >= self.precedence(node.op)
+        ):
+            chain.append(node)
+            node = node.left
+
         self._lhs(node.left, node.op)
+
+        while chain:
+            self.visit(node.op)
+            self._rhs(node.right, node.op)
+            node = chain.pop()
+
         self.visit(node.op)
-        self._rhs(node.right, node.op)
+        return self._rhs(node.right, node.op, last=True)
 
     def visit_Add(self, node):
         self.printer.operator('+')
@@ -364,10 +420,7 @@ class ExpressionPrinter(object):
         self.printer.keyword('not')
         self.printer.keyword('in')
 
-    def visit_Call(self, node):
-
-        self._lhs(node.func, node)
-
+    def _call_trailer(self, node):
         self.printer.delimiter('(')
 
         single_call = len(node.args) == 1 and not node.keywords and not hasattr(node, 'starargs') and not hasattr(node, 'kwargs')
@@ -422,38 +475,51 @@ class ExpressionPrinter(object):
 
         self.printer.keyword('else')
 
-        self._expression(node.orelse)
+        return self._last_expression(node.orelse)
 
     def visit_Attribute(self, node):
-        value_precedence = self.precedence(node.value)
-        attr_precedence = self.precedence(node)
+        """
+        Print an attribute reference, subscription or call
+
+        A chain of these like a.b[c](d) is nested in the value of each node.
+        The chain is printed in a loop instead of recursing down it: the innermost value is printed,
+        followed by the trailer of each node in the chain.
+        """
+
+        chain = []
+        while isinstance(node, (ast.Attribute, ast.Subscript, ast.Call)):
+            chain.append(node)
+            node = node.func if isinstance(node, ast.Call) else node.value
 
-        if (value_precedence != 0 and (attr_precedence > value_precedence)) or is_constant_node(node.value, ast.Num):
+        primary = chain[-1]
+        value_precedence = self.precedence(node)
+
+        if (value_precedence != 0 and (self.precedence(primary) > value_precedence)) or (
+            isinstance(primary, ast.Attribute) and is_constant_node(node, ast.Num)
+        ):
             self.printer.delimiter('(')
-            self._expression(node.value)
+            self._expression(node)
             self.printer.delimiter(')')
         else:
-            self._expression(node.value)
+            self._expression(node)
+
+        while chain:
+            primary = chain.pop()
+            if isinstance(primary, ast.Attribute):
+                self.printer.delimiter('.')
+                self.printer.identifier(primary.attr)
+            elif isinstance(primary, ast.Subscript):
+                self._subscript_trailer(primary)
+            else:
+                self._call_trailer(primary)
 
-        self.printer.delimiter('.')
-        self.printer.identifier(node.attr)
+    visit_Subscript = visit_Call = visit_Attribute
 
     # endregion
 
     # region Subscripting
 
-    def visit_Subscript(self, node):
-
-        value_precedence = self.precedence(node.value)
-        slice_precedence = 17  # self.precedence(node)
-
-        if value_precedence != 0 and (slice_precedence > value_precedence):
-            self.printer.delimiter('(')
-            self._expression(node.value)
-            self.printer.delimiter(')')
-        else:
-            self._expression(node.value)
-
+    def _subscript_trailer(self, node):
         self.printer.delimiter('[')
 
         if isinstance(node.slice, ast.Index):
@@ -561,7 +627,7 @@ class ExpressionPrinter(object):
 
         self.printer.delimiter(':')
 
-        self._expression(node.body)
+        return self._last_expression(node.body)
 
     def visit_arguments(self, node):
         args = getattr(node, 'posonlyargs', []) + node.args
@@ -664,6 +730,19 @@ class ExpressionPrinter(object):
         else:
             self.visit(expression)
 
+    def _last_expression(self, expression):
+        """
+        Print an expression that is the last thing printed by a visit_ method
+
+        An expression that needs no parentheses is returned instead, for the visit_ method to return.
+        """
+
+        if isinstance(expression, (ast.Yield, ast.YieldFrom, ast.Tuple, ast.NamedExpr)):
+            self._expression(expression)
+            return None
+
+        return expression
+
     def _testlist(self, test):
         if isinstance(test, (ast.Yield, ast.YieldFrom)):
             self.printer.delimiter('(')
@@ -714,7 +793,14 @@ class ExpressionPrinter(object):
         else:
             self._expression(left_node)
 
-    def _rhs(self, right_node, op_node):
+    def _rhs(self, right_node, op_node, last=False):
+        """
+        Print the right operand of an operator
+
+        If last is True, an operand that needs no parentheses is returned instead of printed,
+        as for :meth:`_last_expression`.
+        """
+
         right_precedence = self.precedence(right_node)
         op_precedence = self.precedence(op_node)
 
@@ -728,6 +814,8 @@ class ExpressionPrinter(object):
             self.printer.delimiter('(')
             self._expression(right_node)
             self.printer.delimiter(')')
+        elif last:
+            return self._last_expression(right_node)
         else:
             self._expression(right_node)
 
@@ -751,4 +839,4 @@ class ExpressionPrinter(object):
     def visit_Await(self, node):
         assert isinstance(node, ast.Await)
         self.printer.keyword('await')
-        self._rhs(node.value, node)
+        return self._rhs(node.value, node, last=True)
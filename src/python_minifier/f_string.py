@@ -12,9 +12,11 @@ import re
 import python_minifier.ast_compat as ast
 
 from python_minifier import UnstableMinification
-from python_minifier.ast_compare import CompareError, compare_ast
+from python_minifier.ast_compare import CompareError, compare_ast, structural_fingerprint
 from python_minifier.expression_printer import ExpressionPrinter
 from python_minifier.ministring import MiniString
+from python_minifier.deadline import check as check_deadline
+from python_minifier.stats import count
 from python_minifier.token_printer import TokenTypes
 from python_minifier.util import is_constant_node
 
@@ -31,14 +33,32 @@ class FString(object):
         self.allowed_quotes = allowed_quotes
         self.pep701 = pep701
 
+        # The fingerprint of node, computed when the first candidate is checked
+        self._fingerprint = None
+
     def is_correct_ast(self, code):
+        count('fstring_candidates')
+        check_deadline()
+
         try:
             c = ast.parse(code, 'FString candidate', mode='eval')
-            compare_ast(self.node, c.body)
-            return True
         except Exception:
             return False
 
+        return structural_fingerprint(c.body) == self.fingerprint()
+
+    def fingerprint(self):
+        """
+        The structural fingerprint of the f-string node, which candidates must match
+
+        :rtype: tuple
+        """
+
+        if self._fingerprint is None:
+            self._fingerprint = structural_fingerprint(self.node)
+
+        return self._fingerprint
+
     def complete_debug_specifier(self, partial_specifier_candidates, value_node):
         assert isinstance(value_node, ast.FormattedValue)
 
@@ -70,6 +90,8 @@ class FString(object):
                 nested_allowed.remove(quote)
 
             for v in self.node.values:
+                check_deadline()
+
                 if is_constant_node(v, ast.Str):
 
                     # Could this be used as a debug specifier?
@@ -131,6 +153,9 @@ class OuterFString(FString):
             except SyntaxError as syntax_error:
                 raise UnstableMinification(syntax_error, '', candidate)
 
+            if structural_fingerprint(minified_f_string) == self.fingerprint():
+                continue
+
             try:
                 compare_ast(self.node, minified_f_string)
             except CompareError as compare_error:
@@ -189,25 +214,22 @@ class FormattedValue(ExpressionPrinter):
         return self.candidates
 
     def is_curly(self, node):
-        if isinstance(node, (ast.SetComp, ast.DictComp, ast.Set, ast.Dict)):
-            return True
-
-        if isinstance(node, (ast.Expr, ast.Attribute, ast.Subscript)):
-            return self.is_curly(node.value)
-
-        if isinstance(node, (ast.Compare, ast.BinOp)):
-            return self.is_curly(node.left)
-
-        if isinstance(node, ast.Call):
-            return self.is_curly(node.func)
-
-        if isinstance(node, ast.BoolOp):
-            return self.is_curly(node.values[0])
-
-        if isinstance(node, ast.IfExp):
-            return self.is_curly(node.body)
-
-        return False
+        while True:
+            if isinstance(node, (ast.SetComp, ast.DictComp, ast.Set, ast.Dict)):
+                return True
+
+            if isinstance(node, (ast.Expr, ast.Attribute, ast.Subscript)):
+                node = node.value
+            elif isinstance(node, (ast.Compare, ast.BinOp)):
+                node = node.left
+            elif isinstance(node, ast.Call):
+                node = node.func
+            elif isinstance(node, ast.BoolOp):
+                node = node.values[0]
+            elif isinstance(node, ast.IfExp):
+                node = node.body
+            else:
+                return False
 
     def visit_Str(self, node):
         self.printer.append(str(Str(node.s, self.allowed_quotes, self.pep701)), TokenTypes.NonNumberLiteral)
@@ -223,7 +245,7 @@ class FormattedValue(ExpressionPrinter):
 
     def visit_Lambda(self, node):
         self.printer.delimiter('(')
-        super().visit_Lambda(node)
+        self.visit(super().visit_Lambda(node))
         self.printer.delimiter(')')
 
     def _finalize(self):
@@ -0,0 +1,128 @@
+"""
+A record of modules that have been minified in place
+
+The manifest stores the modification time, size and content hash of each file written by pyminify.
+When a file still matches its manifest entry it has already been minified, and doesn't need to be
+minified again.
+
+"""
+
+import hashlib
+import json
+import os
+
+from python_minifier.cache import atomic_write
+
+
+def _mtime(stat):
+    return getattr(stat, 'st_mtime_ns', stat.st_mtime)
+
+
+def file_state(path, data):
+    """
+    Get the manifest entry for a file that has just been written
+
+    :param str path: The path of the file
+    :param bytes data: The content that was written to the file
+    :rtype: dict
+
+    """
+
+    stat = os.stat(path)
+
+    return {
+        'mtime': _mtime(stat),
+        'size': stat.st_size,
+        'sha256': hashlib.sha256(data).hexdigest()
+    }
+
+
+class Manifest(object):
+    """
+    The manifest of previously minified files
+
+    :param str path: The path of the manifest file. It doesn't need to exist yet.
+
+    """
+
+    version = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.modified = False
+        self._files = {}
+
+        try:
+            with open(path, 'rb') as f:
+                manifest = json.loads(f.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            # A missing or unreadable manifest is the same as an empty one
+            return
+
+        if manifest.get('version') == self.version:
+            self._files = manifest['files']
+
+    def __len__(self):
+        return len(self._files)
+
+    def _key(self, path):
+        return os.path.abspath(path)
+
+    def is_unchanged(self, path):
+        """
+        Does a file still match its manifest entry
+
+        Files are compared by modification time and size. If only the modification time differs,
+        the content hash is compared as well.
+
+        :param str path: The path of the file
+        :rtype: bool
+
+        """
+
+        entry = self._files.get(self._key(path))
+        if entry is None:
+            return False
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+
+        if stat.st_size != entry['size']:
+            return False
+
+        if _mtime(stat) == entry['mtime']:
+            return True
+
+        with open(path, 'rb') as f:
+            if hashlib.sha256(f.read()).hexdigest() != entry['sha256']:
+                return False
+
+        # The file has been touched but not changed
+        self.record(path, dict(entry, mtime=_mtime(stat)))
+        return True
+
+    def record(self, path, state):
+        """
+        Record the state of a file
+
+        :param str path: The path of the file
+        :param dict state: The manifest entry for the file, as returned by :func:`file_state`
+
+        """
+
+        self._files[self._key(path)] = state
+        self.modified = True
+
+    def save(self):
+        """
+        Write the manifest file, if any entries have changed
+        """
+
+        if not self.modified:
+            return
+
+        manifest = {'version': self.version, 'files': self._files}
+        atomic_write(self.path, json.dumps(manifest, sort_keys=True).encode('utf-8'))
+        self.modified = False
@@ -303,32 +303,41 @@ class ModulePrinter(ExpressionPrinter):
 
     # region Compound Statements
 
-    def visit_If(self, node, el=False):
+    def visit_If(self, node):
         assert isinstance(node, ast.If)
 
-        self.printer.newline()
+        # An elif chain is nested in the orelse of each If, and is printed in a loop instead of recursing
+        el = False
 
-        if el:
-            self.printer.keyword('elif')
-        else:
-            self.printer.keyword('if')
+        while True:
+            self.printer.newline()
 
-        self._expression(node.test)
-        self.printer.delimiter(':')
+            if el:
+                self.printer.keyword('elif')
+            else:
+                self.printer.keyword('if')
 
-        self._suite(node.body)
+            self._expression(node.test)
+            self.printer.delimiter(':')
+
+            self._suite(node.body)
 
-        if node.orelse:
             if len(node.orelse) == 1 and isinstance(node.orelse[0], ast.If):
-                # elif
-                self.visit_If(node.orelse[0], el=True)
-                self.printer.newline()
-            else:
+                node = node.orelse[0]
+                el = True
+                continue
+
+            if node.orelse:
                 # an else block
                 self.printer.keyword('else')
                 self.printer.delimiter(':')
                 self._suite(node.orelse)
 
+            break
+
+        if el:
+            self.printer.newline()
+
     def visit_For(self, node, is_async=False):
         assert isinstance(node, (ast.For, ast.AsyncFor))
 
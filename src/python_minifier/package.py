@@ -0,0 +1,559 @@
+"""
+Rename module level names across the modules of a package
+
+When a package is self-contained, the module level names that other modules of the package import can be renamed
+too, as long as every module that uses a name is changed to use the new name. This is done in three steps:
+
+ - Each module is analysed, to find the module level names it binds and the names it uses from other modules.
+ - The results are combined into a graph of which module uses which names of other modules. Names that another
+   module uses are given new names that are unique in the module that binds them, unless the way they are used
+   can't be followed.
+ - Each module has the new names applied, to the names it binds and to the names it imports or reads as attributes
+   of other modules, and is then minified.
+
+The modules are analysed and minified in parallel by a pool of workers.
+
+Names are only followed through import statements and attribute access on imported modules. A module that is used
+in any other way, such as being passed to a function or star imported, keeps all its module level names.
+
+"""
+
+import functools
+import multiprocessing
+import multiprocessing.pool
+import posixpath
+
+import python_minifier.ast_compat as ast
+from python_minifier.ast_annotation import Annotations, add_parent, get_parent, get_scope
+from python_minifier.util import copy_ast
+
+
+class ModuleSymbols(object):
+    """
+    The module level names of a module, and the names it uses from other modules
+
+    :param str name: The dotted name of the module
+    :param bool is_package: If the module is the ``__init__`` module of a package
+
+    """
+
+    def __init__(self, name, is_package):
+        self.name = name
+        self.is_package = is_package
+
+        #: If the module can't have any names renamed
+        self.tainted = False
+
+        #: The module level names that could be renamed, with the number of times each is mentioned in the module
+        self.globals = {}
+
+        #: Every name bound in any namespace of the module
+        self.identifiers = set()
+
+        #: (module, name, attributes) for each name imported from a module. attributes are the attributes read from
+        #: the imported name, in case it is a module, or None if it is used in other ways.
+        self.from_imports = []
+
+        #: (module, attributes) for each module that is imported as a module object, with the attributes read from
+        #: it, or None if it is used in other ways.
+        self.module_imports = []
+
+        #: The modules that are star imported
+        self.star_imports = []
+
+
+class ModuleRenames(object):
+    """
+    The new names to apply to a module before it is minified
+
+    :param renames: The new names of module level names, by module name. This contains the module being renamed, and
+        the modules it imports from.
+    :type renames: dict[str, dict[str, str]]
+    :param modules: The names of every module in the package
+    :type modules: frozenset[str]
+    :param preserve_globals: The module level names of this module that must not be renamed when it is minified
+    :type preserve_globals: list[str]
+    :param bool rename_globals: If the module level names of this module may be renamed when it is minified
+
+    """
+
+    def __init__(self, renames, modules, preserve_globals, rename_globals):
+        self.renames = renames
+        self.modules = modules
+        self.preserve_globals = preserve_globals
+        self.rename_globals = rename_globals
+
+
+def module_name(path):
+    """
+    The dotted name of the module at a path
+
+    :param str path: The path of the module, relative to the directory the package is imported from
+    :return: The module name, and if the module is the ``__init__`` module of a package
+    :rtype: tuple[str, bool]
+    :raises ValueError: If the path is not relative
+
+    """
+
+    path = posixpath.normpath(path.replace('\\', '/'))
+    if posixpath.isabs(path) or path.startswith('../'):
+        raise ValueError('The path of a module in a package must be relative, not %r' % path)
+
+    parts = posixpath.splitext(path)[0].split('/')
+
+    if parts[-1] == '__init__':
+        return '.'.join(parts[:-1]), True
+
+    return '.'.join(parts), False
+
+
+def import_from_module(node, name, is_package):
+    """
+    The absolute name of the module an ImportFrom node imports from
+
+    :param node: The import statement
+    :type node: :class:`ast.ImportFrom`
+    :param str name: The name of the module the import statement is in
+    :param bool is_package: If the module the import statement is in is the ``__init__`` module of a package
+    :return: The module name, or None if a relative import is outside the package
+    :rtype: str or None
+
+    """
+
+    if not node.level:
+        return node.module
+
+    package = name if is_package else name.rpartition('.')[0]
+    parts = package.split('.') if package else []
+
+    if node.level - 1 > len(parts):
+        return None
+
+    parts = parts[:len(parts) - (node.level - 1)]
+    if node.module:
+        parts.append(node.module)
+
+    return '.'.join(parts) or None
+
+
+def _import_bindings(module):
+    """
+    The binding of each alias of the import statements in a module
+
+    :type module: :class:`ast.Module`
+    :rtype: dict[ast.alias, Binding]
+
+    """
+
+    from python_minifier.rename.renamer import all_bindings
+
+    bindings = {}
+    for _namespace, binding in all_bindings(module):
+        for node in binding.references:
+            if isinstance(node, ast.alias):
+                bindings[node] = binding
+
+    return bindings
+
+
+def _attribute_uses(binding, alias):
+    """
+    The attribute nodes that read from the name bound by an import alias
+
+    :return: The attribute nodes, or None if the name is used other than to read attributes
+    :rtype: list[ast.Attribute] or None
+
+    """
+
+    if binding is None:
+        return None
+
+    attributes = []
+    for node in binding.references:
+        if node is alias:
+            continue
+
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            parent = get_parent(node)
+            if isinstance(parent, ast.Attribute) and parent.value is node:
+                attributes.append(parent)
+                continue
+
+        return None
+
+    return attributes
+
+
+def _imports(module, name, is_package):
+    """
+    The import aliases of a module, with the module each refers to
+
+    :return: (kind, module, alias) for every alias, where kind is 'from' for an ImportFrom alias, or 'module' for an
+        Import alias that binds a module object, or 'dotted' for an Import alias that binds the top level package of a
+        dotted module name.
+    :rtype: Iterable[tuple[str, str, ast.alias]]
+
+    """
+
+    for node in ast.walk(module):
+        if isinstance(node, ast.ImportFrom):
+            from_module = import_from_module(node, name, is_package)
+            if from_module is None:
+                continue
+
+            for alias in node.names:
+                yield 'from', from_module, alias
+
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname is None and '.' in alias.name:
+                    yield 'dotted', alias.name, alias
+                else:
+                    yield 'module', alias.name, alias
+
+
+def _prepare(source, path):
+    """
+    Parse a module and find its bindings
+
+    :rtype: :class:`ast.Module`
+
+    """
+
+    from python_minifier.rename import add_namespace, bind_names, resolve_names
+
+    if isinstance(source, ast.Module):
+        module = copy_ast(source)
+    else:
+        module = ast.parse(source, path)
+
+    add_parent(module)
+    add_namespace(module)
+    bind_names(module)
+    resolve_names(module)
+    return module
+
+
+def analyse_module(path, source, preserve_globals=()):
+    """
+    Find the module level names of a module, and the names it uses from other modules
+
+    :param str path: The path of the module, relative to the directory the package is imported from
+    :param source: The module source
+    :type source: str or bytes or ast.Module
+    :param preserve_globals: Names that must not be renamed
+    :type preserve_globals: Iterable[str]
+    :rtype: ModuleSymbols
+
+    """
+
+    from python_minifier.rename.binding import BuiltinBinding, NameBinding
+    from python_minifier.rename.util import find__all__
+
+    name, is_package = module_name(path)
+    symbols = ModuleSymbols(name, is_package)
+
+    module = _prepare(source, path)
+    module_scope = get_scope(module)
+    symbols.tainted = module_scope.tainted
+
+    preserved = set(preserve_globals) | set(find__all__(module)) | module_scope.preserved
+
+    for scope in module_scope.scopes:
+        for binding in scope.bindings:
+            if binding.name is not None:
+                symbols.identifiers.add(binding.name)
+
+    for binding in module_scope.bindings:
+        if not isinstance(binding, NameBinding) or isinstance(binding, BuiltinBinding):
+            continue
+        if binding.allow_rename and binding.name not in preserved:
+            symbols.globals[binding.name] = binding.new_mention_count()
+
+    import_bindings = _import_bindings(module)
+
+    def attribute_names(alias):
+        attributes = _attribute_uses(import_bindings.get(alias), alias)
+        return None if attributes is None else [attribute.attr for attribute in attributes]
+
+    for kind, imported, alias in _imports(module, name, is_package):
+        if kind == 'from':
+            if alias.name == '*':
+                symbols.star_imports.append(imported)
+            else:
+                symbols.from_imports.append((imported, alias.name, attribute_names(alias)))
+        elif kind == 'module':
+            symbols.module_imports.append((imported, attribute_names(alias)))
+        else:
+            # import a.b binds 'a', and the submodules are read as attributes, so none of the modules are followed
+            parts = imported.split('.')
+            for i in range(1, len(parts) + 1):
+                symbols.module_imports.append(('.'.join(parts[:i]), None))
+
+    return symbols
+
+
+def plan_renames(analysed, preserve_globals=()):
+    """
+    Choose new names for the module level names that are used by other modules of the package
+
+    :param analysed: The analysis of every module in the package, by path
+    :type analysed: dict[str, ModuleSymbols]
+    :param preserve_globals: Names that must not be renamed
+    :type preserve_globals: Iterable[str]
+    :return: The renames to apply to each module, by path
+    :rtype: dict[str, ModuleRenames]
+
+    """
+
+    from python_minifier.rename.name_generator import name_filter
+
+    modules = dict((symbols.name, symbols) for symbols in analysed.values())
+    module_names = frozenset(modules)
+
+    # Modules that are used in ways that can't be followed keep all their names
+    preserve_all = set(name for name, symbols in modules.items() if symbols.tainted)
+
+    # The module level names of each module that are used by other modules, with the number of mentions
+    used = dict((name, {}) for name in modules)
+
+    # Names that must keep their name in each module
+    preserved = dict((name, set(preserve_globals)) for name in modules)
+
+    def use(module, name, mentions=1):
+        if module in modules and name in modules[module].globals:
+            used[module][name] = used[module].get(name, 0) + mentions
+
+    def use_module(module, attributes):
+        if module not in modules:
+            return
+
+        if attributes is None:
+            preserve_all.add(module)
+            return
+
+        for attribute in attributes:
+            submodule = module + '.' + attribute
+            if submodule in modules:
+                # The attribute could be the submodule, which is then used in ways that aren't followed
+                preserved[module].add(attribute)
+                preserve_all.add(submodule)
+            else:
+                use(module, attribute)
+
+    for symbols in modules.values():
+        for module in symbols.star_imports:
+            if module in modules:
+                preserve_all.add(module)
+
+        for module, attributes in symbols.module_imports:
+            use_module(module, attributes)
+
+        for module, name, attributes in symbols.from_imports:
+            submodule = module + '.' + name
+            if submodule in modules:
+                preserved.setdefault(module, set()).add(name)
+                use_module(submodule, attributes)
+            else:
+                use(module, name)
+
+    renames = {}
+    for name, symbols in modules.items():
+        module_renames = {}
+        renames[name] = module_renames
+
+        if name in preserve_all:
+            continue
+
+        # The most mentioned names get the shortest new names
+        mentions = dict(
+            (global_name, count + symbols.globals[global_name])
+            for global_name, count in used[name].items()
+            if global_name not in preserved[name]
+        )
+        candidates = sorted(mentions, key=lambda global_name: (-mentions[global_name], global_name))
+
+        new_names = name_filter()
+        for global_name in candidates:
+            new_name = next(new_names)
+            while new_name in symbols.identifiers:
+                new_name = next(new_names)
+
+            if len(new_name) >= len(global_name):
+                break
+
+            module_renames[global_name] = new_name
+
+    plans = {}
+    for path, symbols in analysed.items():
+        name = symbols.name
+
+        imported = set([name])
+        imported.update(module for module, _name, _attributes in symbols.from_imports)
+        imported.update(module + '.' + name for module, name, _attributes in symbols.from_imports)
+        imported.update(module for module, _attributes in symbols.module_imports)
+
+        # The names used by other modules keep the names they have after renaming, and names of submodules are kept
+        keep = [renames[name].get(global_name, global_name) for global_name in used[name]]
+        keep.extend(global_name for global_name in preserved[name] if global_name in symbols.globals)
+
+        plans[path] = ModuleRenames(
+            renames=dict((module, renames[module]) for module in imported if renames.get(module)),
+            modules=module_names,
+            preserve_globals=keep,
+            rename_globals=name not in preserve_all,
+        )
+
+    return plans
+
+
+def apply_renames(path, source, plan):
+    """
+    Apply new names to a module
+
+    :param str path: The path of the module, relative to the directory the package is imported from
+    :param source: The module source
+    :type source: str or bytes or ast.Module
+    :param plan: The new names to apply
+    :type plan: ModuleRenames
+    :return: The module with the new names applied
+    :rtype: :class:`ast.Module`
+
+    """
+
+    name, is_package = module_name(path)
+    module = _prepare(source, path)
+
+    import_bindings = _import_bindings(module)
+
+    def rename_attributes(module_name, alias):
+        module_renames = plan.renames.get(module_name)
+        if not module_renames:
+            return
+
+        for attribute in _attribute_uses(import_bindings.get(alias), alias) or []:
+            if attribute.attr in module_renames:
+                attribute.attr = module_renames[attribute.attr]
+
+    for kind, imported, alias in _imports(module, name, is_package):
+        if kind == 'from':
+            submodule = imported + '.' + alias.name
+            if submodule in plan.modules:
+                rename_attributes(submodule, alias)
+                continue
+
+            new_name = plan.renames.get(imported, {}).get(alias.name)
+            if new_name is not None:
+                if alias.asname is None:
+                    alias.asname = alias.name
+                alias.name = new_name
+
+        elif kind == 'module':
+            rename_attributes(imported, alias)
+
+    # The aliases are changed first, so renaming an alias binding can see the name it imports
+    for global_name, new_name in plan.renames.get(name, {}).items():
+        get_scope(module).get_binding(global_name).rename(new_name)
+
+    return module
+
+
+def _imap(function, items, workers, pool):
+    """
+    Apply a function to each item using a pool of workers, yielding the results as they complete
+    """
+
+    if pool == 'process':
+        worker_pool = multiprocessing.Pool(workers)
+        function = functools.partial(_in_process, function)
+    else:
+        worker_pool = multiprocessing.pool.ThreadPool(workers)
+
+    try:
+        for result in worker_pool.imap_unordered(function, items):
+            yield result
+    except BaseException:
+        worker_pool.terminate()
+        raise
+    else:
+        worker_pool.close()
+    finally:
+        worker_pool.join()
+
+
+def _in_process(function, item):
+    from python_minifier import _picklable
+
+    path, result = function(item)
+    return path, _picklable(result) if isinstance(result, Exception) else result
+
+
+def _analyse_item(item):
+    path, source, preserve_globals = item
+    try:
+        with Annotations():
+            return path, analyse_module(path, source, preserve_globals)
+    except Exception as exception:
+        return path, exception
+
+
+def _minify_item(item):
+    from python_minifier import Minifier, _find_shebang
+
+    path, source, minifier, plan = item
+    try:
+        if plan is None:
+            return path, minifier.minify(source, path)
+
+        shebang = None if isinstance(source, ast.Module) else _find_shebang(source)
+        with Annotations():
+            module = apply_renames(path, source, plan)
+        minifier = Minifier(**dict(
+            minifier._options,
+            preserve_globals=list(minifier.preserve_globals) + plan.preserve_globals,
+            rename_globals=plan.rename_globals,
+            mutate_module=True,
+        ))
+
+        return path, minifier.minify(module, path, shebang=shebang)
+    except Exception as exception:
+        return path, exception
+
+
+def minify_package(modules, minifier, workers, pool):
+    """
+    Minify the modules of a self-contained package, renaming the module level names used by other modules
+
+    :param modules: The modules of the package, as (path, source) pairs
+    :type modules: Iterable[tuple[str, str or bytes or ast.Module]]
+    :param minifier: The minifier to use
+    :type minifier: python_minifier.Minifier
+    :param int workers: The number of workers in the pool
+    :param str pool: The type of pool to use, either 'process' or 'thread'
+    :rtype: list[tuple[str, str]]
+
+    """
+
+    modules = list(modules)
+
+    plans = {}
+    if minifier.rename_globals:
+        analysed = {}
+        items = [(path, source, minifier.preserve_globals) for path, source in modules]
+        for path, result in _imap(_analyse_item, items, workers, pool):
+            if isinstance(result, Exception):
+                raise result
+            analysed[path] = result
+
+        plans = plan_renames(analysed, minifier.preserve_globals)
+
+    results = {}
+    items = [(path, source, minifier, plans.get(path)) for path, source in modules]
+    for path, result in _imap(_minify_item, items, workers, pool):
+        results[path] = result
+
+    for path, _source in modules:
+        if isinstance(results[path], Exception):
+            raise results[path]
+
+    return [(path, results[path]) for path, _source in modules]
@@ -0,0 +1,184 @@
+"""
+An index of the names that are available in each scope
+
+Names are assigned from a sequence of candidate names, and the position of a name in that sequence is its ordinal.
+:class:`NameAvailability` records the ordinals that are reserved in each scope, so the first ordinal that is free in
+every scope of a reservation scope can be found by skipping over runs of reserved ordinals, instead of checking each
+candidate name against every scope in turn.
+
+"""
+
+from python_minifier.deadline import check as check_deadline
+from python_minifier.stats import count
+
+
+class FreeOrdinals(object):
+    """
+    The ordinals that are not reserved in one scope
+
+    Each reserved ordinal points to a later ordinal that may be free, so the next free ordinal is found by following
+    the pointers. Paths are compressed as they are followed, so a run of reserved ordinals is skipped in one step the
+    next time it is searched.
+
+    """
+
+    __slots__ = ('next',)
+
+    def __init__(self):
+        self.next = {}
+
+    def reserve(self, ordinal):
+        """
+        Reserve an ordinal
+
+        :param int ordinal: The ordinal to reserve
+
+        """
+
+        if ordinal not in self.next:
+            self.next[ordinal] = ordinal + 1
+
+    def find(self, ordinal):
+        """
+        The first ordinal that is not reserved, starting from the given ordinal
+
+        :param int ordinal: The ordinal to start from
+        :rtype: int
+
+        """
+
+        next_ordinal = self.next
+
+        free = ordinal
+        while free in next_ordinal:
+            free = next_ordinal[free]
+
+        while ordinal != free:
+            following = next_ordinal[ordinal]
+            next_ordinal[ordinal] = free
+            ordinal = following
+
+        return free
+
+
+class NameAvailability(object):
+    """
+    The names reserved in each scope of a module
+
+    Names are reserved by adding them to the ``assigned_names`` of each scope in a reservation scope, and to the index
+    of reserved ordinals for each scope and name prefix that has been searched. Reserved names that have not yet been
+    produced by the name generator are held until it produces them.
+
+    :param name_generator: The candidate names, in the order they should be assigned
+    :type name_generator: Iterator[str]
+
+    """
+
+    def __init__(self, name_generator):
+        self._name_generator = name_generator
+
+        #: The candidate names generated so far, in ordinal order
+        self.names = []
+        self._ordinals = {}
+
+        self.clear()
+
+    def clear(self):
+        """
+        Forget the names reserved in every scope
+
+        The candidate names that have already been generated are kept.
+
+        """
+
+        # The reserved ordinals of each indexed scope, by prefix
+        self._free = {}
+
+        # The reserved ordinals waiting for a name to be generated, by name
+        self._pending = {}
+
+    def _generate(self):
+        name = next(self._name_generator)
+        ordinal = len(self.names)
+        self.names.append(name)
+        self._ordinals[name] = ordinal
+
+        for free in self._pending.pop(name, ()):
+            free.reserve(ordinal)
+
+    def _index(self, free, prefix, name):
+        if not name.startswith(prefix):
+            return
+
+        name = name[len(prefix):]
+        ordinal = self._ordinals.get(name)
+        if ordinal is not None:
+            free.reserve(ordinal)
+        else:
+            self._pending.setdefault(name, []).append(free)
+
+    def _free_ordinals(self, scope, prefix):
+        scope_free = self._free.setdefault(prefix, {})
+
+        free = scope_free.get(scope)
+        if free is None:
+            free = scope_free[scope] = FreeOrdinals()
+            for name in scope.assigned_names:
+                self._index(free, prefix, name)
+
+        return free
+
+    def reserve(self, name, reservation_scope):
+        """
+        Reserve a name in a reservation scope
+
+        :param str name: The name to reserve
+        :param reservation_scope: The scopes to reserve the name in
+        :type reservation_scope: Iterable[Scope]
+
+        """
+
+        for scope in reservation_scope:
+            if name in scope.assigned_names:
+                continue
+
+            scope.assigned_names.add(name)
+
+            for prefix, scope_free in self._free.items():
+                free = scope_free.get(scope)
+                if free is not None:
+                    self._index(free, prefix, name)
+
+    def first_available(self, reservation_scope, prefix=''):
+        """
+        The first candidate name that is not reserved in any scope of a reservation scope
+
+        :param reservation_scope: The scopes the name must be available in
+        :type reservation_scope: Iterable[Scope]
+        :param str prefix: A prefix added to each candidate name
+        :return: The ordinal of the candidate name, or None if the name generator is exhausted
+        :rtype: int or None
+
+        """
+
+        scopes_free = [self._free_ordinals(scope, prefix) for scope in reservation_scope]
+
+        ordinal = 0
+        tried = 0
+        while True:
+            check_deadline()
+            tried += 1
+
+            try:
+                while len(self.names) <= ordinal:
+                    self._generate()
+            except StopIteration:
+                return None
+
+            candidate = ordinal
+            for free in scopes_free:
+                ordinal = free.find(ordinal)
+
+            if ordinal == candidate:
+                count('names_tried', tried)
+                return ordinal
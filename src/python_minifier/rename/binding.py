@@ -1,5 +1,6 @@
 import python_minifier.ast_compat as ast
 
+from python_minifier.ast_annotation import get_namespace
 from python_minifier.rename.util import arg_rename_in_place, insert
 
 
@@ -7,20 +8,48 @@ class Binding(object):
     """
     Represents the binding of a name
 
+    The cost of renaming the binding is counted as each reference is added, so the mention counts and byte cost
+    don't need to visit every reference.
+
     :param name: A name for this binding
     :type name: str or None
     :param bool allow_rename: If this binding may be renamed
 
     """
 
+    __slots__ = (
+        '_references',
+        '_allow_rename',
+        '_name',
+        '_reserved',
+        'reservation_scope',
+        '_new_mentions',
+        '_old_mentions',
+        '_additional_bytes',
+        '_arg_references',
+    )
+
     def __init__(self, name=None, allow_rename=True):
         self._references = []
 
+        # Mentions of the name by references, if this binding was renamed
+        self._new_mentions = 0
+        self._old_mentions = 0
+        self._additional_bytes = 0
+
+        # Whether an argument can be renamed in place can change as other bindings are renamed,
+        # so it is checked when the cost is needed
+        self._arg_references = []
+
         self._allow_rename = allow_rename
 
         self._name = name
         self._reserved = None
 
+        #: The scopes this binding must be resolvable in, cached by
+        #: :func:`python_minifier.rename.renamer.reservation_scope`. This is cleared when a reference is added.
+        self.reservation_scope = None
+
     def __repr__(self):
         return self.__class__.__name__ + '()'
 
@@ -88,160 +117,92 @@ class Binding(object):
         """
         return len(self._references)
 
-    def additional_byte_cost(self):
-        """
-        How many additional bytes would be used, if this was renamed
+    def _count_reference(self, node):
         """
+        Add the cost of renaming a new reference to the counters
 
-        arg_rename = False
-        additional_bytes = 0
-
-        for node in self._references:
-            if isinstance(node, ast.Name):
-                if isinstance(node.ctx, (ast.Load, ast.Store, ast.Del)):
-                    pass
-                else:
-                    # Python 2 Param context
-                    if not arg_rename_in_place(node):
-                        arg_rename = True
-            elif isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
-                pass
-            elif isinstance(node, ast.ExceptHandler):
-                pass
-            elif isinstance(node, (ast.Global, ast.Nonlocal)):
-                pass
-            elif isinstance(node, ast.alias):
-                if node.asname is None:
-                    additional_bytes += 4  # ' as '
-            elif isinstance(node, ast.arguments):
-                if node.vararg == self._name:
-                    pass
-                if node.kwarg == self._name:
-                    pass
-            elif isinstance(node, ast.arg):
-                if not arg_rename_in_place(node):
-                    arg_rename = True
+        :param node: The node that references this binding
+        :type node: :class:`ast.AST`
 
-            elif isinstance(node, ast.MatchAs):
-                if node.name is None:
-                    additional_bytes += 4  # ' as '
-            elif isinstance(node, ast.MatchStar):
-                pass
-            elif isinstance(node, ast.MatchMapping):
-                pass
-            elif isinstance(node, ast.TypeVar):
-                pass
-            elif isinstance(node, ast.TypeVarTuple):
-                pass
-            elif isinstance(node, ast.ParamSpec):
-                pass
+        """
 
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, (ast.Load, ast.Store, ast.Del)):
+                self._new_mentions += 1
             else:
-                raise AssertionError('Unknown reference node')
+                # Python 2 Param context
+                self._arg_references.append(node)
+        elif isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            self._new_mentions += 1
+        elif isinstance(node, ast.ExceptHandler):
+            self._new_mentions += 1
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            self._new_mentions += len([n for n in node.names if n == self._name])
+        elif isinstance(node, ast.alias):
+            self._new_mentions += 1
+            if node.asname is None:
+                # import foo -> import foo as bar
+                self._old_mentions += 1
+                self._additional_bytes += 4  # ' as '
+        elif isinstance(node, ast.arguments):
+            if node.vararg == self._name:
+                self._new_mentions += 1
+            if node.kwarg == self._name:
+                self._new_mentions += 1
+        elif isinstance(node, ast.arg):
+            self._arg_references.append(node)
+
+        elif isinstance(node, ast.MatchAs):
+            self._new_mentions += 1
+            if node.name is None:
+                self._additional_bytes += 4  # ' as '
+        elif isinstance(node, ast.MatchStar):
+            self._new_mentions += 1
+        elif isinstance(node, ast.MatchMapping):
+            self._new_mentions += 1
+        elif isinstance(node, ast.TypeVar):
+            self._new_mentions += 1
+        elif isinstance(node, ast.TypeVarTuple):
+            self._new_mentions += 1
+        elif isinstance(node, ast.ParamSpec):
+            self._new_mentions += 1
+
+        else:
+            raise AssertionError('Unknown reference node')
+
+    def _arg_assignments(self):
+        """
+        The number of argument references that can't be renamed in place
+
+        These arguments keep their old name, and are assigned to the new name in the function body.
+
+        :rtype: int
+
+        """
+
+        return sum(1 for node in self._arg_references if not arg_rename_in_place(node))
 
-        return additional_bytes + (2 if arg_rename else 0)
+    def additional_byte_cost(self):
+        """
+        How many additional bytes would be used, if this was renamed
+        """
+
+        return self._additional_bytes + (2 if self._arg_assignments() else 0)
 
     def old_mention_count(self):
         """
         The number of times the old name would be mentioned in the source code, if this binding was renamed
         """
 
-        arg_rename = False
-        mentions = 0
-
-        for node in self._references:
-            if isinstance(node, ast.Name):
-                if isinstance(node.ctx, (ast.Load, ast.Store, ast.Del)):
-                    pass
-                else:
-                    # Python 2 Param context
-                    if not arg_rename_in_place(node):
-                        mentions += 1
-                        arg_rename = True
-
-            elif isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
-                pass
-            elif isinstance(node, ast.ExceptHandler):
-                pass
-            elif isinstance(node, (ast.Global, ast.Nonlocal)):
-                pass
-            elif isinstance(node, ast.alias):
-                if node.asname is None:
-                    # import foo -> import foo as bar
-                    mentions += 1
-            elif isinstance(node, ast.arguments):
-                pass
-            elif isinstance(node, ast.arg):
-                if not arg_rename_in_place(node):
-                    mentions += 1
-                    arg_rename = True
-
-            elif isinstance(node, ast.MatchAs):
-                pass
-            elif isinstance(node, ast.MatchStar):
-                pass
-            elif isinstance(node, ast.MatchMapping):
-                pass
-            elif isinstance(node, ast.TypeVar):
-                pass
-            elif isinstance(node, ast.TypeVarTuple):
-                pass
-            elif isinstance(node, ast.ParamSpec):
-                pass
-
-            else:
-                raise AssertionError('Unknown reference node')
-
-        return mentions + (1 if arg_rename else 0)
+        arg_assignments = self._arg_assignments()
+        return self._old_mentions + arg_assignments + (1 if arg_assignments else 0)
 
     def new_mention_count(self):
         """
         The number of times a new name would be mentioned in the source code
         """
 
-        arg_rename = False
-        mentions = 0
-
-        for node in self._references:
-            if isinstance(node, ast.Name):
-                if isinstance(node.ctx, (ast.Load, ast.Store, ast.Del)):
-                    mentions += 1
-                else:
-                    # Python 2 Param context
-                    arg_rename = True
-            elif isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
-                mentions += 1
-            elif isinstance(node, ast.ExceptHandler):
-                mentions += 1
-            elif isinstance(node, (ast.Global, ast.Nonlocal)):
-                mentions += len([n for n in node.names if n == self._name])
-            elif isinstance(node, ast.alias):
-                mentions += 1
-            elif isinstance(node, ast.arguments):
-                if node.vararg == self._name:
-                    mentions += 1
-                if node.kwarg == self._name:
-                    mentions += 1
-            elif isinstance(node, ast.arg):
-                arg_rename = True
-
-            elif isinstance(node, ast.MatchAs):
-                mentions += 1
-            elif isinstance(node, ast.MatchStar):
-                mentions += 1
-            elif isinstance(node, ast.MatchMapping):
-                mentions += 1
-            elif isinstance(node, ast.TypeVar):
-                mentions += 1
-            elif isinstance(node, ast.TypeVarTuple):
-                mentions += 1
-            elif isinstance(node, ast.ParamSpec):
-                mentions += 1
-
-            else:
-                raise AssertionError('Unknown reference node')
-
-        return mentions + (1 if arg_rename else 0)
+        return self._new_mentions + (1 if self._arg_references else 0)
 
     def add_reference(self, node, allow_rename=True, reserved=None):
         """
@@ -255,7 +216,9 @@ class Binding(object):
 
         """
 
-        self.references.append(node)
+        self._references.append(node)
+        self.reservation_scope = None
+        self._count_reference(node)
 
         if allow_rename is False:
             self.disallow_rename()
@@ -297,6 +260,8 @@ class NameBinding(Binding):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, name, *args, **kwargs):
         super(NameBinding, self).__init__(name, *args, **kwargs)
 
@@ -357,9 +322,9 @@ class NameBinding(Binding):
 
                     else:
                         if func_namespace_binding is None:
-                            func_namespace_binding = node.namespace
+                            func_namespace_binding = get_namespace(node)
                         else:
-                            assert func_namespace_binding is node.namespace
+                            assert func_namespace_binding is get_namespace(node)
 
             elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
                 node.name = new_name
@@ -377,9 +342,9 @@ class NameBinding(Binding):
 
                 else:
                     if func_namespace_binding is None:
-                        func_namespace_binding = node.namespace
+                        func_namespace_binding = get_namespace(node)
                     else:
-                        assert func_namespace_binding is node.namespace
+                        assert func_namespace_binding is get_namespace(node)
 
             elif isinstance(node, ast.ExceptHandler):
                 node.name = new_name
@@ -434,6 +399,8 @@ class BuiltinBinding(NameBinding):
 
     """
 
+    __slots__ = ('namespace',)
+
     def __init__(self, name, namespace, *args, **kwargs):
         super(BuiltinBinding, self).__init__(name, *args, **kwargs)
         self.namespace = namespace
@@ -447,6 +414,10 @@ class BuiltinBinding(NameBinding):
             # Classes must inherit from object to become a new-style class in python2
             self.disallow_rename()
 
+    def _count_reference(self, node):
+        # The cost of renaming only depends on the number of references
+        pass
+
     def new_mention_count(self):
         # All mentions must be Names, which would be replaced
         # Plus an Assign with the new name
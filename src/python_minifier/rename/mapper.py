@@ -3,188 +3,246 @@ For each node in an AST set the namespace to use for name binding and resolution
 """
 
 import python_minifier.ast_compat as ast
-from python_minifier.ast_annotation import get_parent
+from python_minifier.ast_annotation import get_namespace, get_parent, get_scope, set_namespace, set_scope
 
+from python_minifier.rename.scope import ModuleScope, Scope
 from python_minifier.rename.util import is_namespace
+from python_minifier.util import child_nodes
 
 
-def add_parent_to_arguments(arguments, func):
-    arguments.namespace = func
+def arguments_children(arguments, func):
+    """
+    The children of an arguments node, with the namespace each is in
+    """
+
+    set_namespace(arguments, func)
+    children = []
 
     for arg in getattr(arguments, 'posonlyargs', []) + arguments.args:
-        add_parent(arg, func)
+        children.append((arg, func))
         if hasattr(arg, 'annotation') and arg.annotation is not None:
-            add_parent(arg.annotation, func.namespace)
+            children.append((arg.annotation, get_namespace(func)))
 
     if hasattr(arguments, 'kwonlyargs'):
         for arg in arguments.kwonlyargs:
-            add_parent(arg, func)
+            children.append((arg, func))
             if arg.annotation is not None:
-                add_parent(arg.annotation, func.namespace)
+                children.append((arg.annotation, get_namespace(func)))
 
         for node in arguments.kw_defaults:
             if node is not None:
-                add_parent(node, func.namespace)
+                children.append((node, get_namespace(func)))
 
     for node in arguments.defaults:
-        add_parent(node, func.namespace)
+        children.append((node, get_namespace(func)))
 
     if arguments.vararg:
         if hasattr(arguments, 'varargannotation') and arguments.varargannotation is not None:
-            add_parent(arguments.varargannotation, func.namespace)
+            children.append((arguments.varargannotation, get_namespace(func)))
         elif isinstance(arguments.vararg, str):
             pass
         else:
-            add_parent(arguments.vararg, func)
+            children.append((arguments.vararg, func))
 
     if arguments.kwarg:
         if hasattr(arguments, 'kwargannotation') and arguments.kwargannotation is not None:
-            add_parent(arguments.kwargannotation, func.namespace)
+            children.append((arguments.kwargannotation, get_namespace(func)))
         elif isinstance(arguments.kwarg, str):
             pass
         else:
-            add_parent(arguments.kwarg, func)
+            children.append((arguments.kwarg, func))
+
+    return children
 
 
-def add_parent_to_functiondef(functiondef):
+def functiondef_children(functiondef):
     """
-    Add correct parent and namespace attributes to functiondef nodes
+    The children of a functiondef node, with the namespace each is in
     """
 
+    children = []
+
     if functiondef.args is not None:
-        add_parent_to_arguments(functiondef.args, func=functiondef)
+        children.extend(arguments_children(functiondef.args, func=functiondef))
 
     for node in functiondef.body:
-        add_parent(node, namespace=functiondef)
+        children.append((node, functiondef))
 
     for node in functiondef.decorator_list:
-        add_parent(node, namespace=functiondef.namespace)
+        children.append((node, get_namespace(functiondef)))
 
     if hasattr(functiondef, 'type_params') and functiondef.type_params is not None:
         for node in functiondef.type_params:
-            add_parent(node, namespace=functiondef.namespace)
+            children.append((node, get_namespace(functiondef)))
 
     if hasattr(functiondef, 'returns') and functiondef.returns is not None:
-        add_parent(functiondef.returns, namespace=functiondef.namespace)
+        children.append((functiondef.returns, get_namespace(functiondef)))
+
+    return children
 
 
-def add_parent_to_classdef(classdef):
+def classdef_children(classdef):
     """
-    Add correct parent and namespace attributes to classdef nodes
+    The children of a classdef node, with the namespace each is in
     """
 
+    children = []
+
     for node in classdef.bases:
-        add_parent(node, namespace=classdef.namespace)
+        children.append((node, get_namespace(classdef)))
 
     if hasattr(classdef, 'keywords'):
         for node in classdef.keywords:
-            add_parent(node, namespace=classdef.namespace)
+            children.append((node, get_namespace(classdef)))
 
     if hasattr(classdef, 'starargs') and classdef.starargs is not None:
-        add_parent(classdef.starargs, namespace=classdef.namespace)
+        children.append((classdef.starargs, get_namespace(classdef)))
 
     if hasattr(classdef, 'kwargs') and classdef.kwargs is not None:
-        add_parent(classdef.kwargs, namespace=classdef.namespace)
+        children.append((classdef.kwargs, get_namespace(classdef)))
 
     for node in classdef.body:
-        add_parent(node, namespace=classdef)
+        children.append((node, classdef))
 
     for node in classdef.decorator_list:
-        add_parent(node, namespace=classdef.namespace)
+        children.append((node, get_namespace(classdef)))
 
     if hasattr(classdef, 'type_params') and classdef.type_params is not None:
         for node in classdef.type_params:
-            add_parent(node, namespace=classdef.namespace)
+            children.append((node, get_namespace(classdef)))
+
+    return children
 
 
-def add_parent_to_comprehension(node, namespace):
+def comprehension_children(node, namespace):
+    """
+    The children of a comprehension node, with the namespace each is in
+    """
+
     assert isinstance(node, (ast.GeneratorExp, ast.SetComp, ast.DictComp, ast.ListComp))
 
+    children = []
+
     if hasattr(node, 'elt'):
-        add_parent(node.elt, namespace=node)
+        children.append((node.elt, node))
     elif hasattr(node, 'key'):
-        add_parent(node.key, namespace=node)
-        add_parent(node.value, namespace=node)
+        children.append((node.key, node))
+        children.append((node.value, node))
 
     iter_namespace = namespace
     for generator in node.generators:
-        generator.namespace = node
+        set_namespace(generator, node)
 
-        add_parent(generator.target, namespace=node)
-        add_parent(generator.iter, namespace=iter_namespace)
+        children.append((generator.target, node))
+        children.append((generator.iter, iter_namespace))
 
         for if_ in generator.ifs:
-            add_parent(if_, namespace=node)
+            children.append((if_, node))
 
         iter_namespace = node
 
+    return children
+
 def namedexpr_namespace(node):
     """
     Get the namespace for a NamedExpr target
     """
 
-    if not isinstance(node, (ast.ListComp, ast.DictComp, ast.SetComp, ast.GeneratorExp)):
-        return node
+    while isinstance(node, (ast.ListComp, ast.DictComp, ast.SetComp, ast.GeneratorExp)):
+        node = get_namespace(node)
 
-    return namedexpr_namespace(node.namespace)
+    return node
+
+def namedexpr_children(node):
+    """
+    The children of a NamedExpr node, with the namespace each is in
+    """
 
-def add_parent_to_namedexpr(node):
     assert isinstance(node, ast.NamedExpr)
 
-    add_parent(node.target, namespace=namedexpr_namespace(node.namespace))
-    add_parent(node.value, namespace=node.namespace)
+    return [
+        (node.target, namedexpr_namespace(get_namespace(node))),
+        (node.value, get_namespace(node))
+    ]
 
 def add_parent(node, namespace=None):
     """
-    Add a namespace attribute to child nodes
+    Set the namespace of child nodes
 
-    :param node: The tree to add namespace properties to
+    :param node: The tree to set the namespaces of
     :type node: :class:`ast.AST`
     :param namespace: The namespace Node that this node is in
     :type namespace: ast.Lambda or ast.Module or ast.FunctionDef or ast.AsyncFunctionDef or ast.ClassDef or ast.DictComp or ast.SetComp or ast.ListComp or ast.Generator
 
     """
 
-    node.namespace = namespace if namespace is not None else node
+    stack = [(node, namespace)]
+
+    while stack:
+        node, namespace = stack.pop()
+        stack.extend(reversed(_add_namespace(node, namespace)))
+
+
+def _add_namespace(node, namespace):
+    """
+    Set the namespace of a node
+
+    Namespace nodes are also given a scope, which is a new :class:`Scope` that is registered with the module scope.
+    If the node already had a scope, the old scope is unregistered.
+
+    :param node: The node to set the namespace of
+    :type node: :class:`ast.AST`
+    :param namespace: The namespace Node that this node is in
+    :return: The children of the node, with the namespace each is in
+    :rtype: list[tuple[ast.AST, ast.AST]]
+
+    """
+
+    set_namespace(node, namespace if namespace is not None else node)
 
     if is_namespace(node):
-        node.bindings = []
-        node.global_names = set()
-        node.nonlocal_names = set()
+        if isinstance(node, ast.Module):
+            set_scope(node, ModuleScope(node))
+        else:
+            try:
+                replaced = get_scope(node)
+            except ValueError:
+                pass
+            else:
+                # The node is being annotated again, e.g. by SuiteTransformer.add_child
+                replaced.module_scope.scopes.remove(replaced)
+
+            scope = Scope(node, parent=get_scope(namespace) if namespace is not None else None)
+            scope.module_scope.scopes.append(scope)
+            set_scope(node, scope)
 
         if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            add_parent_to_functiondef(node)
+            return functiondef_children(node)
         elif isinstance(node, (ast.GeneratorExp, ast.SetComp, ast.DictComp, ast.ListComp)):
-            add_parent_to_comprehension(node, namespace=namespace)
+            return comprehension_children(node, namespace=namespace)
         elif isinstance(node, ast.Lambda):
-            add_parent_to_arguments(node.args, func=node)
-            add_parent(node.body, namespace=node)
+            return arguments_children(node.args, func=node) + [(node.body, node)]
         elif isinstance(node, ast.ClassDef):
-            add_parent_to_classdef(node)
+            return classdef_children(node)
         else:
-            for child in ast.iter_child_nodes(node):
-                add_parent(child, namespace=node)
-
-        return
+            return [(child, node) for child in child_nodes(node)]
 
     if isinstance(node, ast.Global):
-        namespace.global_names.update(node.names)
+        get_scope(namespace).global_names.update(node.names)
     if isinstance(node, ast.Nonlocal):
-        namespace.nonlocal_names.update(node.names)
+        get_scope(namespace).nonlocal_names.update(node.names)
 
     if isinstance(node, ast.Name) and isinstance(namespace, ast.ClassDef):
         if isinstance(node.ctx, ast.Load):
-            namespace.nonlocal_names.add(node.id)
+            get_scope(namespace).nonlocal_names.add(node.id)
         elif isinstance(node.ctx, ast.Store) and isinstance(get_parent(node), ast.AugAssign):
-            namespace.nonlocal_names.add(node.id)
+            get_scope(namespace).nonlocal_names.add(node.id)
 
     if isinstance(node, ast.NamedExpr):
         # NamedExpr is 'special'
-        add_parent_to_namedexpr(node)
-        return
+        return namedexpr_children(node)
 
-    for child in ast.iter_child_nodes(node):
-        add_parent(child, namespace=namespace)
+    return [(child, namespace) for child in child_nodes(node)]
 
 
 def add_namespace(module):
@@ -3,7 +3,10 @@ import keyword
 import random
 import string
 
-from python_minifier.rename.util import builtins
+from python_minifier.rename.util import builtin_names
+
+# Names that already have meaning in python
+reserved_names = frozenset(keyword.kwlist).union(builtin_names)
 
 
 def random_generator(length=40):
@@ -44,8 +47,6 @@ def name_filter():
 
     """
 
-    reserved = keyword.kwlist + dir(builtins)
-
     for name in name_generator():
-        if name not in reserved:
+        if name not in reserved_names:
             yield name
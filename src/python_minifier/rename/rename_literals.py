@@ -1,5 +1,5 @@
 import python_minifier.ast_compat as ast
-from python_minifier.ast_annotation import get_parent, set_parent
+from python_minifier.ast_annotation import get_namespace, get_parent, get_scope, set_namespace, set_parent
 
 from python_minifier.rename.binding import Binding
 from python_minifier.rename.util import insert
@@ -10,7 +10,7 @@ from python_minifier.util import is_constant_node
 def replace(old_node, new_node):
     parent = get_parent(old_node)
     set_parent(new_node, parent)
-    new_node.namespace = old_node.namespace
+    set_namespace(new_node, get_namespace(old_node))
 
     for field, old_value in ast.iter_fields(parent):
         if old_value is old_node:
@@ -25,6 +25,8 @@ def replace(old_node, new_node):
 
 
 class HoistedBinding(Binding):
+    __slots__ = ('_value_node', '_local_namespace')
+
     def __init__(self, value_node, *args, **kwargs):
         super(HoistedBinding, self).__init__(*args, **kwargs)
         self._value_node = value_node
@@ -52,6 +54,10 @@ class HoistedBinding(Binding):
     def __repr__(self):
         return self.__class__.__name__ + '(value=%r)' % self.value
 
+    def _count_reference(self, node):
+        # The cost of renaming only depends on the number of references
+        pass
+
     def new_mention_count(self):
         # All mentions must be literals, which would be replaced
         # Plus an Assign with the new name
@@ -134,9 +140,10 @@ class HoistLiterals(NodeVisitor):
 
         """
 
-        if isinstance(node.namespace, (ast.FunctionDef, ast.Module, ast.AsyncFunctionDef)):
-            return node.namespace
-        return self.nearest_function_namespace(node.namespace)
+        namespace = get_namespace(node)
+        while not isinstance(namespace, (ast.FunctionDef, ast.Module, ast.AsyncFunctionDef)):
+            namespace = get_namespace(namespace)
+        return namespace
 
     def namespace_path(self, node):
         """
@@ -189,7 +196,7 @@ class HoistLiterals(NodeVisitor):
                 else:
                     namespace_path = self.common_path(namespace_path, self.namespace_path(node))
 
-            namespace_path[-1].bindings.append(binding)
+            get_scope(namespace_path[-1]).add_binding(binding)
             binding.set_local_namespace(namespace_path[-1])
 
     def get_binding(self, value, node):
@@ -236,7 +243,7 @@ class HoistLiterals(NodeVisitor):
         if not self._ignore_slots:
             return self.generic_visit(node)
 
-        if not isinstance(node.namespace, ast.ClassDef):
+        if not isinstance(get_namespace(node), ast.ClassDef):
             return self.generic_visit(node)
 
         for target in node.targets:
@@ -1,27 +1,27 @@
 import python_minifier.ast_compat as ast
 
+from python_minifier.ast_annotation import get_namespace, get_scope
+from python_minifier.rename.availability import NameAvailability
 from python_minifier.rename.binding import NameBinding
 from python_minifier.rename.name_generator import name_filter
-from python_minifier.rename.util import is_namespace
 
 
-def all_bindings(node):
+def all_bindings(module):
     """
     All bindings in a module
 
-    :param node: The module to get bindings in
-    :type node: :class:`ast.AST`
+    The scopes of a module are registered with the module scope as they are created, so the bindings are found
+    without walking the module.
+
+    :param module: The module to get bindings in
+    :type module: :class:`ast.Module`
     :rtype: Iterable[ast.AST, Binding]
 
     """
 
-    if is_namespace(node):
-        for binding in node.bindings:
-            yield node, binding
-
-    for child in ast.iter_child_nodes(node):
-        for namespace, binding in all_bindings(child):
-            yield namespace, binding
+    for scope in get_scope(module).scopes:
+        for binding in scope.bindings:
+            yield scope.node, binding
 
 
 def sorted_bindings(module):
@@ -43,56 +43,55 @@ def sorted_bindings(module):
 
 def reservation_scope(namespace, binding):
     """
-    Get the namespaces that are in the bindings reservation scope
+    Get the scopes that are in the bindings reservation scope
+
+    Returns the scopes of the namespaces the binding name must be resolvable in.
+    These are the scopes on the path from each reference up to the binding's scope. The paths are merged as they are
+    walked, so a walk stops at the first scope that is already in the reservation scope. A reference that is not nested
+    in the binding's namespace reserves every scope up to the module scope.
 
-    Returns the namespace nodes the binding name must be resolvable in
+    The result is cached on the binding until a reference is added to it.
 
     :param namespace: The local namespace of a binding
     :type namespace: :class:`ast.AST`
     :param binding: The binding to get the reservation scope for
     :type binding: Binding
-    :rtype: set[ast.AST]
+    :rtype: frozenset[Scope]
 
     """
 
-    namespaces = {namespace}
+    if binding.reservation_scope is not None:
+        return binding.reservation_scope
 
-    for node in binding.references:
-        while node is not namespace:
-            namespaces.add(node.namespace)
-            node = node.namespace
-
-    return namespaces
+    scopes = {get_scope(namespace)}
 
+    for node in binding.references:
+        if node is namespace:
+            continue
 
-def add_assigned(node):
-    """
-    Add the assigned_names attribute to namespace nodes in a module
-
-    :param node: The module to add the assigned_names attribute to
-    :type node: :class:`ast.Module`
-
-    """
-
-    if is_namespace(node):
-        node.assigned_names = set()
+        scope = get_scope(get_namespace(node))
+        while scope not in scopes:
+            scopes.add(scope)
+            if scope.parent is None:
+                # The reference is not nested in the binding's namespace, so the walk ends at the module scope
+                break
+            scope = scope.parent
 
-    for child in ast.iter_child_nodes(node):
-        add_assigned(child)
+    binding.reservation_scope = frozenset(scopes)
+    return binding.reservation_scope
 
 
-def reserve_name(name, reservation_scope):
+def add_assigned(module):
     """
-    Reserve a name in a reservation scope
+    Clear the assigned names of every scope in a module
 
-    :param str name: The name to reserve
-    :param reservation_scope:
-    :type reservation_scope: Iterable[:class:`ast.AST`]
+    :param module: The module to clear the assigned names of
+    :type module: :class:`ast.Module`
 
     """
 
-    for namespace in reservation_scope:
-        namespace.assigned_names.add(name)
+    for scope in get_scope(module).scopes:
+        scope.assigned_names = set()
 
 
 class UniqueNameAssigner(object):
@@ -114,7 +113,7 @@ class UniqueNameAssigner(object):
 
         for _namespace, binding in sorted_bindings(module):
             if binding.allow_rename:
-                binding.new_name = self.available_name()
+                binding.rename(self.available_name())
 
         return module
 
@@ -129,32 +128,29 @@ class NameAssigner(object):
     namespaces.
 
     Bindings are assigned names in order of most references, with names assigned shortest first.
+    The names reserved in each namespace are indexed by their position in the name generator, so finding the first
+    available name skips over the names already reserved instead of trying each one.
 
     """
 
     def __init__(self, name_generator=None):
         self.name_generator = name_generator if name_generator is not None else name_filter()
-        self.names = []
-
-    def iter_names(self):
-        for name in self.names:
-            yield name
+        self.availability = NameAvailability(self.name_generator)
 
-        while True:
-            name = next(self.name_generator)
-            self.names.append(name)
-            yield name
+    @property
+    def names(self):
+        return self.availability.names
 
     def available_name(self, reservation_scope, prefix=''):
         """
         Search for the first name that is not in reservation scope
         """
 
-        for name in self.iter_names():
-            if self.is_available(prefix + name, reservation_scope):
-                return prefix + name
+        ordinal = self.availability.first_available(reservation_scope, prefix)
+        if ordinal is None:
+            return None
 
-        return None
+        return prefix + self.names[ordinal]
 
     def is_available(self, name, reservation_scope):
         """
@@ -162,25 +158,29 @@ class NameAssigner(object):
 
         :param str name: the name to check availability of
         :param reservation_scope: The scope to check
-        :type reservation_scope: Iterable[:class:`ast.AST`]
+        :type reservation_scope: Iterable[Scope]
         :rtype: bool
 
         """
 
-        return all(name not in namespace.assigned_names for namespace in reservation_scope)
+        return all(name not in scope.assigned_names for scope in reservation_scope)
 
     def __call__(self, module, prefix_globals, reserved_globals=None):
         assert isinstance(module, ast.Module)
         add_assigned(module)
+        self.availability.clear()
+
+        # The bindings are sorted once, and used to reserve names and then to assign them
+        bindings = sorted_bindings(module)
 
-        for namespace, binding in all_bindings(module):
+        for namespace, binding in bindings:
             if binding.reserved is not None:
                 scope = reservation_scope(namespace, binding)
-                reserve_name(binding.reserved, scope)
+                self.availability.reserve(binding.reserved, scope)
 
         if reserved_globals is not None:
             for name in reserved_globals:
-                module.assigned_names.add(name)
+                self.availability.reserve(name, [get_scope(module)])
 
         def should_rename(binding, name, scope):
             if binding.should_rename(name):
@@ -202,7 +202,7 @@ class NameAssigner(object):
 
             return False
 
-        for namespace, binding in sorted_bindings(module):
+        for namespace, binding in bindings:
             scope = reservation_scope(namespace, binding)
 
             if binding.allow_rename:
@@ -219,7 +219,7 @@ class NameAssigner(object):
                     binding.disallow_rename()
 
             if binding.name is not None:
-                reserve_name(binding.name, scope)
+                self.availability.reserve(binding.name, scope)
 
         return module
 
@@ -1,37 +1,51 @@
 import python_minifier.ast_compat as ast
 
+from python_minifier.ast_annotation import get_namespace, get_scope
 from python_minifier.rename.binding import BuiltinBinding, NameBinding
-from python_minifier.rename.util import builtins, get_global_namespace, get_nonlocal_namespace
+from python_minifier.rename.util import builtin_names, get_global_namespace
+from python_minifier.util import walk_preorder
 
 
-def get_binding(name, namespace):
-    if name in namespace.global_names and not isinstance(namespace, ast.Module):
-        return get_binding(name, get_global_namespace(namespace))
-    elif name in namespace.nonlocal_names and not isinstance(namespace, ast.Module):
-        return get_binding(name, get_nonlocal_namespace(namespace))
+# Builtins that access namespaces by name, so no name in a module that uses them can be safely renamed
+_tainting_builtins = frozenset(['exec', 'eval', 'locals', 'globals', 'vars'])
+
 
-    for binding in namespace.bindings:
-        if binding.name == name:
+def get_binding(name, namespace):
+    scope = get_scope(namespace)
+
+    # Search the enclosing namespaces until the name is found
+    while scope.parent is not None:
+        if name in scope.global_names:
+            scope = scope.global_scope()
+            continue
+        elif name in scope.nonlocal_names:
+            scope = scope.nonlocal_scope()
+            continue
+
+        binding = scope.get_binding(name)
+        if binding is not None:
             return binding
 
-    if not isinstance(namespace, ast.Module):
-        return get_binding(name, get_nonlocal_namespace(namespace))
+        scope = scope.nonlocal_scope()
 
-    else:
-        # This is unresolved at global scope - is it a builtin?
-        if name in dir(builtins):
-            if name in ['exec', 'eval', 'locals', 'globals', 'vars']:
-                namespace.tainted = True
+    binding = scope.get_binding(name)
+    if binding is not None:
+        return binding
 
-            binding = BuiltinBinding(name, namespace)
-            namespace.bindings.append(binding)
-            return binding
+    # This is unresolved at global scope - is it a builtin?
+    if name in builtin_names:
+        if name in _tainting_builtins:
+            scope.tainted = True
 
-        else:
-            binding = NameBinding(name)
-            binding.disallow_rename()
-            namespace.bindings.append(binding)
-            return binding
+        binding = BuiltinBinding(name, scope.node)
+        scope.add_binding(binding)
+        return binding
+
+    else:
+        binding = NameBinding(name)
+        binding.disallow_rename()
+        scope.add_binding(binding)
+        return binding
 
 
 def get_binding_disallow_class_namespace_rename(name, namespace):
@@ -53,55 +67,65 @@ def resolve_names(node):
 
     """
 
+    for node in walk_preorder(node):
+        resolve_name(node)
+
+
+def resolve_name(node):
+    """
+    Resolve the names a node references to a NameBinding
+
+    :param node: Any node in the module
+    :type node: :class:`ast.AST`
+
+    """
+
     if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
-        get_binding(node.id, node.namespace).add_reference(node)
-    elif isinstance(node, ast.Name) and node.id in node.namespace.nonlocal_names:
-        binding = get_binding(node.id, node.namespace)
+        get_binding(node.id, get_namespace(node)).add_reference(node)
+    elif isinstance(node, ast.Name) and node.id in get_scope(get_namespace(node)).nonlocal_names:
+        binding = get_binding(node.id, get_namespace(node))
         binding.add_reference(node)
 
-        if isinstance(node.ctx, ast.Store) and isinstance(node.namespace, ast.ClassDef):
+        if isinstance(node.ctx, ast.Store) and isinstance(get_namespace(node), ast.ClassDef):
             binding.disallow_rename()
 
-    elif isinstance(node, ast.ClassDef) and node.name in node.namespace.nonlocal_names:
-        binding = get_binding_disallow_class_namespace_rename(node.name, node.namespace)
+    elif isinstance(node, ast.ClassDef) and node.name in get_scope(get_namespace(node)).nonlocal_names:
+        binding = get_binding_disallow_class_namespace_rename(node.name, get_namespace(node))
         binding.add_reference(node)
 
-    elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name in node.namespace.nonlocal_names:
-        binding = get_binding_disallow_class_namespace_rename(node.name, node.namespace)
+    elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name in get_scope(get_namespace(node)).nonlocal_names:
+        binding = get_binding_disallow_class_namespace_rename(node.name, get_namespace(node))
         binding.add_reference(node)
 
     elif isinstance(node, ast.alias):
 
         if node.asname is not None:
-            if node.asname in node.namespace.nonlocal_names:
-                binding = get_binding_disallow_class_namespace_rename(node.asname, node.namespace)
+            if node.asname in get_scope(get_namespace(node)).nonlocal_names:
+                binding = get_binding_disallow_class_namespace_rename(node.asname, get_namespace(node))
                 binding.add_reference(node)
 
         else:
             # This binds the root module only for a dotted import
             root_module = node.name.split('.')[0]
 
-            if root_module in node.namespace.nonlocal_names:
-                binding = get_binding_disallow_class_namespace_rename(root_module, node.namespace)
+            if root_module in get_scope(get_namespace(node)).nonlocal_names:
+                binding = get_binding_disallow_class_namespace_rename(root_module, get_namespace(node))
                 binding.add_reference(node)
 
                 if '.' in node.name:
                     binding.disallow_rename()
 
     elif isinstance(node, ast.ExceptHandler) and node.name is not None:
-        if isinstance(node.name, str) and node.name in node.namespace.nonlocal_names:
-            get_binding_disallow_class_namespace_rename(node.name, node.namespace).add_reference(node)
+        if isinstance(node.name, str) and node.name in get_scope(get_namespace(node)).nonlocal_names:
+            get_binding_disallow_class_namespace_rename(node.name, get_namespace(node)).add_reference(node)
 
     elif isinstance(node, ast.Nonlocal):
         for name in node.names:
-            get_binding_disallow_class_namespace_rename(name, node.namespace).add_reference(node)
-    elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name in node.namespace.nonlocal_names:
-        get_binding_disallow_class_namespace_rename(node.name, node.namespace).add_reference(node)
-    elif isinstance(node, ast.MatchMapping) and node.rest in node.namespace.nonlocal_names:
-        get_binding_disallow_class_namespace_rename(node.rest, node.namespace).add_reference(node)
+            get_binding_disallow_class_namespace_rename(name, get_namespace(node)).add_reference(node)
+    elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name in get_scope(get_namespace(node)).nonlocal_names:
+        get_binding_disallow_class_namespace_rename(node.name, get_namespace(node)).add_reference(node)
+    elif isinstance(node, ast.MatchMapping) and node.rest in get_scope(get_namespace(node)).nonlocal_names:
+        get_binding_disallow_class_namespace_rename(node.rest, get_namespace(node)).add_reference(node)
 
     elif isinstance(node, ast.Exec):
-        get_global_namespace(node).tainted = True
-
-    for child in ast.iter_child_nodes(node):
-        resolve_names(child)
+        get_scope(get_global_namespace(node)).tainted = True
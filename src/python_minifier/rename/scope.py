@@ -0,0 +1,136 @@
+"""
+The scopes of a module
+
+Every namespace node in a module is given a :class:`Scope` when namespaces are added by
+:func:`python_minifier.rename.add_namespace`, which is found with :func:`python_minifier.ast_annotation.get_scope`.
+The scope holds the state of the namespace used for binding, resolving and assigning names, and links to the scopes
+it is nested in.
+
+"""
+
+import python_minifier.ast_compat as ast
+
+
+class Scope(object):
+    """
+    The names in a namespace
+
+    :param node: The namespace node
+    :type node: :class:`ast.AST`
+    :param parent: The scope this namespace is nested in, or None for the module scope
+    :type parent: Scope or None
+
+    """
+
+    __slots__ = (
+        'node',
+        'parent',
+        'module_scope',
+        'bindings',
+        'names',
+        'global_names',
+        'nonlocal_names',
+        'assigned_names',
+    )
+
+    def __init__(self, node, parent=None):
+        self.node = node
+        self.parent = parent
+        self.module_scope = self if parent is None else parent.module_scope
+
+        #: The bindings in this namespace, in the order they were added
+        self.bindings = []
+
+        #: The bindings in this namespace by the name they were bound with
+        self.names = {}
+
+        #: Names declared global in this namespace
+        self.global_names = set()
+
+        #: Names that are resolved in an enclosing namespace
+        self.nonlocal_names = set()
+
+        #: Names that can't be assigned to bindings in this namespace
+        self.assigned_names = set()
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, self.node.__class__.__name__)
+
+    def add_binding(self, binding):
+        """
+        Add a binding to this namespace
+
+        :param binding: The binding to add
+        :type binding: python_minifier.rename.binding.Binding
+
+        """
+
+        self.bindings.append(binding)
+
+        if binding.name is not None and binding.name not in self.names:
+            self.names[binding.name] = binding
+
+    def get_binding(self, name):
+        """
+        The binding of a name in this namespace
+
+        :param str name: The name bound in this namespace
+        :return: The binding, or None if the name is not bound in this namespace
+        :rtype: python_minifier.rename.binding.Binding or None
+
+        """
+
+        return self.names.get(name)
+
+    def global_scope(self):
+        """
+        The module scope this scope is in
+
+        :rtype: ModuleScope
+
+        """
+
+        return self.module_scope
+
+    def nonlocal_scope(self):
+        """
+        The closest enclosing scope that is not a class
+
+        This is where names that are not bound in this namespace are resolved.
+        The module scope is its own nonlocal scope.
+
+        :rtype: Scope
+
+        """
+
+        if self.parent is None:
+            return self
+
+        scope = self.parent
+        while isinstance(scope.node, ast.ClassDef):
+            scope = scope.parent
+        return scope
+
+
+class ModuleScope(Scope):
+    """
+    The names in a module
+
+    :param node: The module
+    :type node: :class:`ast.Module`
+
+    """
+
+    __slots__ = ('scopes', 'tainted', 'preserved')
+
+    def __init__(self, node):
+        super(ModuleScope, self).__init__(node)
+
+        #: Every scope in the module, in the order they were created
+        self.scopes = [self]
+
+        #: If the module uses a feature that means no names can be safely renamed
+        self.tainted = False
+
+        #: Names that must not be renamed anywhere in the module
+        self.preserved = set()
@@ -2,7 +2,8 @@ import sys
 
 import python_minifier.ast_compat as ast
 
-from python_minifier.util import is_constant_node
+from python_minifier.ast_annotation import get_namespace, get_scope
+from python_minifier.util import is_constant_node, walk_preorder
 
 
 def create_is_namespace():
@@ -42,10 +43,7 @@ def get_global_namespace(node):
 
     """
 
-    if node.namespace is node:
-        return node
-
-    return get_global_namespace(node.namespace)
+    return get_scope(get_namespace(node)).global_scope().node
 
 
 def get_nonlocal_namespace(node):
@@ -55,10 +53,11 @@ def get_nonlocal_namespace(node):
     The nonlocal namespace is the closest parent function scope's namespace.
     """
 
-    if isinstance(node.namespace, ast.ClassDef):
-        return get_nonlocal_namespace(node.namespace)
+    scope = get_scope(get_namespace(node))
+    if isinstance(scope.node, ast.ClassDef):
+        scope = scope.nonlocal_scope()
 
-    return node.namespace
+    return scope.node
 
 
 def arg_rename_in_place(node):
@@ -81,12 +80,12 @@ def arg_rename_in_place(node):
 
     """
 
-    func = node.namespace
+    func = get_namespace(node)
 
     if isinstance(func, ast.comprehension):
         return True
 
-    if isinstance(func.namespace, ast.ClassDef) and not isinstance(func, ast.Lambda):
+    if isinstance(get_namespace(func), ast.ClassDef) and not isinstance(func, ast.Lambda):
         all_args = (func.args.posonlyargs if hasattr(func.args, 'posonlyargs') else []) + func.args.args
         if len(all_args) > 0 and node is all_args[0]:
             if len(func.decorator_list) == 0:
@@ -142,18 +141,15 @@ def insert(suite, new_node):
 
 def allow_rename_locals(node, rename_locals, preserve_locals=None):
 
-    if preserve_locals is None:
-        preserve_locals = []
-
-    if not isinstance(node, ast.Module) and is_namespace(node):
-        for binding in node.bindings:
-            if rename_locals is False:
-                binding.disallow_rename()
-            elif binding.name in preserve_locals:
-                binding.disallow_rename()
+    preserve_locals = frozenset(preserve_locals or [])
 
-    for child in ast.iter_child_nodes(node):
-        allow_rename_locals(child, rename_locals, preserve_locals)
+    for node in walk_preorder(node):
+        if not isinstance(node, ast.Module) and is_namespace(node):
+            for binding in get_scope(node).bindings:
+                if rename_locals is False:
+                    binding.disallow_rename()
+                elif binding.name in preserve_locals:
+                    binding.disallow_rename()
 
 
 def find__all__(module):
@@ -192,9 +188,10 @@ def allow_rename_globals(module, rename_globals=False, preserve_globals=None):
         preserve_globals = []
 
     preserve_globals.extend(find__all__(module))
+    preserved = frozenset(preserve_globals)
 
-    for binding in module.bindings:
-        if rename_globals is False or binding.name in preserve_globals:
+    for binding in get_scope(module).bindings:
+        if rename_globals is False or binding.name in preserved:
             binding.disallow_rename()
 
 
@@ -203,3 +200,6 @@ try:
 except ImportError:
     # noinspection PyCompatibility
     import __builtin__ as builtins  # type: ignore
+
+#: The names of the builtins, which are resolved at module scope when nothing else binds them
+builtin_names = frozenset(dir(builtins))
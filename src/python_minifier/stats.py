@@ -0,0 +1,144 @@
+"""
+Timings and counters collected while minifying a module
+
+Collection is opt-in. A :class:`MinifyStats` object passed to :func:`python_minifier.minify` is made the active
+collector for the current thread while the module is minified. The instrumented parts of python-minifier record
+into the active collector using :func:`stage` and :func:`count`, which do nothing when there is no active collector.
+
+"""
+
+import threading
+import time
+
+try:
+    _clock = time.perf_counter
+except AttributeError:
+    # Python 2
+    _clock = time.time
+
+_local = threading.local()
+
+
+class MinifyStats(object):
+    """
+    Timings and counters for the minification of a module
+
+    Pass an instance as the stats argument of :func:`python_minifier.minify` to collect stats.
+
+    The timings are the wall time in seconds spent in each stage of minification:
+     - parse: Parsing the source
+     - copy: Copying a parsed module given as the source, instead of parsing
+     - annotate: Adding parent and namespace annotations to the module
+     - transforms: Applying the enabled transforms, such as combining imports and constant folding
+     - bind_names: Binding names to namespaces
+     - resolve_names: Resolving name references to bindings
+     - rename: Choosing and applying new names, including hoisting literals
+     - print: Printing the module
+     - verify: Parsing the printed module and comparing it to the transformed module
+     - total: The whole minification
+
+    The counters are:
+     - nodes: The number of nodes in the parsed module
+     - bindings: The number of bindings that were considered for renaming
+     - names_tried: The number of candidate names checked for availability when renaming
+     - fstring_candidates: The number of f-string representations that were evaluated
+     - folds_attempted: The number of constant expressions that were evaluated for folding
+     - folds_accepted: The number of constant expressions that were replaced with a shorter representation
+     - fallback_level: The position in fallbacks of the options that produced the result, or 0 for the given options
+
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.counters = {}
+
+    def __repr__(self):
+        return 'MinifyStats(timings=%r, counters=%r)' % (self.timings, self.counters)
+
+    def as_dict(self):
+        """
+        The stats as a JSON serializable dict
+
+        :rtype: dict
+        """
+
+        return {'timings': dict(self.timings), 'counters': dict(self.counters)}
+
+
+class _Stage(object):
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = _clock()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = _clock() - self.start
+        self.stats.timings[self.name] = self.stats.timings.get(self.name, 0.0) + elapsed
+
+
+class _NullStage(object):
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_null_stage = _NullStage()
+
+
+class collect(object):
+    """
+    Make a MinifyStats the active collector for the current thread
+
+    :param stats: The collector, or None to collect nothing
+    :type stats: MinifyStats or None
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.previous = getattr(_local, 'stats', None)
+        _local.stats = self.stats
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.stats = self.previous
+
+
+def active():
+    """
+    The active collector for the current thread
+
+    :rtype: MinifyStats or None
+    """
+
+    return getattr(_local, 'stats', None)
+
+
+def stage(name):
+    """
+    A context manager that adds the time spent in it to a timing of the active collector
+
+    :param str name: The name of the timing
+    """
+
+    stats = getattr(_local, 'stats', None)
+    if stats is None:
+        return _null_stage
+    return _Stage(stats, name)
+
+
+def count(name, value=1):
+    """
+    Add to a counter of the active collector
+
+    :param str name: The name of the counter
+    :param int value: The amount to add
+    """
+
+    stats = getattr(_local, 'stats', None)
+    if stats is not None:
+        stats.counters[name] = stats.counters.get(name, 0) + value
@@ -0,0 +1,35 @@
+from types import TracebackType
+from typing import Any, ContextManager, Dict, Optional, Text, Type
+
+
+class MinifyStats:
+    timings: Dict[Text, float]
+    counters: Dict[Text, int]
+
+    def __init__(self) -> None: ...
+
+    def as_dict(self) -> Dict[Text, Any]: ...
+
+
+class collect:
+    stats: Optional[MinifyStats]
+
+    def __init__(self, stats: Optional[MinifyStats]) -> None: ...
+
+    def __enter__(self) -> None: ...
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType]
+    ) -> None: ...
+
+
+def active() -> Optional[MinifyStats]: ...
+
+
+def stage(name: Text) -> ContextManager[None]: ...
+
+
+def count(name: Text, value: int = ...) -> None: ...
@@ -1,5 +1,6 @@
 import python_minifier.ast_compat as ast
 
+from python_minifier.ast_annotation import get_namespace
 from python_minifier.transforms.suite_transformer import SuiteTransformer
 
 
@@ -11,13 +12,15 @@ class CombineImports(SuiteTransformer):
 
     """
 
+    node_types = ('Import', 'ImportFrom')
+
     def _combine_import(self, node_list, parent):
 
         alias = []
         namespace = None
 
         for statement in node_list:
-            namespace = statement.namespace
+            namespace = get_namespace(statement)
             if isinstance(statement, ast.Import):
                 alias += statement.names
             else:
@@ -57,7 +60,7 @@ class CombineImports(SuiteTransformer):
             else:
                 if alias:
                     yield self.add_child(
-                        ast.ImportFrom(module=prev_import.module, names=alias, level=prev_import.level), parent=parent, namespace=prev_import.namespace
+                        ast.ImportFrom(module=prev_import.module, names=alias, level=prev_import.level), parent=parent, namespace=get_namespace(prev_import)
                     )
                     alias = []
 
@@ -65,11 +68,9 @@ class CombineImports(SuiteTransformer):
 
         if alias:
             yield self.add_child(
-                ast.ImportFrom(module=prev_import.module, names=alias, level=prev_import.level), parent=parent, namespace=prev_import.namespace
+                ast.ImportFrom(module=prev_import.module, names=alias, level=prev_import.level), parent=parent, namespace=get_namespace(prev_import)
             )
 
-    def suite(self, node_list, parent):
+    def transform_suite(self, node_list, parent):
         a = list(self._combine_import(node_list, parent))
-        b = list(self._combine_import_from(a, parent))
-
-        return [self.visit(n) for n in b]
+        return list(self._combine_import_from(a, parent))
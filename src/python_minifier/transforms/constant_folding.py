@@ -2,10 +2,12 @@ import math
 import sys
 
 import python_minifier.ast_compat as ast
-from python_minifier.ast_annotation import get_parent
+from python_minifier.ast_annotation import get_namespace, get_parent
 
-from python_minifier.ast_compare import compare_ast
+from python_minifier.ast_compare import structural_fingerprint
+from python_minifier.deadline import check as check_deadline
 from python_minifier.expression_printer import ExpressionPrinter
+from python_minifier.stats import count
 from python_minifier.transforms.suite_transformer import SuiteTransformer
 from python_minifier.util import is_constant_node
 
@@ -15,13 +17,12 @@ class FoldConstants(SuiteTransformer):
     Fold Constants if it would reduce the size of the source
     """
 
+    node_types = ('BinOp',)
+
     def __init__(self):
         super(FoldConstants, self).__init__()
 
-    def visit_BinOp(self, node):
-
-        node.left = self.visit(node.left)
-        node.right = self.visit(node.right)
+    def transform_BinOp(self, node):
 
         # Check this is a constant expression that could be folded
         # We don't try to fold strings or bytes, since they have probably been arranged this way to make the source shorter and we are unlikely to beat that
@@ -40,6 +41,9 @@ class FoldConstants(SuiteTransformer):
             # It can also be slow to evaluate
             return node
 
+        count('folds_attempted')
+        check_deadline()
+
         # Evaluate the expression
         try:
             original_expression = unparse_expression(node)
@@ -83,8 +87,10 @@ class FoldConstants(SuiteTransformer):
         # Check the folded expression parses back to the same AST
         try:
             folded_ast = ast.parse(folded_expression, 'folded expression', mode='eval')
-            compare_ast(new_node, folded_ast.body)
         except Exception:
+            return node
+
+        if structural_fingerprint(new_node) != structural_fingerprint(folded_ast.body):
             # This can happen if the printed value doesn't parse back to the same AST
             # e.g. complex numbers can be parsed as BinOp
             return node
@@ -94,7 +100,8 @@ class FoldConstants(SuiteTransformer):
             return node
 
         # New representation is shorter and has the same value, so use it
-        return self.add_child(new_node, get_parent(node), node.namespace)
+        count('folds_accepted')
+        return self.add_child(new_node, get_parent(node), get_namespace(node))
 
 
 def equal_value_and_type(a, b):
@@ -1,7 +1,7 @@
 import sys
 
 import python_minifier.ast_compat as ast
-from python_minifier.ast_annotation import get_parent
+from python_minifier.ast_annotation import get_namespace, get_parent
 
 from python_minifier.transforms.remove_annotations_options import RemoveAnnotationsOptions
 from python_minifier.transforms.suite_transformer import SuiteTransformer
@@ -12,63 +12,42 @@ class RemoveAnnotations(SuiteTransformer):
     Remove type annotations from source
     """
 
+    node_types = ('FunctionDef', 'AsyncFunctionDef', 'AnnAssign')
+
     def __init__(self, options):
         assert isinstance(options, RemoveAnnotationsOptions)
         self._options = options
         super(RemoveAnnotations, self).__init__()
 
-    def __call__(self, node):
-        if sys.version_info < (3, 0):
-            return node
-        return self.visit(node)
-
-    def visit_FunctionDef(self, node):
-        node.args = self.visit_arguments(node.args)
-        node.body = self.suite(node.body, parent=node)
-        node.decorator_list = [self.visit(d) for d in node.decorator_list]
-
-        if hasattr(node, 'type_params') and node.type_params is not None:
-            node.type_params = [self.visit(t) for t in node.type_params]
+    def enabled(self, module):
+        return sys.version_info >= (3, 0) and super(RemoveAnnotations, self).enabled(module)
 
+    def transform_FunctionDef(self, node):
         if hasattr(node, 'returns') and self._options.remove_return_annotations:
             node.returns = None
 
         return node
 
-    def visit_arguments(self, node):
-        assert isinstance(node, ast.arguments)
-
-        if hasattr(node, 'posonlyargs') and node.posonlyargs:
-            node.posonlyargs = [self.visit_arg(a) for a in node.posonlyargs]
+    def transform_AsyncFunctionDef(self, node):
+        return self.transform_FunctionDef(node)
 
-        if node.args:
-            node.args = [self.visit_arg(a) for a in node.args]
+    def transform_arguments(self, node):
+        assert isinstance(node, ast.arguments)
 
-        if hasattr(node, 'kwonlyargs') and node.kwonlyargs:
-            node.kwonlyargs = [self.visit_arg(a) for a in node.kwonlyargs]
+        if hasattr(node, 'varargannotation') and self._options.remove_argument_annotations:
+            node.varargannotation = None
 
-        if hasattr(node, 'varargannotation'):
-            if self._options.remove_argument_annotations:
-                node.varargannotation = None
-        else:
-            if node.vararg:
-                node.vararg = self.visit_arg(node.vararg)
-
-        if hasattr(node, 'kwargannotation'):
-            if self._options.remove_argument_annotations:
-                node.kwargannotation = None
-        else:
-            if node.kwarg:
-                node.kwarg = self.visit_arg(node.kwarg)
+        if hasattr(node, 'kwargannotation') and self._options.remove_argument_annotations:
+            node.kwargannotation = None
 
         return node
 
-    def visit_arg(self, node):
+    def transform_arg(self, node):
         if self._options.remove_argument_annotations:
             node.annotation = None
         return node
 
-    def visit_AnnAssign(self, node):
+    def transform_AnnAssign(self, node):
         def is_dataclass_field(node):
             if sys.version_info < (3, 7):
                 return False
@@ -122,11 +101,11 @@ class RemoveAnnotations(SuiteTransformer):
         if is_dataclass_field(node) or is_typing_sensitive(node):
             return node
         elif node.value:
-            return self.add_child(ast.Assign([node.target], node.value), parent=get_parent(node), namespace=node.namespace)
+            return self.add_child(ast.Assign([node.target], node.value), parent=get_parent(node), namespace=get_namespace(node))
         else:
             # Valueless annotations cause the interpreter to treat the variable as a local.
             # I don't know of another way to do that without assigning to it, so
             # keep it as an AnnAssign, but replace the annotation with '0'
 
-            node.annotation = self.add_child(ast.Num(0), parent=get_parent(node), namespace=node.namespace)
+            node.annotation = self.add_child(ast.Num(0), parent=get_parent(node), namespace=get_namespace(node))
             return node
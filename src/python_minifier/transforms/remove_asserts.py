@@ -10,11 +10,10 @@ class RemoveAsserts(SuiteTransformer):
     If a statement is syntactically necessary, use an empty expression instead
     """
 
-    def __call__(self, node):
-        return self.visit(node)
+    node_types = ('Assert',)
 
-    def suite(self, node_list, parent):
-        without_assert = [self.visit(a) for a in filter(lambda n: not isinstance(n, ast.Assert), node_list)]
+    def transform_suite(self, node_list, parent):
+        without_assert = [n for n in node_list if not isinstance(n, ast.Assert)]
 
         if len(without_assert) == 0:
             if isinstance(parent, ast.Module):
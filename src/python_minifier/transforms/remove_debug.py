@@ -13,8 +13,7 @@ class RemoveDebug(SuiteTransformer):
     If a statement is syntactically necessary, use an empty expression instead
     """
 
-    def __call__(self, node):
-        return self.visit(node)
+    node_types = ('If',)
 
     def constant_value(self, node):
         if sys.version_info < (3, 4):
@@ -41,9 +40,9 @@ class RemoveDebug(SuiteTransformer):
 
         return False
 
-    def suite(self, node_list, parent):
+    def transform_suite(self, node_list, parent):
 
-        without_debug = [self.visit(a) for a in filter(lambda n: not self.can_remove(n), node_list)]
+        without_debug = [n for n in node_list if not self.can_remove(n)]
 
         if len(without_debug) == 0:
             if isinstance(parent, ast.Module):
@@ -11,7 +11,7 @@ We can't generally know if a name refers to an exception, so we only do this for
 import sys
 
 import python_minifier.ast_compat as ast
-from python_minifier.ast_annotation import get_parent, set_parent
+from python_minifier.ast_annotation import get_parent, get_scope, set_parent
 
 from python_minifier.rename.binding import BuiltinBinding
 
@@ -115,7 +115,7 @@ def remove_no_arg_exception_call(module):
     if sys.version_info < (3, 0):
         return module
 
-    for binding in module.bindings:
+    for binding in get_scope(module).bindings:
         if not isinstance(binding, BuiltinBinding):
             continue
 
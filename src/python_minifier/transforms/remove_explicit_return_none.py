@@ -7,10 +7,9 @@ from python_minifier.util import is_constant_node
 
 
 class RemoveExplicitReturnNone(SuiteTransformer):
-    def __call__(self, node):
-        return self.visit(node)
+    node_types = ('Return',)
 
-    def visit_Return(self, node):
+    def transform_Return(self, node):
         assert isinstance(node, ast.Return)
 
         # Transform `return None` -> `return`
@@ -23,11 +22,9 @@ class RemoveExplicitReturnNone(SuiteTransformer):
 
         return node
 
-    def visit_FunctionDef(self, node):
+    def transform_FunctionDef(self, node):
         assert isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
 
-        node.body = [self.visit(a) for a in node.body]
-
         # Remove an explicit valueless `return` from the end of a function
         if len(node.body) > 0 and isinstance(node.body[-1], ast.Return) and node.body[-1].value is None:
             node.body.pop()
@@ -37,3 +34,6 @@ class RemoveExplicitReturnNone(SuiteTransformer):
             node.body = [self.add_child(ast.Expr(value=ast.Num(0)), parent=node)]
 
         return node
+
+    def transform_AsyncFunctionDef(self, node):
+        return self.transform_FunctionDef(node)
@@ -1,16 +1,15 @@
 import python_minifier.ast_compat as ast
 
+from python_minifier.ast_annotation import get_scope
 from python_minifier.transforms.suite_transformer import SuiteTransformer
-from python_minifier.util import is_constant_node
+from python_minifier.util import is_constant_node, walk_preorder
 
 
 def find_doc(node):
 
-    if isinstance(node, ast.Attribute) and node.attr == '__doc__':
-        raise ValueError('__doc__ found!')
-
-    for child in ast.iter_child_nodes(node):
-        find_doc(child)
+    for node in walk_preorder(node):
+        if isinstance(node, ast.Attribute) and node.attr == '__doc__':
+            raise ValueError('__doc__ found!')
 
 
 def _doc_in_module(module):
@@ -28,19 +27,10 @@ class RemoveLiteralStatements(SuiteTransformer):
     This includes docstrings
     """
 
-    def __call__(self, node):
-        if _doc_in_module(node):
-            return node
-        return self.visit(node)
-
-    def visit_Module(self, node):
-        for binding in node.bindings:
-            if binding.name == '__doc__':
-                node.body = [self.visit(a) for a in node.body]
-                return node
+    node_types = ('Expr',)
 
-        node.body = self.suite(node.body, parent=node)
-        return node
+    def enabled(self, module):
+        return super(RemoveLiteralStatements, self).enabled(module) and not _doc_in_module(module)
 
     def is_literal_statement(self, node):
         if not isinstance(node, ast.Expr):
@@ -48,8 +38,12 @@ class RemoveLiteralStatements(SuiteTransformer):
 
         return is_constant_node(node.value, (ast.Num, ast.Str, ast.NameConstant, ast.Bytes))
 
-    def suite(self, node_list, parent):
-        without_literals = [self.visit(n) for n in node_list if not self.is_literal_statement(n)]
+    def transform_suite(self, node_list, parent):
+        if isinstance(parent, ast.Module):
+            if get_scope(parent).get_binding('__doc__') is not None:
+                return node_list
+
+        without_literals = [n for n in node_list if not self.is_literal_statement(n)]
 
         if len(without_literals) == 0:
             if isinstance(parent, ast.Module):
@@ -6,20 +6,14 @@ from python_minifier.transforms.suite_transformer import SuiteTransformer
 
 
 class RemoveObject(SuiteTransformer):
-    def __call__(self, node):
-        if sys.version_info < (3, 0):
-            return node
+    node_types = ('ClassDef',)
 
-        return self.visit(node)
+    def enabled(self, module):
+        return sys.version_info >= (3, 0) and super(RemoveObject, self).enabled(module)
 
-    def visit_ClassDef(self, node):
+    def transform_ClassDef(self, node):
         node.bases = [
             b for b in node.bases if not isinstance(b, ast.Name) or (isinstance(b, ast.Name) and b.id != 'object')
         ]
 
-        if hasattr(node, 'type_params') and node.type_params is not None:
-            node.type_params = [self.visit(t) for t in node.type_params]
-
-        node.body = [self.visit(n) for n in node.body]
-
         return node
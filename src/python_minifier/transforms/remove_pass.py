@@ -10,11 +10,10 @@ class RemovePass(SuiteTransformer):
     If a statement is syntactically necessary, use an empty expression instead
     """
 
-    def __call__(self, node):
-        return self.visit(node)
+    node_types = ('Pass',)
 
-    def suite(self, node_list, parent):
-        without_pass = [self.visit(a) for a in filter(lambda n: not isinstance(n, ast.Pass), node_list)]
+    def transform_suite(self, node_list, parent):
+        without_pass = [n for n in node_list if not isinstance(n, ast.Pass)]
 
         if len(without_pass) == 0:
             if isinstance(parent, ast.Module):
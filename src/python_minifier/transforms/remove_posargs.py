@@ -1,12 +1,11 @@
 import python_minifier.ast_compat as ast
+from python_minifier.util import walk_preorder
 
 
 def remove_posargs(node):
-    if isinstance(node, ast.arguments) and hasattr(node, 'posonlyargs'):
-        node.args = node.posonlyargs + node.args
-        node.posonlyargs = []
-
-    for child in ast.iter_child_nodes(node):
-        remove_posargs(child)
+    for child in walk_preorder(node):
+        if isinstance(child, ast.arguments) and hasattr(child, 'posonlyargs'):
+            child.args = child.posonlyargs + child.args
+            child.posonlyargs = []
 
     return node
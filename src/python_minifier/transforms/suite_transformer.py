@@ -1,15 +1,50 @@
 import python_minifier.ast_compat as ast
-from python_minifier.ast_annotation import get_parent, add_parent as add_node_parent
+from python_minifier.ast_annotation import get_node_index, get_parent, add_parent as add_node_parent
 
 from python_minifier.rename.mapper import add_parent
 
+try:
+    from typing import Optional, Tuple  # noqa: F401
+except ImportError:
+    # Python 2
+    pass
+
 
 class NodeVisitor(object):
+    """
+    Visit the nodes of an AST in depth first order
+
+    The nodes are visited using an explicit stack, so deeply nested modules are not limited by the recursion limit.
+    A visit_<NodeType> method that calls :meth:`visit` or :meth:`generic_visit` only schedules those nodes to be
+    visited after it returns, so it must not depend on them having been visited.
+
+    """
+
+    # The nodes scheduled by the visit method that is running
+    _scheduled = None
+
     def visit(self, node):
         """Visit a node."""
-        method = 'visit_' + node.__class__.__name__
-        visitor = getattr(self, method, self.generic_visit)
-        return visitor(node)
+
+        if self._scheduled is not None:
+            self._scheduled.append(node)
+            return
+
+        stack = [node]
+        try:
+            while stack:
+                node = stack.pop()
+
+                self._scheduled = scheduled = []
+                method = 'visit_' + node.__class__.__name__
+                visitor = getattr(self, method, self.generic_visit)
+                visitor(node)
+
+                # The scheduled nodes are visited in the order they were scheduled
+                scheduled.reverse()
+                stack.extend(scheduled)
+        finally:
+            self._scheduled = None
 
     def generic_visit(self, node):
         """Called if no explicit visitor function exists for a node."""
@@ -39,116 +74,275 @@ class NodeVisitor(object):
         return visitor(node)
 
 
+class _Suite(object):
+    """
+    A list of nodes to visit in turn, where the result is the list of visited nodes
+
+    :param nodes: The nodes to visit
+    :type nodes: list[ast.AST]
+    """
+
+    __slots__ = ('nodes', 'statements')
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.statements = []
+
+
 class SuiteTransformer(NodeVisitor):
     """
     Transform suites of instructions
+
+    A transform is written as hooks that are called during a single traversal of the module:
+
+     - ``enabled(module)`` decides if the transform should be applied to a module at all.
+       This is decided before any transform is applied. By default a transform is only applied when the module
+       contains a node of one of its ``node_types``.
+     - ``transform_suite(node_list, parent)`` returns a new list of statements for a suite, before the statements
+       in it are visited.
+     - ``transform_<NodeType>(node)`` returns a replacement for a node of that type, after its children have
+       been visited.
+
+    Calling a transform applies just that transform. A :class:`FusedTransformer` applies many transforms in
+    one traversal. For that to give the same result as applying each transform in turn, ``transform_suite`` must
+    only depend on the statements in the suite and not on their children, and ``transform_<NodeType>`` must not
+    depend on changes a later transform makes to the children of the node.
+
+    When the module was annotated with a :class:`NodeIndex`, it is only used to decide which transforms are enabled.
+    It is not updated as the transforms add and remove nodes.
+
+    The module is traversed with an explicit stack, so deeply nested modules are not limited by the recursion limit.
+    The visit_<NodeType> methods are generators that yield each child node, or a :class:`_Suite` of statements,
+    and are sent back the visited result to assign in its place.
+
     """
 
+    #: The names of the node types this transform changes, or None if it should always be applied.
+    #: This must include any node type the transform looks for, even if the nodes it changes are of another type.
+    node_types = None  # type: Optional[Tuple[str, ...]]
+
     def __call__(self, node):
+        transforms = [transform for transform in self.transforms() if transform.enabled(node)]
+        if not transforms:
+            # There is nothing for any transform to do
+            return node
+
+        self._suite_transforms = [
+            transform.transform_suite for transform in transforms
+            if type(transform).transform_suite is not SuiteTransformer.transform_suite
+        ]
+
+        self._node_transforms = {}
+        for position, transform in enumerate(transforms):
+            for name in dir(transform):
+                if name.startswith('transform_') and name != 'transform_suite':
+                    node_type = name[len('transform_'):]
+                    self._node_transforms.setdefault(node_type, []).append((position, getattr(transform, name)))
+
         return self.visit(node)
 
+    def transforms(self):
+        """
+        The transforms to apply, in order
+
+        :rtype: list[SuiteTransformer]
+        """
+
+        return [self]
+
+    def enabled(self, module):
+        """
+        Should this transform be applied to a module
+
+        :param module: The module before any transforms are applied
+        :type module: :class:`ast.Module`
+        :rtype: bool
+        """
+
+        index = get_node_index(module)
+        if self.node_types is None or index is None:
+            return True
+
+        return any(index.count(node_type) for node_type in self.node_types)
+
+    def transform_suite(self, node_list, parent):
+        """
+        Transform the statements in a suite
+
+        :param node_list: The statements in the suite
+        :type node_list: list[:class:`ast.AST`]
+        :param parent: The node the suite belongs to
+        :type parent: :class:`ast.AST`
+        :rtype: list[:class:`ast.AST`]
+        """
+
+        return node_list
+
+    def visit(self, node):
+        stack = [(node, self._visit_children(node))]
+        result = None
+
+        while True:
+            node, children = stack[-1]
+
+            try:
+                child = children.send(result)
+            except StopIteration:
+                stack.pop()
+                result = self._visited(node)
+
+                if not stack:
+                    return result
+                continue
+
+            stack.append((child, self._visit_children(child)))
+            result = None
+
+    def _visit_children(self, node):
+        """
+        A generator that yields the children of a node to be visited
+
+        :rtype: Iterator[ast.AST or _Suite]
+        """
+
+        if isinstance(node, _Suite):
+            return self._visit_suite(node)
+
+        method = 'visit_' + node.__class__.__name__
+        visitor = getattr(self, method, self.generic_visit)
+        return visitor(node)
+
+    def _visited(self, node):
+        """
+        The result of visiting a node, after its children have been visited
+        """
+
+        if isinstance(node, _Suite):
+            return node.statements
+
+        node_transforms = self._node_transforms.get(node.__class__.__name__)
+        if node_transforms is None:
+            return node
+
+        return self._transform_node(node, node_transforms)
+
+    def _transform_node(self, node, node_transforms, after=-1):
+        for position, transform in node_transforms:
+            if position <= after:
+                continue
+
+            new_node = transform(node)
+
+            if new_node.__class__ is not node.__class__:
+                # Continue with the later transforms for the new node type
+                return self._transform_node(new_node, self._node_transforms.get(new_node.__class__.__name__, []), after=position)
+
+            node = new_node
+
+        return node
+
     def visit_ClassDef(self, node):
-        node.bases = [self.visit(b) for b in node.bases]
+        node.bases = yield _Suite(node.bases)
 
         if hasattr(node, 'type_params') and node.type_params is not None:
-            node.type_params = [self.visit(t) for t in node.type_params]
+            node.type_params = yield _Suite(node.type_params)
 
-        node.body = self.suite(node.body, parent=node)
-        node.decorator_list = [self.visit(d) for d in node.decorator_list]
+        node.body = yield self.suite(node.body, parent=node)
+        node.decorator_list = yield _Suite(node.decorator_list)
 
         if hasattr(node, 'starargs') and node.starargs is not None:
-            node.starargs = self.visit(node.starargs)
+            node.starargs = yield node.starargs
 
         if hasattr(node, 'kwargs') and node.kwargs is not None:
-            node.kwargs = self.visit(node.kwargs)
+            node.kwargs = yield node.kwargs
 
         if hasattr(node, 'keywords'):
-            node.keywords = [self.visit(kw) for kw in node.keywords]
-
-        return node
+            node.keywords = yield _Suite(node.keywords)
 
     def visit_FunctionDef(self, node):
-        node.args = self.visit(node.args)
-        node.body = self.suite(node.body, parent=node)
-        node.decorator_list = [self.visit(d) for d in node.decorator_list]
+        node.args = yield node.args
+        node.body = yield self.suite(node.body, parent=node)
+        node.decorator_list = yield _Suite(node.decorator_list)
 
         if hasattr(node, 'returns') and node.returns is not None:
-            node.returns = self.visit(node.returns)
-
-        return node
+            node.returns = yield node.returns
 
     def visit_AsyncFunctionDef(self, node):
         return self.visit_FunctionDef(node)
 
     def visit_For(self, node):
-        node.target = self.visit(node.target)
-        node.iter = self.visit(node.iter)
+        node.target = yield node.target
+        node.iter = yield node.iter
 
-        node.body = self.suite(node.body, parent=node)
+        node.body = yield self.suite(node.body, parent=node)
 
         if node.orelse:
-            node.orelse = self.suite(node.orelse, parent=node)
-
-        return node
+            node.orelse = yield self.suite(node.orelse, parent=node)
 
     def visit_AsyncFor(self, node):
         return self.visit_For(node)
 
     def visit_If(self, node):
-        node.test = self.visit(node.test)
+        node.test = yield node.test
 
-        node.body = self.suite(node.body, parent=node)
+        node.body = yield self.suite(node.body, parent=node)
 
         if node.orelse:
-            node.orelse = self.suite(node.orelse, parent=node)
-
-        return node
+            node.orelse = yield self.suite(node.orelse, parent=node)
 
     def visit_Try(self, node):
-        node.body = self.suite(node.body, parent=node)
+        node.body = yield self.suite(node.body, parent=node)
 
-        node.handlers = [self.visit(h) for h in node.handlers]
+        node.handlers = yield _Suite(node.handlers)
 
         if node.orelse:
-            node.orelse = self.suite(node.orelse, parent=node)
+            node.orelse = yield self.suite(node.orelse, parent=node)
 
         if node.finalbody:
-            node.finalbody = self.suite(node.finalbody, parent=node)
-
-        return node
+            node.finalbody = yield self.suite(node.finalbody, parent=node)
 
     def visit_While(self, node):
-        node.test = self.visit(node.test)
+        node.test = yield node.test
 
-        node.body = self.suite(node.body, parent=node)
+        node.body = yield self.suite(node.body, parent=node)
 
         if node.orelse:
-            node.orelse = self.suite(node.orelse, parent=node)
-
-        return node
+            node.orelse = yield self.suite(node.orelse, parent=node)
 
     def visit_With(self, node):
 
         if hasattr(node, 'items'):
-            node.items = [self.visit(i) for i in node.items]
+            node.items = yield _Suite(node.items)
         else:
             if node.context_expr:
-                node.context_expr = self.visit(node.context_expr)
+                node.context_expr = yield node.context_expr
             if node.optional_vars:
-                node.optional_vars = self.visit(node.optional_vars)
+                node.optional_vars = yield node.optional_vars
 
-        node.body = self.suite(node.body, parent=node)
-        return node
+        node.body = yield self.suite(node.body, parent=node)
 
     def visit_AsyncWith(self, node):
         return self.visit_With(node)
 
     def visit_Module(self, node):
-        node.body = self.suite(node.body, parent=node)
-        return node
+        node.body = yield self.suite(node.body, parent=node)
 
     def suite(self, node_list, parent):
-        return [self.visit(node) for node in node_list]
+        """
+        Apply the suite transforms to the statements in a suite
+
+        :return: The statements to visit
+        :rtype: _Suite
+        """
+
+        for transform_suite in self._suite_transforms:
+            node_list = transform_suite(node_list, parent)
+
+        return _Suite(node_list)
+
+    def _visit_suite(self, suite):
+        for node in suite.nodes:
+            suite.statements.append((yield node))
 
     def generic_visit(self, node):
         for field, old_value in ast.iter_fields(node):
@@ -156,7 +350,7 @@ class SuiteTransformer(NodeVisitor):
                 new_values = []
                 for value in old_value:
                     if isinstance(value, ast.AST):
-                        value = self.visit(value)
+                        value = yield value
                         if value is None:
                             continue
                         elif not isinstance(value, ast.AST):
@@ -165,12 +359,11 @@ class SuiteTransformer(NodeVisitor):
                     new_values.append(value)
                 old_value[:] = new_values
             elif isinstance(old_value, ast.AST):
-                new_node = self.visit(old_value)
+                new_node = yield old_value
                 if new_node is None:
                     delattr(node, field)
                 else:
                     setattr(node, field, new_node)
-        return node
 
     def add_child(self, child, parent, namespace=None):
         def nearest_function_namespace(node):
@@ -185,9 +378,9 @@ class SuiteTransformer(NodeVisitor):
 
             """
 
-            if isinstance(node, (ast.FunctionDef, ast.Module, ast.AsyncFunctionDef)):
-                return node
-            return nearest_function_namespace(get_parent(node))
+            while not isinstance(node, (ast.FunctionDef, ast.Module, ast.AsyncFunctionDef)):
+                node = get_parent(node)
+            return node
 
         if namespace is None:
             namespace = nearest_function_namespace(parent)
@@ -195,3 +388,22 @@ class SuiteTransformer(NodeVisitor):
         add_node_parent(child, parent=parent)
         add_parent(child, namespace=namespace)
         return child
+
+
+class FusedTransformer(SuiteTransformer):
+    """
+    Apply many transforms in a single traversal of a module
+
+    The result is the same as applying each transform to the module in turn.
+
+    :param transforms: The transforms to apply, in the order they would be applied in turn
+    :type transforms: list[SuiteTransformer]
+
+    """
+
+    def __init__(self, transforms):
+        super(FusedTransformer, self).__init__()
+        self._transforms = transforms
+
+    def transforms(self):
+        return self._transforms
@@ -1,5 +1,11 @@
 import python_minifier.ast_compat as ast
 
+try:
+    from typing import Dict, Tuple  # noqa: F401
+except ImportError:
+    # Python 2
+    pass
+
 
 def is_constant_node(node, types):
     """
@@ -40,3 +46,188 @@ def is_constant_node(node, types):
             raise RuntimeError('Unknown Constant value %r' % type(node.value))
 
     return False
+
+
+_reversed_field_tables = {}  # type: Dict[type, Tuple[str, ...]]
+
+
+def _reversed_fields(node_type):
+    """
+    The fields of a node class in reverse order
+
+    The table for each class is computed once.
+
+    :param type node_type: The class of the node
+    :rtype: tuple[str]
+    """
+
+    fields = _reversed_field_tables.get(node_type)
+    if fields is None:
+        fields = _reversed_field_tables[node_type] = tuple(reversed(node_type._fields))
+    return fields
+
+
+def child_nodes(node):
+    """
+    The direct children of a node
+
+    This is the same as :func:`ast.iter_child_nodes`, but returns a list.
+
+    :param node: The node to get the children of
+    :type node: :class:`ast.AST`
+    :rtype: list[:class:`ast.AST`]
+
+    """
+
+    children = []
+
+    for field in node._fields:
+        value = getattr(node, field, None)
+        if isinstance(value, ast.AST):
+            children.append(value)
+        elif isinstance(value, list):
+            for child in value:
+                if isinstance(child, ast.AST):
+                    children.append(child)
+
+    return children
+
+
+def walk_preorder(node, children=None):
+    """
+    Iterate over an AST depth first, without recursion
+
+    Each node is yielded before its children, in the same order as a recursive function that visits a node and then
+    each of its children in turn. The children of a node are only found after the node is yielded, so they may be
+    changed by the caller.
+
+    An explicit stack is used instead of recursion, so the depth of the AST is not limited by the recursion limit.
+
+    The items do not need to be nodes if a children function is given to find the child items of an item. This
+    can be used to carry state from an item to its children.
+
+    :param node: The root of the AST
+    :param children: A function that returns a list of the children of an item, in order. Defaults to the child nodes.
+    :rtype: Iterable
+
+    """
+
+    stack = [node]
+    pop = stack.pop
+    push = stack.append
+
+    if children is not None:
+        while stack:
+            node = pop()
+            yield node
+
+            stack.extend(reversed(children(node)))
+
+        return
+
+    AST = ast.AST
+
+    while stack:
+        node = pop()
+        yield node
+
+        # The children are pushed in reverse order, so they are popped in order
+        for field in _reversed_fields(type(node)):
+            value = getattr(node, field, None)
+            if isinstance(value, AST):
+                push(value)
+            elif isinstance(value, list):
+                for child in reversed(value):
+                    if isinstance(child, AST):
+                        push(child)
+
+
+def walk_preorder_with_parent(node, parent):
+    """
+    Iterate over an AST depth first, without recursion, with the parent of each node
+
+    This is the same as :func:`walk_preorder`, but yields (node, parent) pairs.
+
+    :param node: The root of the AST
+    :type node: :class:`ast.AST`
+    :param parent: The parent of the root node
+    :rtype: Iterable[tuple[:class:`ast.AST`, :class:`ast.AST`]]
+
+    """
+
+    stack = [(node, parent)]
+    pop = stack.pop
+    push = stack.append
+    AST = ast.AST
+
+    while stack:
+        item = pop()
+        yield item
+
+        node = item[0]
+        for field in _reversed_fields(type(node)):
+            value = getattr(node, field, None)
+            if isinstance(value, AST):
+                push((value, node))
+            elif isinstance(value, list):
+                for child in reversed(value):
+                    if isinstance(child, AST):
+                        push((child, node))
+
+
+# The fields, and the fields and attributes, of each node class
+_copy_tables = {}  # type: Dict[type, Tuple[Tuple[str, ...], Tuple[str, ...]]]
+
+
+def copy_ast(node):
+    """
+    Copy an AST
+
+    This is much faster than :func:`copy.deepcopy`, as only the fields and attributes of each node are copied.
+    Nodes without any fields or attributes, such as expression contexts and operators, are shared by the parser
+    and are not copied.
+
+    :param node: The root of the AST to copy
+    :type node: :class:`ast.AST`
+    :rtype: :class:`ast.AST`
+
+    """
+
+    # The copies of nodes that still refer to the children of the original node
+    copies = []
+
+    def copy_node(node):
+        node_type = type(node)
+
+        table = _copy_tables.get(node_type)
+        if table is None:
+            table = _copy_tables[node_type] = (node_type._fields, node_type._fields + node_type._attributes)
+
+        fields, names = table
+        if not names:
+            return node
+
+        new_node = node_type.__new__(node_type)
+
+        old_values = node.__dict__
+        new_values = new_node.__dict__
+        for name in names:
+            if name in old_values:
+                new_values[name] = old_values[name]
+
+        copies.append((new_values, fields))
+        return new_node
+
+    root = copy_node(node)
+
+    while copies:
+        values, fields = copies.pop()
+
+        for field in fields:
+            value = values.get(field)
+            if isinstance(value, ast.AST):
+                values[field] = copy_node(value)
+            elif isinstance(value, list):
+                values[field] = [copy_node(item) if isinstance(item, ast.AST) else item for item in value]
+
+    return root
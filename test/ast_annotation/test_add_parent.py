@@ -1,6 +1,15 @@
 import pytest
 import ast
-from python_minifier.ast_annotation import add_parent, get_parent, set_parent
+from python_minifier.ast_annotation import (
+    Annotations,
+    add_parent,
+    get_namespace,
+    get_parent,
+    get_scope,
+    set_namespace,
+    set_parent
+)
+from python_minifier.rename import add_namespace
 
 
 def test_add_parent():
@@ -47,3 +56,76 @@ def test_replaces_parent_of_given_node():
     tree.body[0] = call
     set_parent(call, tree)
     assert get_parent(call) == tree
+
+
+def test_annotations_are_not_set_on_nodes():
+    tree = ast.parse('a = func()')
+    add_parent(tree)
+    add_namespace(tree)
+
+    for node in ast.walk(tree):
+        assert '_parent' not in node.__dict__
+        assert 'namespace' not in node.__dict__
+        assert 'scope' not in node.__dict__
+
+
+def test_annotations_context():
+    tree = ast.parse('a = 1')
+
+    with Annotations():
+        add_parent(tree)
+        assert get_parent(tree.body[0]) is tree
+
+        with Annotations():
+            with pytest.raises(ValueError):
+                get_parent(tree.body[0])
+
+        assert get_parent(tree.body[0]) is tree
+
+    with pytest.raises(ValueError):
+        get_parent(tree.body[0])
+
+
+def test_default_annotations_are_replaced():
+    first = ast.parse('a = 1')
+    add_parent(first)
+
+    second = ast.parse('b = 2')
+    add_parent(second)
+
+    assert get_parent(second.body[0]) is second
+    with pytest.raises(ValueError):
+        get_parent(first.body[0])
+
+
+def test_namespace():
+    tree = ast.parse('def f(a): return a')
+
+    with pytest.raises(ValueError):
+        get_namespace(tree.body[0])
+
+    add_parent(tree)
+    add_namespace(tree)
+
+    function = tree.body[0]
+    assert get_namespace(tree) is tree
+    assert get_namespace(function) is tree
+    assert get_namespace(function.body[0]) is function
+    assert get_namespace(function.args) is function
+
+    name = ast.Name('b', ast.Load())
+    set_namespace(name, function)
+    assert get_namespace(name) is function
+
+
+def test_scope():
+    tree = ast.parse('def f(a): return a')
+    add_parent(tree)
+    add_namespace(tree)
+
+    function = tree.body[0]
+    assert get_scope(function).node is function
+    assert get_scope(function).parent is get_scope(tree)
+
+    with pytest.raises(ValueError):
+        get_scope(function.body[0])
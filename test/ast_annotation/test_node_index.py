@@ -0,0 +1,61 @@
+import ast
+
+import pytest
+
+from python_minifier.ast_annotation import NodeIndex, add_parent, get_node_index
+
+
+def test_index_nodes():
+    tree = ast.parse('''
+a = 1
+b = 2
+def f():
+    pass
+''')
+
+    index = NodeIndex()
+    add_parent(tree, index=index)
+
+    assert index.count('Assign') == 2
+    assert index.nodes('Assign') == frozenset(tree.body[:2])
+    assert index.count('FunctionDef') == 1
+    assert index.count('Pass') == 1
+    assert index.count('While') == 0
+    assert index.nodes('While') == frozenset()
+
+
+def test_get_node_index():
+    tree = ast.parse('a = func(b)')
+
+    index = NodeIndex()
+    add_parent(tree, index=index)
+
+    assert get_node_index(tree) is index
+
+
+def test_get_node_index_not_indexed():
+    tree = ast.parse('a = func(b)')
+    add_parent(tree)
+
+    assert get_node_index(tree) is None
+
+
+def test_index_node_types():
+    tree = ast.parse('''
+a = 1
+def f():
+    pass
+''')
+
+    index = NodeIndex(node_types=['Pass', 'While'])
+    add_parent(tree, index=index)
+
+    assert index.count('Pass') == 1
+    assert index.nodes('Pass') == frozenset([tree.body[1].body[0]])
+    assert index.count('While') == 0
+
+    with pytest.raises(ValueError):
+        index.count('Assign')
+
+    with pytest.raises(ValueError):
+        index.nodes('FunctionDef')
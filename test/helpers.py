@@ -1,5 +1,5 @@
 import python_minifier.ast_compat as ast
-from python_minifier.ast_annotation import add_parent
+from python_minifier.ast_annotation import add_parent, get_scope
 
 from python_minifier.rename import add_namespace, resolve_names
 from python_minifier.rename.bind_names import bind_names
@@ -37,13 +37,13 @@ def print_namespace(namespace, indent=''):
 
     s += indent + '+ ' + namespace_name(namespace) + '\n'
 
-    for name in sorted(namespace.global_names):
+    for name in sorted(get_scope(namespace).global_names):
         s += indent + '  - global ' + name + '\n'
 
-    for name in sorted(namespace.nonlocal_names):
+    for name in sorted(get_scope(namespace).nonlocal_names):
         s += indent + '  - nonlocal ' + name + '\n'
 
-    for binding in sorted(namespace.bindings, key=lambda b: b.name or str(b.value)):
+    for binding in sorted(get_scope(namespace).bindings, key=lambda b: b.name or str(b.value)):
         s += indent + '  - ' + repr(binding) + '\n'
 
     for child in iter_child_namespaces(namespace):
@@ -0,0 +1,134 @@
+"""Tests for minifying the modules in wheel and zip archives."""
+import base64
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+
+import pytest
+
+from python_minifier.archive import is_archive, minify_archive
+from subprocess_compat import run_subprocess, safe_decode
+
+
+MODULE = b'def hello(name):\n    """Say hello"""\n    return "Hello " + name\n'
+
+
+def create_wheel(path):
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr(zipfile.ZipInfo('example/', (2020, 1, 1, 0, 0, 0)), b'')
+        archive.writestr(zipfile.ZipInfo('example/__init__.py', (2020, 1, 1, 0, 0, 0)), MODULE)
+
+        deflated = zipfile.ZipInfo('example/data.txt', (2020, 1, 1, 0, 0, 0))
+        deflated.compress_type = zipfile.ZIP_DEFLATED
+        archive.writestr(deflated, b'data ' * 100)
+
+        archive.writestr('example-1.0.dist-info/WHEEL', b'Wheel-Version: 1.0\n')
+        archive.writestr('example-1.0.dist-info/RECORD', b'example/__init__.py,sha256=invalid,1\n')
+
+
+def record_hash(data):
+    return 'sha256=' + base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b'=').decode('ascii')
+
+
+@pytest.fixture
+def directory():
+    directory = tempfile.mkdtemp()
+    yield directory
+    shutil.rmtree(directory)
+
+
+def test_is_archive(directory):
+    wheel = os.path.join(directory, 'example-1.0-py3-none-any.whl')
+    create_wheel(wheel)
+    assert is_archive(wheel)
+
+    not_a_zip = os.path.join(directory, 'fake.zip')
+    with open(not_a_zip, 'w') as f:
+        f.write('not a zip')
+    assert not is_archive(not_a_zip)
+
+    assert not is_archive(__file__)
+
+
+def test_minify_archive(directory):
+    wheel = os.path.join(directory, 'example-1.0-py3-none-any.whl')
+    output = os.path.join(directory, 'output.whl')
+    create_wheel(wheel)
+
+    def minify_modules(modules):
+        for name, source in modules:
+            yield name, source.upper()
+
+    assert minify_archive(wheel, output, minify_modules) == ['example/__init__.py']
+
+    with zipfile.ZipFile(output) as archive:
+        assert [info.filename for info in archive.infolist()] == [
+            'example/',
+            'example/__init__.py',
+            'example/data.txt',
+            'example-1.0.dist-info/WHEEL',
+            'example-1.0.dist-info/RECORD',
+        ]
+
+        assert archive.read('example/__init__.py') == MODULE.upper()
+        assert archive.getinfo('example/data.txt').compress_type == zipfile.ZIP_DEFLATED
+        assert archive.getinfo('example/__init__.py').date_time == (2020, 1, 1, 0, 0, 0)
+
+        record = archive.read('example-1.0.dist-info/RECORD').decode('utf-8').splitlines()
+        assert record == [
+            'example/__init__.py,%s,%d' % (record_hash(MODULE.upper()), len(MODULE)),
+            'example/data.txt,%s,500' % record_hash(b'data ' * 100),
+            'example-1.0.dist-info/WHEEL,%s,19' % record_hash(b'Wheel-Version: 1.0\n'),
+            'example-1.0.dist-info/RECORD,,',
+        ]
+
+
+def test_minify_archive_in_place_failure(directory):
+    wheel = os.path.join(directory, 'example-1.0-py3-none-any.whl')
+    create_wheel(wheel)
+
+    with open(wheel, 'rb') as f:
+        original = f.read()
+
+    def minify_modules(modules):
+        raise ValueError('Failed')
+
+    with pytest.raises(ValueError):
+        minify_archive(wheel, wheel, minify_modules)
+
+    # The archive is unchanged, and no temporary files are left behind
+    with open(wheel, 'rb') as f:
+        assert f.read() == original
+    assert os.listdir(directory) == ['example-1.0-py3-none-any.whl']
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_cli_archive(directory, jobs):
+    wheel = os.path.join(directory, 'example-1.0-py3-none-any.whl')
+    output = os.path.join(directory, 'output.whl')
+    create_wheel(wheel)
+
+    result = run_subprocess([sys.executable, '-m', 'python_minifier', wheel, '--output', output, '--jobs', jobs], timeout=60)
+    assert result.returncode == 0, safe_decode(result.stderr)
+    assert safe_decode(result.stdout).splitlines() == ['example/__init__.py']
+
+    with zipfile.ZipFile(output) as archive:
+        assert archive.read('example/__init__.py') == b"def hello(name):'Say hello';return'Hello '+name"
+
+    result = run_subprocess([sys.executable, '-m', 'python_minifier', wheel, '--in-place'], timeout=60)
+    assert result.returncode == 0, safe_decode(result.stderr)
+
+    with open(wheel, 'rb') as f, open(output, 'rb') as g:
+        assert f.read() == g.read()
+
+
+def test_cli_archive_requires_output(directory):
+    wheel = os.path.join(directory, 'example-1.0-py3-none-any.whl')
+    create_wheel(wheel)
+
+    result = run_subprocess([sys.executable, '-m', 'python_minifier', wheel], timeout=30)
+    assert result.returncode == 1
+    assert 'is an archive, --output or --in-place required' in safe_decode(result.stderr)
@@ -0,0 +1,54 @@
+import ast
+import sys
+
+import pytest
+
+from python_minifier.ast_compare import CompareError, compare_ast, structural_fingerprint
+
+
+def test_equal():
+    source = '''
+def f(a, b=1, *args, **kwargs):
+    return {a: [b, None]}[a].c
+'''
+
+    compare_ast(ast.parse(source), ast.parse(source))
+    assert structural_fingerprint(ast.parse(source)) == structural_fingerprint(ast.parse(source))
+
+
+@pytest.mark.parametrize('left, right', [
+    ('a', 'b'),
+    ('a = 1', 'a = 2'),
+    ('f(a, b)', 'f(a)(b)'),
+    ('[a, b]', '[[a], b]'),
+    ('[a, b]', '[a, b, c]'),
+    ('a.b', 'a[b]'),
+    ('{a: b}', '{a, b}'),
+])
+def test_not_equal(left, right):
+    assert structural_fingerprint(ast.parse(left)) != structural_fingerprint(ast.parse(right))
+
+    with pytest.raises(CompareError):
+        compare_ast(ast.parse(left), ast.parse(right))
+
+
+def test_error_message():
+    with pytest.raises(CompareError) as e:
+        compare_ast(ast.parse('a = 1'), ast.parse('a = 2'))
+
+    assert 'Fields do not match!' in str(e.value)
+
+    with pytest.raises(CompareError) as e:
+        compare_ast(ast.parse('[a, b]'), ast.parse('[a, b, c]'))
+
+    assert 'List does not have the same number of elements!' in str(e.value)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason='Constant kind field')
+def test_kind_is_ignored():
+    left = ast.parse('u"hello"')
+    right = ast.parse('"hello"')
+
+    assert left.body[0].value.kind != right.body[0].value.kind
+    compare_ast(left, right)
+    assert structural_fingerprint(left) == structural_fingerprint(right)
@@ -0,0 +1,62 @@
+import python_minifier.ast_compat as ast
+from python_minifier.ast_annotation import add_parent, get_scope
+from python_minifier.rename import add_namespace, bind_names, resolve_names
+from python_minifier.rename.binding import BuiltinBinding, NameBinding
+
+SOURCE = '''
+import os
+
+def f(a, *args, **kwargs):
+    global g
+    g = a + a
+    return os, args, kwargs, len(args)
+'''
+
+
+def prepare(source):
+    module = ast.parse(source)
+    add_parent(module)
+    add_namespace(module)
+    bind_names(module)
+    resolve_names(module)
+    return module
+
+
+def costs(binding):
+    return binding.new_mention_count(), binding.old_mention_count(), binding.additional_byte_cost()
+
+
+def test_rename_costs():
+    module = prepare(SOURCE)
+    function = module.body[1]
+
+    # import os -> import os as A
+    assert costs(get_scope(module).get_binding('os')) == (2, 1, 4)
+
+    assert costs(get_scope(module).get_binding('g')) == (2, 0, 0)
+    assert costs(get_scope(module).get_binding('f')) == (1, 0, 0)
+
+    # The argument can't be renamed in place, so is assigned to the new name
+    assert costs(get_scope(function).get_binding('a')) == (3, 2, 2)
+
+    # The vararg and kwarg are renamed in the arguments node
+    assert costs(get_scope(function).get_binding('args')) == (3, 0, 0)
+    assert costs(get_scope(function).get_binding('kwargs')) == (2, 0, 0)
+
+    builtin = get_scope(module).get_binding('len')
+    assert isinstance(builtin, BuiltinBinding)
+    assert costs(builtin) == (2, 1, 2)
+
+
+def test_costs_counted_as_references_are_added():
+    binding = NameBinding('name')
+    assert costs(binding) == (0, 0, 0)
+
+    binding.add_reference(ast.Name(id='name', ctx=ast.Store()))
+    binding.add_reference(ast.Name(id='name', ctx=ast.Load()))
+    assert costs(binding) == (2, 0, 0)
+
+    binding.add_reference(ast.alias(name='name', asname=None))
+    assert costs(binding) == (3, 1, 4)
+
+    assert not hasattr(binding, '__dict__')
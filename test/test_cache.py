@@ -0,0 +1,127 @@
+"""Tests for the minification result cache."""
+import os
+import shutil
+import sys
+import tempfile
+
+from python_minifier import RemoveAnnotationsOptions
+from python_minifier.cache import ResultCache, source_digest
+from subprocess_compat import run_subprocess, safe_decode
+
+
+def test_key():
+    cache = ResultCache('unused', '1.0.0')
+
+    options = {'rename_locals': True, 'remove_annotations': RemoveAnnotationsOptions()}
+    key = cache.key(b'a = 1', options)
+
+    assert key == cache.key(b'a = 1', dict(options))
+    assert key != cache.key(b'a = 2', options)
+    assert key != cache.key(b'a = 1', {'rename_locals': False, 'remove_annotations': RemoveAnnotationsOptions()})
+    assert key != cache.key(b'a = 1', {'rename_locals': True, 'remove_annotations': RemoveAnnotationsOptions(remove_return_annotations=False)})
+    assert key != ResultCache('unused', '1.0.1').key(b'a = 1', options)
+
+    # The version of a development install doesn't change when the package source does
+    cache.source_digest = 'changed'
+    assert key != cache.key(b'a = 1', options)
+
+
+def test_source_digest():
+    directory = tempfile.mkdtemp()
+    try:
+        os.mkdir(os.path.join(directory, 'package'))
+        with open(os.path.join(directory, 'package', 'module.py'), 'w') as f:
+            f.write('a = 1\n')
+        with open(os.path.join(directory, 'README'), 'w') as f:
+            f.write('Not python source\n')
+
+        digest = source_digest(directory)
+        assert digest == source_digest(directory)
+
+        with open(os.path.join(directory, 'README'), 'w') as f:
+            f.write('Changed\n')
+        assert digest == source_digest(directory)
+
+        with open(os.path.join(directory, 'package', 'module.py'), 'w') as f:
+            f.write('a = 2\n')
+        assert digest != source_digest(directory)
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_get_put():
+    directory = tempfile.mkdtemp()
+    try:
+        cache = ResultCache(os.path.join(directory, 'cache'), '1.0.0')
+        key = cache.key(b'a = 1', {})
+
+        assert cache.get(key) is None
+        cache.put(key, b'a=1')
+        assert cache.get(key) == b'a=1'
+
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.stats() == 'cache: 1 hits, 1 misses (50.0% hit rate)'
+
+        # No temporary files are left behind
+        for _root, _dirs, files in os.walk(directory):
+            assert not [f for f in files if f.endswith('.tmp')]
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_evict_least_recently_used():
+    directory = tempfile.mkdtemp()
+    try:
+        cache = ResultCache(directory, '1.0.0', max_size=25)
+
+        keys = [cache.key(str(i).encode(), {}) for i in range(4)]
+        for i, key in enumerate(keys):
+            cache.put(key, b'0123456789')
+            os.utime(cache._path(key), (1000 + i, 1000 + i))
+
+        # Using the oldest entry makes it the most recently used
+        assert cache.get(keys[0]) is not None
+
+        cache.evict()
+
+        assert cache.get(keys[0]) == b'0123456789'
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2]) is None
+        assert cache.get(keys[3]) == b'0123456789'
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_cli_cache():
+    directory = tempfile.mkdtemp()
+    try:
+        cache_dir = os.path.join(directory, 'cache')
+        path = os.path.join(directory, 'module.py')
+        source = 'def hello(name):\n    return "Hello " + name\n'
+
+        def run():
+            with open(path, 'w') as f:
+                f.write(source)
+
+            result = run_subprocess([
+                sys.executable, '-m', 'python_minifier', path, '--in-place', '--cache-dir', cache_dir, '--cache-stats'
+            ], timeout=30)
+            assert result.returncode == 0, safe_decode(result.stderr)
+
+            with open(path) as f:
+                return f.read(), safe_decode(result.stderr)
+
+        first_output, first_stats = run()
+        assert 'cache: 0 hits, 1 misses' in first_stats
+
+        second_output, second_stats = run()
+        assert 'cache: 1 hits, 0 misses' in second_stats
+        assert second_output == first_output
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_cli_cache_stats_requires_cache_dir():
+    result = run_subprocess([sys.executable, '-m', 'python_minifier', 'example.py', '--cache-stats'], timeout=30)
+    assert result.returncode == 1
+    assert '--cache-stats requires --cache-dir' in safe_decode(result.stderr)
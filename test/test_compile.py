@@ -0,0 +1,157 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+from python_minifier import CompileOptions, minify, minify_many
+from python_minifier.bytecode import cache_path, compile_module
+from subprocess_compat import run_subprocess, safe_decode
+
+
+SOURCE = b'def hello(name):\n    """Say hello"""\n    assert name\n    return "Hello " + name\n'
+
+requires_hash_pyc = pytest.mark.skipif(sys.version_info < (3, 7), reason='Hash based .pyc files require Python 3.7')
+
+
+def py_compile_bytecode(path, optimize, invalidation_mode):
+    """The .pyc file content produced by py_compile"""
+
+    import py_compile
+
+    mode = {
+        'timestamp': py_compile.PycInvalidationMode.TIMESTAMP,
+        'checked-hash': py_compile.PycInvalidationMode.CHECKED_HASH,
+        'unchecked-hash': py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    }[invalidation_mode]
+
+    cfile = py_compile.compile(path, cfile=path + '.expected', doraise=True, optimize=optimize, invalidation_mode=mode)
+    with open(cfile, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def directory():
+    directory = tempfile.mkdtemp()
+    yield directory
+    shutil.rmtree(directory)
+
+
+@requires_hash_pyc
+@pytest.mark.parametrize('invalidation_mode', ['timestamp', 'checked-hash', 'unchecked-hash'])
+@pytest.mark.parametrize('optimize', [0, 2])
+def test_compile_module(directory, invalidation_mode, optimize):
+    path = os.path.join(directory, 'module.py')
+    with open(path, 'wb') as f:
+        f.write(SOURCE)
+
+    options = CompileOptions(optimize=optimize, invalidation_mode=invalidation_mode)
+    bytecode = compile_module(SOURCE, path, options, os.stat(path).st_mtime)
+
+    assert bytecode == py_compile_bytecode(path, optimize, invalidation_mode)
+
+
+def test_compile_options():
+    with pytest.raises(ValueError):
+        CompileOptions(optimize=3)
+
+    with pytest.raises(ValueError):
+        CompileOptions(invalidation_mode='never')
+
+    if sys.version_info >= (3, 7):
+        assert CompileOptions().invalidation_mode == 'checked-hash'
+    else:
+        assert CompileOptions().invalidation_mode == 'timestamp'
+
+
+def test_timestamp_requires_mtime():
+    with pytest.raises(ValueError):
+        compile_module(SOURCE, 'module.py', CompileOptions(invalidation_mode='timestamp'))
+
+
+@requires_hash_pyc
+@pytest.mark.parametrize('pool', ['process', 'thread'])
+def test_minify_many_compile(pool):
+    sources = [('a.py', SOURCE), ('b.py', 'b = 2'), ('c.py', 'def c(:')]
+    options = CompileOptions(optimize=1)
+
+    results = dict(minify_many(sources, workers=2, pool=pool, compile=options))
+
+    for name, source in sources[:2]:
+        minified = minify(source, name)
+        assert results[name] == (minified, compile_module(minified.encode('utf-8'), name, options))
+
+    assert isinstance(results['c.py'], SyntaxError)
+
+
+def test_minify_many_compile_validation():
+    with pytest.raises(TypeError):
+        minify_many([], compile='yes')
+
+    with pytest.raises(ValueError):
+        minify_many([], compile=CompileOptions(invalidation_mode='timestamp'))
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_cli_compile_in_place(directory, jobs):
+    paths = []
+    for name in ('a.py', 'b.py'):
+        path = os.path.join(directory, name)
+        with open(path, 'wb') as f:
+            f.write(SOURCE)
+        paths.append(path)
+
+    result = run_subprocess([sys.executable, '-m', 'python_minifier', directory, '--in-place', '--compile', '--jobs', jobs], timeout=60)
+    assert result.returncode == 0, safe_decode(result.stderr)
+
+    options = CompileOptions()
+    for path in paths:
+        with open(path, 'rb') as f:
+            minified = f.read()
+        assert minified != SOURCE
+
+        with open(cache_path(path, options), 'rb') as f:
+            bytecode = f.read()
+
+        if options.invalidation_mode == 'timestamp':
+            assert bytecode == compile_module(minified, path, options, os.stat(path).st_mtime)
+        else:
+            assert bytecode == py_compile_bytecode(path, -1, options.invalidation_mode)
+
+
+def test_cli_compile_output(directory):
+    source_path = os.path.join(directory, 'source.py')
+    output_path = os.path.join(directory, 'output.py')
+    with open(source_path, 'wb') as f:
+        f.write(SOURCE)
+
+    result = run_subprocess([
+        sys.executable, '-m', 'python_minifier', source_path, '--output', output_path,
+        '--compile', '--compile-optimize', '2', '--compile-invalidation', 'timestamp'
+    ], timeout=60)
+    assert result.returncode == 0, safe_decode(result.stderr)
+
+    options = CompileOptions(optimize=2, invalidation_mode='timestamp')
+    assert not os.path.exists(cache_path(source_path, options))
+
+    with open(output_path, 'rb') as f:
+        minified = f.read()
+    with open(cache_path(output_path, options), 'rb') as f:
+        assert f.read() == compile_module(minified, output_path, options, os.stat(output_path).st_mtime)
+
+
+@pytest.mark.parametrize('arguments, error', [
+    (['module.py', '--compile'], '--compile can only be used with --output or --in-place'),
+    (['module.py', '--in-place', '--compile-optimize', '1'], '--compile-optimize and --compile-invalidation require --compile'),
+    (['--ndjson', '--compile'], '--compile can not be used with --serve or --ndjson'),
+])
+def test_cli_compile_errors(directory, arguments, error):
+    path = os.path.join(directory, 'module.py')
+    with open(path, 'wb') as f:
+        f.write(SOURCE)
+
+    arguments = [path if argument == 'module.py' else argument for argument in arguments]
+    result = run_subprocess([sys.executable, '-m', 'python_minifier'] + arguments, timeout=30)
+    assert result.returncode == 1
+    assert error in safe_decode(result.stderr)
@@ -0,0 +1,120 @@
+"""Tests for the pyminify server and client."""
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+from python_minifier.daemon import DaemonError, MinifyServer, request
+from subprocess_compat import run_subprocess, safe_decode
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='Unix domain sockets are not available')
+
+
+def wait_for(predicate, timeout=30):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            raise AssertionError('Timed out')
+        time.sleep(0.05)
+
+
+def test_request():
+    directory = tempfile.mkdtemp()
+    try:
+        socket_path = os.path.join(directory, 'server.sock')
+
+        def minify(source, filename, options):
+            if source == b'error':
+                raise SyntaxError('invalid syntax')
+            return source.upper() + filename.encode() + options['suffix'].encode()
+
+        server = MinifyServer(socket_path, minify, idle_timeout=0.5)
+        thread = threading.Thread(target=server.serve_until_idle)
+        thread.start()
+
+        assert request(socket_path, b'a = 1', 'example.py', {'suffix': '!'}) == b'A = 1example.py!'
+
+        with pytest.raises(DaemonError) as e:
+            request(socket_path, b'error', 'example.py', {'suffix': '!'})
+        assert str(e.value) == 'SyntaxError: invalid syntax'
+
+        # The server stops after being idle
+        thread.join(30)
+        assert not thread.is_alive()
+        assert not os.path.exists(socket_path)
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_server_already_running():
+    directory = tempfile.mkdtemp()
+    try:
+        socket_path = os.path.join(directory, 'server.sock')
+
+        server = MinifyServer(socket_path, lambda source, filename, options: source, idle_timeout=0.5)
+        thread = threading.Thread(target=server.serve_until_idle)
+        thread.start()
+
+        with pytest.raises(DaemonError):
+            MinifyServer(socket_path, lambda source, filename, options: source, idle_timeout=0.5)
+
+        thread.join(30)
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_cli_serve_and_connect():
+    directory = tempfile.mkdtemp()
+    try:
+        socket_path = os.path.join(directory, 'server.sock')
+        path = os.path.join(directory, 'module.py')
+        with open(path, 'w') as f:
+            f.write('def hello(name):\n    """Say hello"""\n    return "Hello " + name\n')
+
+        server = subprocess.Popen([
+            sys.executable, '-m', 'python_minifier', '--serve', socket_path, '--jobs', '2', '--idle-timeout', '2'
+        ])
+        try:
+            wait_for(lambda: os.path.exists(socket_path))
+
+            local = run_subprocess([sys.executable, '-m', 'python_minifier', path, '--remove-literal-statements'], timeout=30)
+            remote = run_subprocess([
+                sys.executable, '-m', 'python_minifier', path, '--remove-literal-statements', '--connect', socket_path
+            ], timeout=30)
+
+            assert remote.returncode == 0, safe_decode(remote.stderr)
+            assert remote.stdout == local.stdout
+
+            with open(path, 'w') as f:
+                f.write('def')
+
+            remote = run_subprocess([sys.executable, '-m', 'python_minifier', path, '--connect', socket_path], timeout=30)
+            assert remote.returncode == 1
+            assert 'SyntaxError' in safe_decode(remote.stderr)
+
+            # The server exits after the idle timeout
+            wait_for(lambda: server.poll() is not None)
+            assert server.returncode == 0
+            assert not os.path.exists(socket_path)
+        finally:
+            if server.poll() is None:
+                server.kill()
+            server.wait()
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_cli_serve_invalid_arguments():
+    result = run_subprocess([sys.executable, '-m', 'python_minifier', 'example.py', '--serve', 'server.sock'], timeout=30)
+    assert result.returncode == 1
+    assert 'path arguments are not valid with --serve' in safe_decode(result.stderr)
+
+    result = run_subprocess([sys.executable, '-m', 'python_minifier'], timeout=30)
+    assert result.returncode == 2
+    assert 'the following arguments are required: path' in safe_decode(result.stderr)
@@ -0,0 +1,134 @@
+import sys
+
+import pytest
+
+import python_minifier.ast_compat as ast
+from python_minifier import minify
+from python_minifier.ast_annotation import NodeIndex, add_parent, get_parent
+from python_minifier.ast_compare import CompareError, compare_ast
+from python_minifier.module_printer import ModulePrinter
+from python_minifier.rename import add_namespace, resolve_names
+from python_minifier.rename.renamer import add_assigned, all_bindings
+from python_minifier.transforms.remove_literal_statements import find_doc
+from python_minifier.util import child_nodes, walk_preorder, walk_preorder_with_parent
+
+# Deeper than the recursion limit
+DEPTH = sys.getrecursionlimit() * 5
+
+# As deep as the default recursion limit, but still shallow enough for the parser
+SOURCE_DEPTH = 1000
+
+SOURCES = {
+    'elif': 'if a == 0:\n    pass\n' + ''.join('elif a == %d:\n    b = %d\n' % (i, i) for i in range(1, SOURCE_DEPTH)),
+    'binop': 'a = ' + '+'.join(['b'] * SOURCE_DEPTH),
+    'literals': 'a = ' + '+'.join(['"hello"'] * SOURCE_DEPTH),
+    'function': 'def f(argument):\n    return ' + '+'.join(['argument'] * SOURCE_DEPTH),
+    'attribute': 'a = b' + '.c' * SOURCE_DEPTH,
+    'subscript': 'a = b' + '[c]' * SOURCE_DEPTH,
+    'call': 'a = b' + '(c)' * SOURCE_DEPTH,
+    'power': 'a = ' + '**'.join(['b'] * SOURCE_DEPTH),
+    'not': 'a = ' + 'not ' * SOURCE_DEPTH + 'b',
+    'ifexp': 'a = ' + 'b if c else ' * SOURCE_DEPTH + 'd',
+    'lambda': 'a = ' + 'lambda: ' * SOURCE_DEPTH + 'b',
+}
+
+
+def elif_chain(depth, last_value=0):
+    root = node = ast.If(test=ast.Name(id='x', ctx=ast.Load()), body=[ast.Pass()], orelse=[])
+    for _ in range(depth):
+        node.orelse = [ast.If(test=ast.Name(id='x', ctx=ast.Load()), body=[ast.Pass()], orelse=[])]
+        node = node.orelse[0]
+
+    node.body = [ast.Expr(value=ast.Num(n=last_value))]
+    return ast.Module(body=[root], type_ignores=[])
+
+
+def binop_chain(depth):
+    value = ast.Name(id='b', ctx=ast.Load())
+    for _ in range(depth):
+        value = ast.BinOp(left=value, op=ast.Add(), right=ast.Name(id='b', ctx=ast.Load()))
+
+    return ast.Module(body=[ast.Expr(value=value)], type_ignores=[])
+
+
+def recursive_preorder(node):
+    nodes = [node]
+    for child in ast.iter_child_nodes(node):
+        nodes.extend(recursive_preorder(child))
+    return nodes
+
+
+def test_walk_preorder():
+    module = ast.parse('''
+def f(a, b=1, *args, **kwargs):
+    if a:
+        return [b for b in args if b]
+    return {a: kwargs}[a].c
+''')
+
+    assert list(walk_preorder(module)) == recursive_preorder(module)
+    assert [child for child in child_nodes(module.body[0])] == list(ast.iter_child_nodes(module.body[0]))
+
+    add_parent(module)
+    for node, parent in walk_preorder_with_parent(module.body[0], module):
+        if not isinstance(node, ast.expr_context):
+            assert get_parent(node) is parent
+
+
+@pytest.mark.parametrize('build', [elif_chain, binop_chain])
+def test_deep_walks(build):
+    module = build(DEPTH)
+
+    index = NodeIndex()
+    add_parent(module, index=index)
+    assert index.count('Module') == 1
+
+    add_namespace(module)
+    resolve_names(module)
+    add_assigned(module)
+
+    assert [binding.name for _namespace, binding in all_bindings(module)] == (['x'] if build is elif_chain else ['b'])
+
+    find_doc(module)
+    compare_ast(module, build(DEPTH))
+
+
+def test_deep_compare_difference():
+    with pytest.raises(CompareError) as e:
+        compare_ast(elif_chain(DEPTH), elif_chain(DEPTH, last_value=1))
+
+    assert 'Fields do not match!' in str(e.value)
+
+
+def test_deep_find_doc():
+    module = elif_chain(DEPTH)
+    module.body[0].test = ast.Attribute(value=ast.Name(id='f', ctx=ast.Load()), attr='__doc__', ctx=ast.Load())
+
+    # The __doc__ attribute is the first node, but make it the last
+    node = module.body[0]
+    while node.orelse:
+        node = node.orelse[0]
+    node.test, module.body[0].test = module.body[0].test, node.test
+
+    with pytest.raises(ValueError):
+        find_doc(module)
+
+
+@pytest.mark.parametrize('name', sorted(SOURCES))
+@pytest.mark.parametrize('options', [{}, {'rename_globals': True, 'remove_literal_statements': True}])
+def test_deep_source(name, options):
+    minified = minify(SOURCES[name], verify='full', **options)
+    assert isinstance(ast.parse(minified), ast.Module)
+
+
+def test_deep_binop_output():
+    assert minify(SOURCES['binop']) == 'a=' + '+'.join(['b'] * SOURCE_DEPTH)
+
+
+def test_deep_display_output():
+    value = ast.Num(n=1)
+    for _ in range(DEPTH):
+        value = ast.Dict(keys=[ast.Str(s='a')], values=[ast.List(elts=[ast.Tuple(elts=[value], ctx=ast.Load())], ctx=ast.Load())])
+
+    module = ast.Module(body=[ast.Expr(value=value)], type_ignores=[])
+    assert ModulePrinter()(module) == "{'a':[(" * DEPTH + '1' + ',)]}' * DEPTH
@@ -0,0 +1,223 @@
+import sys
+
+import pytest
+
+import python_minifier.ast_compat as ast
+from python_minifier import RemoveAnnotationsOptions
+from python_minifier.ast_annotation import NodeIndex, add_parent, get_namespace, get_parent
+from python_minifier.module_printer import ModulePrinter
+from python_minifier.rename import add_namespace
+from python_minifier.transforms.combine_imports import CombineImports
+from python_minifier.transforms.constant_folding import FoldConstants
+from python_minifier.transforms.remove_annotations import RemoveAnnotations
+from python_minifier.transforms.remove_asserts import RemoveAsserts
+from python_minifier.transforms.remove_debug import RemoveDebug
+from python_minifier.transforms.remove_explicit_return_none import RemoveExplicitReturnNone
+from python_minifier.transforms.remove_literal_statements import RemoveLiteralStatements
+from python_minifier.transforms.remove_object_base import RemoveObject
+from python_minifier.transforms.remove_pass import RemovePass
+from python_minifier.transforms.suite_transformer import FusedTransformer, SuiteTransformer
+
+
+def all_transforms():
+    return [
+        RemoveLiteralStatements(),
+        CombineImports(),
+        RemoveAnnotations(RemoveAnnotationsOptions(remove_class_attribute_annotations=True)),
+        RemovePass(),
+        RemoveObject(),
+        RemoveAsserts(),
+        RemoveDebug(),
+        RemoveExplicitReturnNone(),
+        FoldConstants(),
+    ]
+
+
+def prepare(source, index=None):
+    module = ast.parse(source)
+    add_parent(module, index=index)
+    add_namespace(module)
+    return module
+
+
+def print_module(module):
+    printer = ModulePrinter()
+    printer(module)
+    return printer.code
+
+
+def in_turn(source):
+    module = prepare(source)
+    for transform in all_transforms():
+        module = transform(module)
+    return print_module(module)
+
+
+def fused(source):
+    return print_module(FusedTransformer(all_transforms())(prepare(source)))
+
+
+SOURCES = [
+    '''
+"""Module docstring"""
+import os
+"""Between imports"""
+import sys
+from a import b
+pass
+from a import c
+''',
+    '''
+def f():
+    """Only a docstring"""
+    pass
+
+def g():
+    assert True
+    return None
+
+def h():
+    if __debug__:
+        print('debug')
+    return None
+''',
+    '''
+class A(object):
+    """Docstring"""
+    pass
+
+class B(A, object):
+    def method(self):
+        return 1 + 2
+''',
+    '''
+while True:
+    pass
+else:
+    "literal"
+
+for a in b:
+    assert a
+    if __debug__ is True:
+        pass
+
+try:
+    pass
+except Exception:
+    pass
+finally:
+    "literal"
+
+with a as b:
+    x = 10 * 10
+''',
+    '''
+def f():
+    def g():
+        return None
+    return None
+''',
+    '''
+print(__doc__)
+"""This docstring is used"""
+''',
+]
+
+if sys.version_info >= (3, 6):
+    SOURCES += [
+        '''
+from dataclasses import dataclass
+
+def f(a: int = 1 + 1, *args: str, b: 'int' = 2, **kwargs: float) -> 1 + 2:
+    c: int = 3 * 4
+    d: str
+    return None
+
+@dataclass
+class C:
+    x: int = 2 * 2
+    y: int
+
+class D:
+    x: int = 2 * 2
+    y: int
+''',
+        '''
+async def f():
+    async with a:
+        "literal"
+    return None
+''',
+    ]
+
+
+@pytest.mark.parametrize('source', SOURCES)
+def test_fused_is_same_as_in_turn(source):
+    assert fused(source) == in_turn(source)
+
+
+def test_fused_empty():
+    assert print_module(FusedTransformer([])(prepare('a = 1'))) == 'a=1'
+
+
+def test_node_transform_type_change():
+    """
+    When a transform replaces a node with a different type, later transforms get the new node
+    """
+
+    calls = []
+
+    class Replace(SuiteTransformer):
+        def transform_Pass(self, node):
+            calls.append('Replace Pass')
+            return self.add_child(ast.Break(), parent=get_parent(node), namespace=get_namespace(node))
+
+        def transform_Break(self, node):
+            calls.append('Replace Break')
+            return node
+
+    class Later(SuiteTransformer):
+        def transform_Pass(self, node):
+            calls.append('Later Pass')
+            return node
+
+        def transform_Break(self, node):
+            calls.append('Later Break')
+            return node
+
+    module = FusedTransformer([Replace(), Later()])(prepare('while True:\n    pass'))
+
+    assert isinstance(module.body[0].body[0], ast.Break)
+    assert calls == ['Replace Pass', 'Later Break']
+
+
+def test_enabled():
+    class Disabled(RemovePass):
+        def enabled(self, module):
+            return False
+
+    module = FusedTransformer([Disabled(), RemoveAsserts()])(prepare('pass\nassert a'))
+    assert print_module(module) == 'pass'
+
+
+@pytest.mark.parametrize('source, enabled', [
+    ('a = 1', []),
+    ('pass', ['RemovePass']),
+    ('assert a', ['RemoveAsserts']),
+    ('if __debug__: a()', ['RemoveLiteralStatements', 'RemoveDebug']),
+    ('def f(): return 1 + 1', ['RemoveAnnotations', 'RemoveExplicitReturnNone', 'FoldConstants'] if sys.version_info >= (3, 0) else ['RemoveExplicitReturnNone', 'FoldConstants']),
+])
+def test_transforms_without_nodes_are_skipped(source, enabled):
+    module = prepare(source, NodeIndex())
+    assert [transform.__class__.__name__ for transform in all_transforms() if transform.enabled(module)] == enabled
+
+
+def test_nothing_to_do():
+    class Unexpected(SuiteTransformer):
+        node_types = ('Pass',)
+
+        def visit(self, node):
+            raise AssertionError('Module should not be visited')
+
+    module = prepare('a = 1', NodeIndex())
+    assert Unexpected()(module) is module
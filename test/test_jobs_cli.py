@@ -0,0 +1,94 @@
+"""Tests for minifying multiple modules in parallel with --jobs."""
+import os
+import shutil
+import sys
+import tempfile
+
+from subprocess_compat import run_subprocess, safe_decode
+
+
+def create_tree(root, count):
+    paths = []
+    for i in range(count):
+        package = os.path.join(root, 'package%d' % (i % 3))
+        if not os.path.isdir(package):
+            os.makedirs(package)
+
+        path = os.path.join(package, 'module%d.py' % i)
+        with open(path, 'w') as f:
+            f.write('def function_%d(argument):\n    """Docstring"""\n    return argument + %d\n' % (i, i))
+        paths.append(path)
+
+    return paths
+
+
+def test_jobs_in_place():
+    root = tempfile.mkdtemp()
+    try:
+        paths = create_tree(root, 12)
+
+        result = run_subprocess([sys.executable, '-m', 'python_minifier', root, '--in-place', '--jobs', '3'], timeout=120)
+
+        assert result.returncode == 0, safe_decode(result.stderr)
+
+        # Every path is reported exactly once, in the order they finish
+        reported = safe_decode(result.stdout).splitlines()
+        assert sorted(reported) == sorted(paths)
+
+        for i, path in enumerate(paths):
+            with open(path) as f:
+                assert f.read() == "def function_%d(argument):'Docstring';return argument+%d" % (i, i)
+    finally:
+        shutil.rmtree(root)
+
+
+def test_jobs_auto_matches_serial():
+    serial_root = tempfile.mkdtemp()
+    parallel_root = tempfile.mkdtemp()
+    try:
+        serial_paths = create_tree(serial_root, 6)
+        parallel_paths = create_tree(parallel_root, 6)
+
+        result = run_subprocess([sys.executable, '-m', 'python_minifier', serial_root, '--in-place'], timeout=120)
+        assert result.returncode == 0
+        result = run_subprocess([sys.executable, '-m', 'python_minifier', parallel_root, '--in-place', '--jobs', 'auto'], timeout=120)
+        assert result.returncode == 0, safe_decode(result.stderr)
+
+        for serial_path, parallel_path in zip(serial_paths, parallel_paths):
+            with open(serial_path, 'rb') as s, open(parallel_path, 'rb') as p:
+                assert s.read() == p.read()
+    finally:
+        shutil.rmtree(serial_root)
+        shutil.rmtree(parallel_root)
+
+
+def test_jobs_not_beneficial_keeps_original():
+    root = tempfile.mkdtemp()
+    try:
+        code = 'True if 0in x else False'
+        path = os.path.join(root, 'short.py')
+        with open(path, 'w') as f:
+            f.write(code)
+        create_tree(root, 2)
+
+        env = os.environ.copy()
+        env.pop('PYMINIFY_FORCE_BEST_EFFORT', None)
+
+        result = run_subprocess([sys.executable, '-m', 'python_minifier', root, '--in-place', '--jobs', '2'], timeout=120, env=env)
+        assert result.returncode == 0, safe_decode(result.stderr)
+        assert path in safe_decode(result.stdout).splitlines()
+
+        with open(path) as f:
+            assert f.read() == code
+    finally:
+        shutil.rmtree(root)
+
+
+def test_invalid_jobs():
+    result = run_subprocess([sys.executable, '-m', 'python_minifier', 'example.py', '--jobs', '0'], timeout=30)
+    assert result.returncode == 2
+    assert 'jobs must be at least 1' in safe_decode(result.stderr)
+
+    result = run_subprocess([sys.executable, '-m', 'python_minifier', 'example.py', '--jobs', 'many'], timeout=30)
+    assert result.returncode == 2
+    assert 'invalid jobs value' in safe_decode(result.stderr)
@@ -0,0 +1,96 @@
+"""Tests for incremental in-place minification using a manifest."""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from python_minifier.manifest import Manifest, file_state
+from subprocess_compat import run_subprocess, safe_decode
+
+
+def write(path, content):
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def test_manifest_unchanged():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'module.py')
+        write(path, 'a=1')
+
+        manifest = Manifest(os.path.join(directory, 'manifest.json'))
+        assert not manifest.is_unchanged(path)
+
+        manifest.record(path, file_state(path, b'a=1'))
+        assert manifest.is_unchanged(path)
+
+        manifest.save()
+        assert Manifest(manifest.path).is_unchanged(path)
+
+        # Touching the file doesn't change it
+        os.utime(path, (time.time() + 10, time.time() + 10))
+        assert Manifest(manifest.path).is_unchanged(path)
+
+        # Changing the content (but not the size) does
+        write(path, 'a=2')
+        os.utime(path, (time.time() + 20, time.time() + 20))
+        assert not Manifest(manifest.path).is_unchanged(path)
+
+        os.remove(path)
+        assert not Manifest(manifest.path).is_unchanged(path)
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_invalid_manifest():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'manifest.json')
+        write(path, 'not json')
+        assert len(Manifest(path)) == 0
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_cli_manifest():
+    directory = tempfile.mkdtemp()
+    try:
+        manifest_path = os.path.join(directory, 'manifest.json')
+        first = os.path.join(directory, 'first.py')
+        second = os.path.join(directory, 'second.py')
+        write(first, 'def first(argument):\n    return argument\n')
+        write(second, 'def second(argument):\n    return argument\n')
+
+        def run(*extra_args):
+            result = run_subprocess([
+                sys.executable, '-m', 'python_minifier', directory, '--in-place', '--manifest', manifest_path
+            ] + list(extra_args), timeout=60)
+            assert result.returncode == 0, safe_decode(result.stderr)
+            return sorted(safe_decode(result.stdout).splitlines())
+
+        assert run() == sorted([first, second])
+        assert os.path.isfile(manifest_path)
+
+        with open(first) as f:
+            minified = f.read()
+
+        # Nothing has changed since the last run
+        assert run() == []
+
+        with open(first) as f:
+            assert f.read() == minified
+
+        # Only the changed module is minified
+        write(second, 'def second(argument):\n    return argument + 1\n')
+        assert run('--jobs', '2') == [second]
+        assert run('--jobs', '2') == []
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_cli_manifest_requires_in_place():
+    result = run_subprocess([sys.executable, '-m', 'python_minifier', 'example.py', '--manifest', 'manifest.json'], timeout=30)
+    assert result.returncode == 1
+    assert '--manifest can only be used with --in-place' in safe_decode(result.stderr)
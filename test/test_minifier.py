@@ -0,0 +1,110 @@
+import ast
+import pickle
+import threading
+
+import pytest
+
+from python_minifier import Minifier, MinifyStats, RemoveAnnotationsOptions, minify
+
+SOURCE = '''
+import os
+
+class MyClass(object):
+    """A docstring"""
+
+    def method(self, argument=1 + 2):
+        assert argument
+        return None
+
+def function(long_argument_name):
+    if __debug__:
+        print(long_argument_name)
+    return [long_argument_name for long_argument_name in range(10)]
+
+__all__ = ['MyClass']
+'''
+
+OPTIONS = [
+    {},
+    {'rename_globals': True, 'remove_literal_statements': True, 'preserve_globals': ['function']},
+    {'remove_asserts': True, 'remove_debug': True, 'hoist_literals': False, 'preserve_locals': 'long_argument_name'},
+    {'remove_annotations': False, 'remove_pass': False, 'combine_imports': False, 'constant_folding': False},
+]
+
+
+@pytest.mark.parametrize('options', OPTIONS)
+def test_same_as_minify(options):
+    minifier = Minifier(**options)
+    assert minifier.minify(SOURCE) == minify(SOURCE, **options)
+    assert minifier.minify(SOURCE, 'filename.py') == minify(SOURCE, 'filename.py', **options)
+
+
+def test_invalid_options():
+    with pytest.raises(TypeError):
+        Minifier(remove_annotations='yes')
+
+    with pytest.raises(ValueError):
+        Minifier(verify='sometimes')
+
+    with pytest.raises(TypeError):
+        Minifier(rename_everything=True)
+
+
+def test_minifier_is_not_changed():
+    # Names found in the module are added to the names to preserve
+    preserve_globals = ['keep']
+    minifier = Minifier(rename_globals=True, preserve_globals=preserve_globals)
+
+    assert minifier.minify('__all__ = ["a"]\na = 1\nkeep = 1') == "__all__=['a']\na=1\nkeep=1"
+    assert minifier.minify('a = 1\nkeep = 1') == 'A=1\nkeep=1'
+
+    assert minifier.preserve_globals == ('keep',)
+    assert preserve_globals == ['keep']
+
+
+def test_shared_by_threads():
+    minifier = Minifier(rename_globals=True, remove_literal_statements=True)
+    expected = minify(SOURCE, rename_globals=True, remove_literal_statements=True)
+
+    results = []
+
+    def work():
+        for _ in range(10):
+            results.append(minifier.minify(SOURCE))
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [expected] * 40
+
+
+def test_parsed_module():
+    minifier = Minifier()
+    module = ast.parse(SOURCE)
+
+    assert minifier.minify(module, shebang='#!python') == '#!python\n' + minify(SOURCE)
+
+
+def test_stats():
+    stats = MinifyStats()
+    Minifier().minify(SOURCE, stats=stats)
+    assert 'total' in stats.timings
+
+
+def test_pickle():
+    minifier = Minifier(remove_annotations=RemoveAnnotationsOptions(remove_variable_annotations=False), rename_globals=True)
+    assert pickle.loads(pickle.dumps(minifier)).minify(SOURCE) == minifier.minify(SOURCE)
+
+
+@pytest.mark.parametrize('pool', ['process', 'thread'])
+def test_minify_many(pool):
+    minifier = Minifier(rename_globals=True)
+    sources = [('a.py', SOURCE), ('b.py', 'def b(:')]
+
+    results = dict(minifier.minify_many(sources, workers=2, pool=pool))
+
+    assert results['a.py'] == minify(SOURCE, rename_globals=True)
+    assert isinstance(results['b.py'], SyntaxError)
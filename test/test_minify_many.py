@@ -0,0 +1,88 @@
+import pytest
+
+from python_minifier import RemoveAnnotationsOptions, UnstableMinification, minify, minify_many
+
+
+SOURCES = [
+    ('a.py', 'def a(argument):\n    return argument'),
+    ('b.py', b'class B(object):\n    pass\n'),
+    ('c.py', 'def c(x: int) -> int:\n    return x'),
+    ('d.py', 'def d(:'),
+]
+
+
+@pytest.mark.parametrize('pool', ['process', 'thread'])
+def test_minify_many(pool):
+    results = dict(minify_many(SOURCES, workers=2, pool=pool, rename_globals=True, remove_annotations=False))
+
+    assert sorted(results) == ['a.py', 'b.py', 'c.py', 'd.py']
+
+    for name, source in SOURCES[:3]:
+        assert results[name] == minify(source, name, rename_globals=True, remove_annotations=False)
+
+    assert isinstance(results['d.py'], SyntaxError)
+
+
+def test_lazy_sources():
+    def sources():
+        for i in range(50):
+            yield 'm%d.py' % i, 'value_%d = %d' % (i, i)
+
+    results = dict(minify_many(sources(), workers=3, pool='thread'))
+    assert results == dict(('m%d.py' % i, 'value_%d=%d' % (i, i)) for i in range(50))
+
+
+def test_options_are_not_shared():
+    # minify extends the preserved names with names it finds in each module
+    preserve_globals = ['keep']
+    sources = [('a.py', '__all__ = ["a"]\na = 1\nkeep = 1'), ('b.py', 'a = 1\nkeep = 1')]
+
+    results = dict(minify_many(sources, workers=1, pool='thread', rename_globals=True, preserve_globals=preserve_globals))
+
+    assert results['b.py'] == 'A=1\nkeep=1'
+    assert preserve_globals == ['keep']
+
+
+def test_unpicklable_exception():
+    class Unpicklable(object):
+        def __reduce__(self):
+            raise TypeError('Not picklable')
+
+    from python_minifier import Minifier, _minify_item_in_process
+
+    class RaiseUnstable(Minifier):
+        def minify(self, *args, **kwargs):
+            raise UnstableMinification(Unpicklable(), '', 'minified')
+
+    name, result = _minify_item_in_process('a.py', 'a = 1', RaiseUnstable())
+
+    assert name == 'a.py'
+    assert isinstance(result, UnstableMinification)
+    assert result.minified == 'minified'
+
+
+def test_task_error():
+    class Unpicklable(object):
+        def __reduce__(self):
+            raise TypeError('Not picklable')
+
+    # The source can't be sent to a worker process, so the task fails before minifying it
+    with pytest.raises(TypeError):
+        list(minify_many([('a.py', Unpicklable())], workers=1, pool='process'))
+
+
+def test_invalid_options():
+    with pytest.raises(TypeError):
+        minify_many(SOURCES, rename_everything=True)
+
+    with pytest.raises(TypeError):
+        minify_many(SOURCES, remove_annotations='yes')
+
+    with pytest.raises(ValueError):
+        minify_many(SOURCES, pool='fibre')
+
+
+def test_remove_annotations_options():
+    options = RemoveAnnotationsOptions(remove_return_annotations=False)
+    results = dict(minify_many(SOURCES[2:3], workers=1, pool='thread', remove_annotations=options))
+    assert results['c.py'] == 'def c(x)->int:return x'
@@ -0,0 +1,162 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import python_minifier.ast_compat as ast
+
+from python_minifier import minify, minify_package
+from python_minifier.package import import_from_module, module_name
+
+
+PACKAGE = [
+    ('pkg/__init__.py', '''
+from pkg.shapes import make_rectangle_shape
+from . import geometry
+__all__ = ['make_rectangle_shape', 'area']
+
+def area(width, height):
+    return geometry.rectangle_area_calculation(width, height)
+'''),
+    ('pkg/geometry.py', '''
+def rectangle_area_calculation(width, height):
+    return width * height
+
+unused_module_constant = 1
+'''),
+    ('pkg/shapes.py', '''
+from .geometry import rectangle_area_calculation as calculate
+from .constants import DEFAULT_RECTANGLE_NAME, describe_rectangle_shape
+
+def make_rectangle_shape(width, height):
+    return describe_rectangle_shape(DEFAULT_RECTANGLE_NAME, calculate(width, height))
+'''),
+    ('pkg/constants.py', '''
+DEFAULT_RECTANGLE_NAME = 'rectangle'
+
+def describe_rectangle_shape(name, area):
+    return '%s %d' % (name, area)
+'''),
+]
+
+
+def run_package(tmp_path, modules, code):
+    for path, source in modules:
+        full_path = tmp_path.joinpath(*path.split('/'))
+        if not full_path.parent.exists():
+            full_path.parent.mkdir(parents=True)
+        full_path.write_text(source)
+
+    env = dict(os.environ, PYTHONPATH=str(tmp_path))
+    return subprocess.check_output([sys.executable, '-c', code], env=env).decode().strip()
+
+
+@pytest.mark.parametrize('pool', ['process', 'thread'])
+def test_minify_package(tmp_path, pool):
+    minified = minify_package(PACKAGE, workers=2, pool=pool, rename_globals=True)
+    assert [path for path, _source in minified] == [path for path, _source in PACKAGE]
+
+    results = dict(minified)
+
+    for name in ['rectangle_area_calculation', 'DEFAULT_RECTANGLE_NAME', 'describe_rectangle_shape']:
+        assert not any(name in source for source in results.values())
+
+    # Names in __all__ are preserved
+    assert 'make_rectangle_shape' in results['pkg/__init__.py']
+    assert 'def area(' in results['pkg/__init__.py']
+
+    # The submodule imported as an attribute of the package keeps its name
+    assert 'import geometry\n' in results['pkg/__init__.py']
+
+    output = run_package(tmp_path, minified, 'import pkg; print(pkg.make_rectangle_shape(2, 3), pkg.area(4, 5))')
+    assert output == 'rectangle 6 20'
+
+
+def test_escaping_module():
+    modules = [
+        ('pkg/__init__.py', ''),
+        ('pkg/a.py', 'long_function_name = 1'),
+        ('pkg/b.py', 'import pkg.a\nfrom pkg import a\nprint(a.long_function_name)\nprint(vars(a))'),
+    ]
+
+    results = dict(minify_package(modules, pool='thread', rename_globals=True))
+    assert results['pkg/a.py'] == 'long_function_name=1'
+
+
+def test_star_import():
+    modules = [
+        ('a.py', 'long_function_name = 1\nother_name = 2'),
+        ('b.py', 'from a import *\nfrom a import long_function_name\nprint(long_function_name)'),
+    ]
+
+    results = dict(minify_package(modules, pool='thread', rename_globals=True))
+    assert results['a.py'] == 'long_function_name=1\nother_name=2'
+    assert 'from a import long_function_name' in results['b.py']
+
+
+def test_attribute_access(tmp_path):
+    modules = [
+        ('a.py', 'long_function_name = 1\nother_long_name = 2\nkeep_this_name = 3'),
+        ('b.py', '''
+import a as module
+module.other_long_name += module.long_function_name
+print(module.other_long_name, module.keep_this_name)
+'''),
+    ]
+
+    minified = minify_package(modules, pool='thread', rename_globals=True, preserve_globals=['keep_this_name'])
+    results = dict(minified)
+
+    assert 'long_function_name' not in results['a.py']
+    assert 'other_long_name' not in results['a.py']
+    assert 'keep_this_name=3' in results['a.py']
+
+    assert run_package(tmp_path, minified, 'import b') == '3 3'
+
+
+def test_without_rename_globals():
+    results = minify_package(PACKAGE, pool='thread')
+    assert results == [(path, minify(source, path)) for path, source in PACKAGE]
+
+
+def test_parsed_module():
+    source = ast.parse('long_function_name = 1')
+    modules = [('a.py', source), ('b.py', 'from a import long_function_name')]
+    results = dict(minify_package(modules, pool='thread', rename_globals=True))
+
+    assert results['a.py'] == 'A=1'
+    assert results['b.py'] == 'from a import A'
+    assert isinstance(source.body[0].targets[0], ast.Name)
+    assert source.body[0].targets[0].id == 'long_function_name'
+
+
+def test_syntax_error():
+    with pytest.raises(SyntaxError):
+        minify_package([('a.py', 'a = 1'), ('b.py', 'def b(:')], pool='thread', rename_globals=True)
+
+
+def test_absolute_path():
+    with pytest.raises(ValueError):
+        minify_package([(os.path.abspath('a.py'), 'a = 1')], pool='thread', rename_globals=True)
+
+
+def test_module_name():
+    assert module_name('pkg/__init__.py') == ('pkg', True)
+    assert module_name('pkg/sub/module.py') == ('pkg.sub.module', False)
+    assert module_name('module.py') == ('module', False)
+
+    with pytest.raises(ValueError):
+        module_name('../module.py')
+
+
+def test_import_from_module():
+    def resolve(source, name, is_package):
+        return import_from_module(ast.parse(source).body[0], name, is_package)
+
+    assert resolve('from a.b import c', 'pkg.module', False) == 'a.b'
+    assert resolve('from . import c', 'pkg.module', False) == 'pkg'
+    assert resolve('from . import c', 'pkg', True) == 'pkg'
+    assert resolve('from .sub import c', 'pkg', True) == 'pkg.sub'
+    assert resolve('from ..sub import c', 'pkg.inner.module', False) == 'pkg.sub'
+    assert resolve('from .. import c', 'pkg.module', False) is None
@@ -0,0 +1,89 @@
+import python_minifier.ast_compat as ast
+
+from python_minifier.rename.availability import FreeOrdinals, NameAvailability
+from python_minifier.rename.scope import ModuleScope, Scope
+
+
+def scopes():
+    module = ModuleScope(ast.Module(body=[]))
+    first = Scope(ast.FunctionDef(), module)
+    second = Scope(ast.FunctionDef(), module)
+    return module, first, second
+
+
+def test_free_ordinals():
+    free = FreeOrdinals()
+    assert free.find(0) == 0
+
+    for ordinal in [0, 1, 2, 4]:
+        free.reserve(ordinal)
+
+    assert free.find(0) == 3
+    assert free.find(1) == 3
+    assert free.find(3) == 3
+    assert free.find(4) == 5
+
+    free.reserve(3)
+    assert free.find(0) == 5
+    assert free.find(2) == 5
+
+
+def test_first_available():
+    module, first, second = scopes()
+    availability = NameAvailability(iter(['a', 'b', 'c', 'd']))
+
+    assert availability.first_available([module]) == 0
+
+    availability.reserve('a', [module, first])
+    availability.reserve('b', [first])
+    availability.reserve('c', [second])
+
+    assert availability.first_available([module]) == 1
+    assert availability.first_available([first]) == 2
+    assert availability.first_available([second]) == 0
+    assert availability.first_available([module, first]) == 2
+    assert availability.first_available([module, first, second]) == 3
+    assert availability.names == ['a', 'b', 'c', 'd']
+
+    availability.reserve('d', [second])
+    assert availability.first_available([module, first, second]) is None
+
+
+def test_reserved_before_generated():
+    module, first, _second = scopes()
+    availability = NameAvailability(iter(['a', 'b', 'c']))
+
+    availability.reserve('b', [module])
+    availability.reserve('a', [first])
+
+    assert availability.names == []
+    assert availability.first_available([module]) == 0
+    assert availability.first_available([module, first]) == 2
+
+
+def test_prefix():
+    module, _first, _second = scopes()
+    availability = NameAvailability(iter(['a', 'b', 'c']))
+
+    availability.reserve('a', [module])
+    availability.reserve('_b', [module])
+
+    assert availability.first_available([module]) == 1
+    assert availability.first_available([module], prefix='_') == 0
+
+    availability.reserve('_a', [module])
+    assert availability.first_available([module], prefix='_') == 2
+    assert availability.first_available([module]) == 1
+
+
+def test_clear():
+    module, _first, _second = scopes()
+    availability = NameAvailability(iter(['a', 'b', 'c']))
+
+    availability.reserve('a', [module])
+    assert availability.first_available([module]) == 1
+
+    module.assigned_names = set()
+    availability.clear()
+    assert availability.first_available([module]) == 0
+    assert availability.names == ['a', 'b']
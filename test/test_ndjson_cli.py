@@ -0,0 +1,67 @@
+"""Tests for the --ndjson streaming mode of pyminify."""
+import json
+import sys
+
+import pytest
+
+from subprocess_compat import run_subprocess, safe_decode
+
+
+def run_ndjson(requests, *extra_args):
+    input_data = '\n'.join(json.dumps(request) if isinstance(request, dict) else request for request in requests) + '\n'
+
+    result = run_subprocess([sys.executable, '-m', 'python_minifier', '--ndjson'] + list(extra_args), timeout=60, input_data=input_data)
+    assert result.returncode == 0, safe_decode(result.stderr)
+
+    return dict((response['id'], response) for response in map(json.loads, safe_decode(result.stdout).splitlines()))
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_ndjson(jobs):
+    responses = run_ndjson([
+        {'id': 1, 'source': 'def f(argument):\n    return argument\n'},
+        {'id': 'two', 'source': 'def', 'filename': 'two.py'},
+        {'id': 3, 'source': 'a: int = 1', 'options': {'rename_globals': True, 'remove_annotations': False}},
+        {'id': 4, 'source': 'a: int = 1', 'options': {'remove_annotations': {'remove_variable_annotations': False}}},
+        {'id': 5, 'source': 'a = 1', 'options': {'not_an_option': True}},
+    ], '--jobs', jobs)
+
+    assert sorted(responses, key=str) == [1, 3, 4, 5, 'two']
+
+    assert responses[1]['minified'] == 'def f(argument):return argument'
+    assert responses[1]['error'] is None
+    assert responses[1]['timings']['total'] >= 0
+    for stage in ['parse', 'transforms', 'rename', 'print', 'verify']:
+        assert responses[1]['timings'][stage] >= 0
+
+    assert responses['two']['minified'] is None
+    assert responses['two']['error']['type'] == 'SyntaxError'
+    assert 'two.py' in responses['two']['error']['message']
+
+    assert responses[3]['minified'] == 'A:int=1'
+    assert responses[4]['minified'] == 'a:int=1'
+
+    assert responses[5]['error']['type'] == 'TypeError'
+
+
+def test_ndjson_command_line_options():
+    responses = run_ndjson([{'id': 1, 'source': '"""docstring"""\na = 1'}], '--remove-literal-statements')
+    assert responses[1]['minified'] == 'a=1'
+
+
+def test_ndjson_invalid_request():
+    responses = run_ndjson(['not json', '', '{"id": 1}'])
+
+    # Blank lines are ignored
+    assert len(responses) == 2
+
+    assert responses[None]['minified'] is None
+    assert responses[None]['error'] is not None
+
+    assert responses[1]['error']['type'] == 'KeyError'
+
+
+def test_ndjson_with_path():
+    result = run_subprocess([sys.executable, '-m', 'python_minifier', '--ndjson', 'example.py'], timeout=30)
+    assert result.returncode == 1
+    assert 'path arguments are not valid with --ndjson' in safe_decode(result.stderr)
@@ -0,0 +1,103 @@
+import ast
+
+import pytest
+
+from python_minifier import MinifyStats, minify, minify_many
+from python_minifier.ast_annotation import get_parent
+from python_minifier.util import copy_ast
+
+SOURCE = '''
+import os
+import sys
+
+class MyClass(object):
+    """A docstring"""
+
+    def method(self, argument=1 + 2):
+        assert argument
+        return None
+
+def function(long_argument_name):
+    if __debug__:
+        print(long_argument_name)
+    return [long_argument_name for long_argument_name in range(10)]
+'''
+
+
+def test_copy_ast():
+    module = ast.parse(SOURCE)
+    copy = copy_ast(module)
+
+    assert ast.dump(copy, include_attributes=True) == ast.dump(module, include_attributes=True)
+
+    original_nodes = set(id(node) for node in ast.walk(module) if node._fields)
+    assert not any(id(node) in original_nodes for node in ast.walk(copy) if node._fields)
+
+
+def test_copy_ast_lists():
+    module = ast.parse(SOURCE)
+    copy = copy_ast(module)
+
+    assert copy.body is not module.body
+    copy.body.pop()
+    assert len(module.body) == 4
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'rename_globals': True, 'remove_literal_statements': True},
+    {'remove_asserts': True, 'remove_debug': True, 'hoist_literals': False},
+])
+def test_parsed_module(options):
+    assert minify(ast.parse(SOURCE), **options) == minify(SOURCE, **options)
+
+
+def test_module_is_not_mutated():
+    module = ast.parse(SOURCE)
+    before = ast.dump(module, include_attributes=True)
+
+    minify(module, rename_globals=True, remove_literal_statements=True)
+
+    assert ast.dump(module, include_attributes=True) == before
+    assert not hasattr(module.body[0], '_parent')
+
+
+def test_mutate_module():
+    module = ast.parse(SOURCE)
+    minified = minify(module, rename_globals=True, mutate_module=True)
+
+    assert minified == minify(SOURCE, rename_globals=True)
+    assert isinstance(module.body[0], ast.Import) and len(module.body[0].names) == 2
+
+    # The module is transformed, but isn't left annotated
+    with pytest.raises(ValueError):
+        get_parent(module.body[0])
+
+
+def test_stats():
+    stats = MinifyStats()
+    minify(ast.parse(SOURCE), stats=stats)
+    assert 'copy' in stats.timings
+    assert 'parse' not in stats.timings
+
+    stats = MinifyStats()
+    minify(ast.parse(SOURCE), mutate_module=True, stats=stats)
+    assert 'copy' not in stats.timings
+
+
+def test_shebang():
+    module = ast.parse('a = 1')
+
+    assert minify(module, shebang='#!/usr/bin/env python') == '#!/usr/bin/env python\na=1'
+    assert minify(module, shebang='#!/usr/bin/env python', preserve_shebang=False) == 'a=1'
+    assert minify(module) == 'a=1'
+
+
+def test_shebang_with_source():
+    with pytest.raises(ValueError):
+        minify('a = 1', shebang='#!/usr/bin/env python')
+
+
+def test_minify_many():
+    sources = [('a.py', ast.parse('a = 1 + 1')), ('b.py', 'b = 2')]
+    assert dict(minify_many(sources, pool='thread')) == {'a.py': 'a=2', 'b.py': 'b=2'}
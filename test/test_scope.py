@@ -0,0 +1,199 @@
+import sys
+
+import pytest
+
+import python_minifier.ast_compat as ast
+from python_minifier import RemoveAnnotationsOptions
+from python_minifier.ast_annotation import add_parent, get_scope
+from python_minifier.rename import add_namespace, bind_names, resolve_names
+from python_minifier.rename.binding import NameBinding
+from python_minifier.rename.renamer import all_bindings, reservation_scope
+from python_minifier.rename.scope import ModuleScope, Scope
+from python_minifier.rename.util import get_global_namespace, get_nonlocal_namespace
+from python_minifier.transforms.remove_annotations import RemoveAnnotations
+
+SOURCE = '''
+a = 1
+
+def f(b):
+    global a
+
+    class C:
+        c = b
+
+        def method(self):
+            return [d for d in c]
+
+    return lambda e: e
+'''
+
+
+def prepare(source):
+    module = ast.parse(source)
+    add_parent(module)
+    add_namespace(module)
+    bind_names(module)
+    resolve_names(module)
+    return module
+
+
+def test_scope_tree():
+    module = prepare(SOURCE)
+
+    function = module.body[1]
+    classdef = function.body[1]
+    method = classdef.body[1]
+    listcomp = method.body[0].value
+    lambda_ = function.body[2].value
+
+    assert isinstance(get_scope(module), ModuleScope)
+    assert get_scope(module).parent is None
+    assert get_scope(module).node is module
+
+    assert get_scope(function).parent is get_scope(module)
+    assert get_scope(classdef).parent is get_scope(function)
+    assert get_scope(method).parent is get_scope(classdef)
+    assert get_scope(listcomp).parent is get_scope(method)
+    assert get_scope(lambda_).parent is get_scope(function)
+
+    assert get_scope(module).scopes == [get_scope(module), get_scope(function), get_scope(classdef), get_scope(method), get_scope(listcomp), get_scope(lambda_)]
+    assert all(scope.module_scope is get_scope(module) for scope in get_scope(module).scopes)
+
+
+
+def test_reannotated_scopes_are_replaced():
+    if sys.version_info < (3, 6):
+        pytest.skip('Variable annotation unsupported in python < 3.6')
+
+    module = ast.parse('''
+def f():
+    a: int = lambda b: [c for c in b]
+''')
+    add_parent(module)
+    add_namespace(module)
+
+    # The AnnAssign is replaced by an Assign of the same lambda, which annotates the lambda again
+    RemoveAnnotations(RemoveAnnotationsOptions())(module)
+    bind_names(module)
+    resolve_names(module)
+
+    function = module.body[0]
+    lambda_ = function.body[0].value
+    listcomp = lambda_.body
+
+    assert get_scope(module).scopes == [get_scope(module), get_scope(function), get_scope(lambda_), get_scope(listcomp)]
+    assert get_scope(listcomp).parent is get_scope(lambda_)
+    assert get_scope(lambda_).parent is get_scope(function)
+
+def test_names():
+    module = prepare(SOURCE)
+
+    function = module.body[1]
+    classdef = function.body[1]
+
+    # The class attribute 'c' is not visible in the method, so that reference is unresolved at module scope
+    assert sorted(get_scope(module).names) == ['a', 'c', 'f']
+    assert get_scope(module).get_binding('c').allow_rename is False
+    assert sorted(get_scope(function).names) == ['C', 'b']
+    assert get_scope(function).global_names == {'a'}
+    assert get_scope(classdef).nonlocal_names == {'b'}
+
+    assert get_scope(function).get_binding('b') is get_scope(function).names['b']
+    assert get_scope(function).get_binding('a') is None
+
+    # The reference to 'a' in f is to the module binding
+    assert function.body[0] in get_scope(module).get_binding('a').references
+
+
+def test_global_and_nonlocal_scope():
+    module = prepare(SOURCE)
+
+    function = module.body[1]
+    classdef = function.body[1]
+    method = classdef.body[1]
+
+    assert get_scope(method).global_scope() is get_scope(module)
+    assert get_scope(module).global_scope() is get_scope(module)
+
+    # Names in a method are not resolved in the class namespace
+    assert get_scope(method).nonlocal_scope() is get_scope(function)
+    assert get_scope(classdef).nonlocal_scope() is get_scope(function)
+    assert get_scope(module).nonlocal_scope() is get_scope(module)
+
+    assert get_global_namespace(method.body[0]) is module
+    assert get_nonlocal_namespace(classdef.body[0]) is function
+    assert get_nonlocal_namespace(method) is function
+    assert get_nonlocal_namespace(function) is module
+
+
+def test_add_binding():
+    scope = Scope(ast.Module(body=[]))
+
+    first = NameBinding('name')
+    second = NameBinding('name')
+    scope.add_binding(first)
+    scope.add_binding(second)
+
+    assert scope.bindings == [first, second]
+    assert scope.get_binding('name') is first
+
+
+def test_module_scope():
+    module = prepare('from os import *')
+    assert get_scope(module).tainted is True
+
+    module = prepare('a = 1')
+    assert get_scope(module).tainted is False
+    assert get_scope(module).preserved == set()
+
+
+def test_reservation_scope():
+    module = prepare(SOURCE)
+
+    function = module.body[1]
+    classdef = function.body[1]
+    method = classdef.body[1]
+    listcomp = method.body[0].value
+    lambda_ = function.body[2].value
+
+    binding = get_scope(function).get_binding('b')
+    assert reservation_scope(function, binding) == {get_scope(function), get_scope(classdef)}
+
+    # The result is cached until a reference is added
+    assert reservation_scope(function, binding) is binding.reservation_scope
+
+    binding.add_reference(listcomp.elt)
+    assert binding.reservation_scope is None
+    assert reservation_scope(function, binding) == {get_scope(function), get_scope(classdef), get_scope(method), get_scope(listcomp)}
+
+    binding = get_scope(module).get_binding('a')
+    assert reservation_scope(module, binding) == {get_scope(module), get_scope(function)}
+
+    binding.add_reference(lambda_.body)
+    assert reservation_scope(module, binding) == {get_scope(module), get_scope(function), get_scope(lambda_)}
+
+
+def test_reservation_scope_outside_namespace():
+    module = prepare(SOURCE)
+
+    function = module.body[1]
+    classdef = function.body[1]
+    method = classdef.body[1]
+    lambda_ = function.body[2].value
+
+    # A reference that is not nested in the binding's namespace reserves every scope up to the module scope
+    binding = get_scope(method).get_binding('self')
+    binding.add_reference(lambda_.body)
+    assert reservation_scope(method, binding) == {get_scope(method), get_scope(lambda_), get_scope(function), get_scope(module)}
+
+
+def test_all_bindings():
+    module = prepare(SOURCE)
+
+    function = module.body[1]
+    lambda_ = function.body[2].value
+
+    bindings = list(all_bindings(module))
+    assert bindings[:3] == [(module, binding) for binding in get_scope(module).bindings]
+    assert (lambda_, get_scope(lambda_).get_binding('e')) in bindings
+    assert len(bindings) == sum(len(scope.bindings) for scope in get_scope(module).scopes)
@@ -0,0 +1,111 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import pytest
+
+from python_minifier import MinifyStats, minify
+from python_minifier.stats import active, collect, count, stage
+from subprocess_compat import run_subprocess, safe_decode
+
+
+SOURCE = '''
+import os
+import sys
+
+def hello(name, greeting='Hello'):
+    message = greeting + ' ' + name
+    return message * (2 + 3)
+
+class Greeter(object):
+    def greet(self, name):
+        pass
+        return hello(name)
+'''
+
+
+def test_stats():
+    stats = MinifyStats()
+    minified = minify(SOURCE, rename_globals=True, stats=stats)
+
+    assert minified == minify(SOURCE, rename_globals=True)
+
+    for timing in ('parse', 'annotate', 'transforms', 'bind_names', 'resolve_names', 'rename', 'print', 'verify', 'total'):
+        assert stats.timings[timing] >= 0
+    assert sum(t for name, t in stats.timings.items() if name != 'total') <= stats.timings['total']
+
+    assert stats.counters['nodes'] > 30
+    assert stats.counters['bindings'] >= 8
+    assert stats.counters['names_tried'] >= 1
+    assert stats.counters['folds_attempted'] == 1
+    assert stats.counters['folds_accepted'] == 1
+
+    assert json.loads(json.dumps(stats.as_dict())) == stats.as_dict()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 6), reason='f-strings are not supported')
+def test_fstring_candidates():
+    stats = MinifyStats()
+    minify('name = "world"\nprint(f"hello {name!r:>10}")', stats=stats)
+    assert stats.counters['fstring_candidates'] >= 1
+
+
+def test_no_collection_without_stats():
+    minify(SOURCE)
+    assert active() is None
+
+    # Recording without an active collector does nothing
+    with stage('nothing'):
+        count('nothing')
+
+
+def test_collect_is_thread_local():
+    stats = MinifyStats()
+    other_thread_active = []
+
+    def other_thread():
+        other_thread_active.append(active())
+
+    with collect(stats):
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        thread.join()
+
+        count('counter', 2)
+
+    assert other_thread_active == [None]
+    assert stats.counters == {'counter': 2}
+
+
+def test_failed_minification_leaves_no_collector():
+    with pytest.raises(SyntaxError):
+        minify('def a(:', stats=MinifyStats())
+
+    assert active() is None
+
+
+def test_cli_stats_json():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'module.py')
+        with open(path, 'w') as f:
+            f.write(SOURCE)
+
+        result = run_subprocess([sys.executable, '-m', 'python_minifier', path, '--stats', 'json'], timeout=30)
+        assert result.returncode == 0, safe_decode(result.stderr)
+    finally:
+        shutil.rmtree(directory)
+
+    stats = json.loads(safe_decode(result.stderr).strip())
+    assert stats['filename'] == path
+    assert stats['timings']['total'] > 0
+    assert stats['counters']['nodes'] > 30
+
+
+def test_cli_stats_not_with_ndjson():
+    result = run_subprocess([sys.executable, '-m', 'python_minifier', '--ndjson', '--stats', 'json'], timeout=30)
+    assert result.returncode == 1
+    assert '--stats can not be used with --serve, --connect or --ndjson' in safe_decode(result.stderr)
@@ -0,0 +1,145 @@
+import time
+
+import pytest
+
+import python_minifier.rename
+from python_minifier import DEFAULT_FALLBACKS, Minifier, MinifyStats, minify
+from python_minifier.deadline import TimeBudgetExceeded, after, check, limit, remaining
+from python_minifier.transforms.constant_folding import FoldConstants
+
+SOURCE = '''
+def function(long_argument_name):
+    return ['hello', 'hello', 'hello', long_argument_name, 1 + 1]
+'''
+
+
+@pytest.fixture
+def slow_folding(monkeypatch):
+    original = FoldConstants.transform_BinOp
+
+    def transform_BinOp(self, node):
+        time.sleep(0.2)
+        return original(self, node)
+
+    monkeypatch.setattr(FoldConstants, 'transform_BinOp', transform_BinOp)
+
+
+@pytest.fixture
+def slow_hoisting(monkeypatch):
+    original = python_minifier.rename.rename_literals
+
+    def rename_literals(module):
+        time.sleep(0.2)
+        return original(module)
+
+    monkeypatch.setattr(python_minifier.rename, 'rename_literals', rename_literals)
+
+
+def test_limit():
+    check()
+
+    with limit(None):
+        check()
+
+    with limit(0.05):
+        check()
+        time.sleep(0.1)
+
+        with pytest.raises(TimeBudgetExceeded):
+            check()
+
+        with limit(None):
+            check()
+
+        with pytest.raises(TimeBudgetExceeded):
+            check()
+
+    check()
+
+
+def test_remaining():
+    deadline = after(0.05)
+    assert 0 < remaining(deadline) <= 0.05
+
+    time.sleep(0.1)
+    assert remaining(deadline) < 0
+
+
+def test_within_budget():
+    stats = MinifyStats()
+    assert minify(SOURCE, time_budget=60, stats=stats) == minify(SOURCE)
+    assert stats.counters['fallback_level'] == 0
+
+
+def test_default_fallbacks(slow_hoisting):
+    stats = MinifyStats()
+    minified = minify(SOURCE, time_budget=0.3, stats=stats)
+
+    assert minified == minify(SOURCE, hoist_literals=False)
+    assert stats.counters['fallback_level'] == 1
+
+
+def test_fallbacks(slow_folding):
+    stats = MinifyStats()
+    minified = minify(SOURCE, time_budget=0.05, fallbacks=[{'constant_folding': False}], stats=stats)
+
+    assert minified == minify(SOURCE, constant_folding=False)
+    assert stats.counters['fallback_level'] == 1
+
+
+def test_last_fallback_exceeded(slow_folding):
+    stats = MinifyStats()
+    assert minify(SOURCE, time_budget=0.05, fallbacks=[], stats=stats) == minify(SOURCE)
+    assert stats.counters['fallback_level'] == 0
+
+    stats = MinifyStats()
+    minified = minify(SOURCE, time_budget=0.05, fallbacks=[{'hoist_literals': False}], stats=stats)
+
+    assert minified == minify(SOURCE, hoist_literals=False)
+    assert stats.counters['fallback_level'] == 1
+
+
+def test_shared_budget(slow_folding):
+    stats = MinifyStats()
+    fallbacks = [{'hoist_literals': False}, {'rename_locals': False}, {'constant_folding': False}]
+
+    start = time.time()
+    minified = minify(SOURCE, time_budget=0.05, fallbacks=fallbacks, stats=stats)
+
+    # Only the first level is slowed down before the budget runs out, and the others are skipped
+    assert time.time() - start < 0.35
+    assert minified == minify(SOURCE, constant_folding=False)
+    assert stats.counters['fallback_level'] == 3
+
+
+def test_print_only():
+    minifier = Minifier(time_budget=1, fallbacks=[DEFAULT_FALLBACKS[-1]])
+    print_only = minifier._fallbacks[0]
+
+    assert print_only._transforms == ()
+    assert print_only.minify(SOURCE) == "def function(long_argument_name):return['hello','hello','hello',long_argument_name,1+1]"
+
+
+def test_no_budget(slow_folding):
+    assert minify(SOURCE, fallbacks=[]) == minify(SOURCE, time_budget=60)
+
+
+def test_invalid_options():
+    with pytest.raises(ValueError):
+        Minifier(time_budget=0)
+
+    with pytest.raises(ValueError):
+        Minifier(time_budget=1, fallbacks=[{'time_budget': 2}])
+
+    with pytest.raises(TypeError):
+        Minifier(time_budget=1, fallbacks=[{'rename_everything': True}])
+
+
+def test_parsed_module_is_not_mutated(slow_hoisting):
+    import ast
+
+    module = ast.parse(SOURCE)
+    before = ast.dump(module)
+
+    assert minify(module, time_budget=0.3) == minify(SOURCE, hoist_literals=False)
+    assert ast.dump(module) == before
@@ -0,0 +1,102 @@
+import ast
+import os
+import sys
+import tempfile
+
+import pytest
+
+from python_minifier import UnstableMinification, minify, unparse
+from python_minifier.ast_compare import structural_fingerprint
+from subprocess_compat import run_subprocess, safe_decode
+
+
+SOURCE = '''
+def hello(name, greeting='Hello'):
+    message = greeting + ' ' + name
+    return message * (2 + 3)
+
+values = {'a': [1, 2, None], 'b': (3, 4)}
+'''
+
+
+def unstable_module():
+    module = ast.parse('a = b')
+
+    # The printed name is parsed as a constant
+    module.body[0].value.id = 'None'
+    return module
+
+
+def test_structural_fingerprint():
+    assert structural_fingerprint(ast.parse(SOURCE)) == structural_fingerprint(ast.parse(minify(SOURCE, rename_locals=False, constant_folding=False)))
+
+    assert structural_fingerprint(ast.parse('a = 1')) != structural_fingerprint(ast.parse('a = 2'))
+    assert structural_fingerprint(ast.parse('a = 1')) != structural_fingerprint(ast.parse('b = 1'))
+    assert structural_fingerprint(ast.parse('f(a, b)')) != structural_fingerprint(ast.parse('f(a)(b)'))
+    assert structural_fingerprint(ast.parse('[a, b]')) != structural_fingerprint(ast.parse('[[a], b]'))
+
+    # These have the same hash on 64 bit platforms, but different fingerprints
+    zero = structural_fingerprint(ast.parse('a = 0'))
+    collision = structural_fingerprint(ast.parse('a = 2305843009213693951'))
+    assert zero != collision
+    if sys.version_info >= (3, 0) and sys.maxsize > 2 ** 32:
+        assert hash(zero) == hash(collision)
+
+
+@pytest.mark.parametrize('verify', ['full', 'structural-hash', 'sampled', 'off'])
+def test_verify_levels(verify):
+    assert minify(SOURCE, verify=verify) == minify(SOURCE)
+
+
+@pytest.mark.parametrize('verify', ['full', 'structural-hash'])
+def test_unstable(verify):
+    with pytest.raises(UnstableMinification) as e:
+        unparse(unstable_module(), verify=verify)
+
+    assert 'Nodes do not match!' in str(e.value.exception)
+
+
+@pytest.mark.parametrize('verify', ['full', 'structural-hash'])
+def test_unstable_syntax_error(verify):
+    module = ast.parse('a = b')
+    module.body[0].value.id = 'not a name'
+
+    with pytest.raises(UnstableMinification):
+        unparse(module, verify=verify)
+
+
+def test_sampled():
+    with pytest.raises(UnstableMinification):
+        unparse(unstable_module(), verify='sampled', verify_sample_rate=1)
+
+    assert unparse(unstable_module(), verify='sampled', verify_sample_rate=0) == 'a=None'
+
+
+def test_off():
+    assert unparse(unstable_module(), verify='off') == 'a=None'
+
+
+def test_invalid_verify():
+    with pytest.raises(ValueError):
+        minify(SOURCE, verify='partial')
+
+    with pytest.raises(ValueError):
+        minify(SOURCE, verify='sampled', verify_sample_rate=1.5)
+
+
+def test_verify_cli():
+    fd, path = tempfile.mkstemp(suffix='.py')
+    with os.fdopen(fd, 'w') as f:
+        f.write(SOURCE)
+
+    try:
+        for verify in ['structural-hash', 'off']:
+            result = run_subprocess([sys.executable, '-m', 'python_minifier', path, '--verify', verify])
+            assert result.returncode == 0
+            assert safe_decode(result.stdout) == minify(SOURCE)
+
+        result = run_subprocess([sys.executable, '-m', 'python_minifier', path, '--verify', 'sampled', '--verify-sample-rate', '2'])
+        assert result.returncode == 2
+        assert 'sample rate must be between 0 and 1' in safe_decode(result.stderr)
+    finally:
+        os.remove(path)
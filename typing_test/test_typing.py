@@ -4,7 +4,7 @@ This should pass typechecking
 
 import ast
 
-from python_minifier import RemoveAnnotationsOptions, awslambda, minify, unparse
+from python_minifier import CompileOptions, MinifyStats, RemoveAnnotationsOptions, awslambda, minify, minify_many, unparse
 
 
 def test_typing() -> None:
@@ -45,3 +45,19 @@ def test_typing() -> None:
         remove_class_attribute_annotations=False
     )
     minify('pass', remove_annotations=annotation_options)
+
+    stats = MinifyStats()
+    minify('pass', stats=stats)
+    print(stats.timings['total'], stats.counters.get('nodes', 0))
+
+    for name, result in minify_many([('a.py', 'pass'), ('b.py', b'pass')], workers=2, pool='thread', rename_globals=True):
+        if isinstance(result, Exception):
+            raise result
+        print(name + result)
+
+    for name, compiled in minify_many([('a.py', 'pass')], compile=CompileOptions(optimize=2, invalidation_mode='unchecked-hash')):
+        if isinstance(compiled, Exception):
+            raise compiled
+        if isinstance(compiled, tuple):
+            minified, bytecode = compiled
+            print(name + minified, len(bytecode))